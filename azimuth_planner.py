@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整轨方位角展开规划
+
+跟踪开始时查看整个过境轨迹，在可选的云台朝向（朝北/朝南）和翻转策略
+中选出总转动量最小的一种，之后按该方案连续地换算每个指向，避免过境途中
+在±180°处来回大角度回转。
+
+翻转策略：方位角尽量保持在升起方位附近，卫星越过头顶后改用
+（方位角+180°，180°-仰角）表示，仰角越过90°而不必转动方位轴。
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 云台朝向对应的方位角零点偏移
+HEADING_OFFSETS = {
+    'north': 0.0,
+    'south': 180.0
+}
+
+DEFAULT_LIMITS = {
+    'az_min': -180.0,
+    'az_max': 180.0,
+    'el_min': -30.0,
+    'el_max': 90.0
+}
+
+
+class AzimuthPlan:
+    """一次过境的方位角换算方案"""
+
+    def __init__(self, heading: str, flip: bool, flip_reference: float, start_azimuth: float,
+                 total_slew: float, wrap_count: int, limits: Dict):
+        self.heading = heading
+        self.flip = flip
+        self.flip_reference = flip_reference
+        self.total_slew = total_slew
+        self.wrap_count = wrap_count
+        self.limits = limits
+        self._offset = HEADING_OFFSETS[heading]
+        self._last_x = start_azimuth
+
+    @property
+    def mode(self) -> str:
+        return f"{self.heading}-flip" if self.flip else self.heading
+
+    def convert(self, azimuth: float, elevation: float) -> Tuple[float, float]:
+        """将地平坐标(0~360方位角, 仰角)换算为云台坐标，选取离上一指令最近的方位角分支"""
+        if self.flip and abs((azimuth - self.flip_reference + 180.0) % 360.0 - 180.0) > 90.0:
+            azimuth += 180.0
+            elevation = 180.0 - elevation
+        x = _nearest_branch(azimuth - self._offset, self._last_x, self.limits)
+        self._last_x = x
+        return x, elevation
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'heading': self.heading,
+            'flip': self.flip,
+            'total_slew': round(float(self.total_slew), 2),
+            'wrap_count': self.wrap_count
+        }
+
+
+def _nearest_branch(angle: float, reference: float, limits: Dict) -> float:
+    """在云台方位角范围内选取与参考角度最接近的等价角度（相差360°的整数倍）"""
+    az_min, az_max = limits['az_min'], limits['az_max']
+    base = (angle - az_min) % 360.0 + az_min
+    candidates = np.arange(base, az_max + 1e-9, 360.0)
+    if candidates.size == 0:
+        return min(max(base, az_min), az_max)
+    return float(candidates[np.argmin(np.abs(candidates - reference))])
+
+
+def _evaluate(azimuths: np.ndarray, elevations: np.ndarray, offset: float,
+              flip: bool, limits: Dict) -> Optional[Tuple[float, float, int]]:
+    """评估一种朝向/翻转方案，返回(起始方位角, 总转动量, 回绕次数)，不可行时返回None"""
+    if flip:
+        # 偏离升起方位超过90°的点改用翻转表示
+        flipped = np.abs((azimuths - azimuths[0] + 180.0) % 360.0 - 180.0) > 90.0
+        if not np.any(flipped):
+            return None
+        azimuths = np.where(flipped, azimuths + 180.0, azimuths)
+        elevations = np.where(flipped, 180.0 - elevations, elevations)
+    if np.any(elevations < limits['el_min'] - 1e-6) or np.any(elevations > limits['el_max'] + 1e-6):
+        return None
+
+    # 连续方位角轨迹
+    track = np.unwrap(azimuths - offset, period=360.0)
+    az_min, az_max = limits['az_min'], limits['az_max']
+
+    best = None
+    # 尝试各个起始分支，逐点模拟：超出范围时强制回绕360°
+    first = (track[0] - az_min) % 360.0 + az_min
+    for start in np.arange(first, az_max + 1e-9, 360.0):
+        shift = start - track[0]
+        x = start
+        slew = 0.0
+        wraps = 0
+        for value in track[1:] + shift:
+            # 保持与首点一致的展开分支，直到超出机械范围
+            candidate = value + round((x - value) / 360.0) * 360.0
+            if candidate < az_min or candidate > az_max:
+                candidate = _nearest_branch(value, x, limits)
+                wraps += 1
+            slew += abs(candidate - x)
+            x = candidate
+        slew += float(np.sum(np.abs(np.diff(elevations))))
+        if best is None or slew < best[1]:
+            best = (float(start), slew, wraps)
+    return best
+
+
+def plan_azimuth_track(azimuths: Iterable[float], elevations: Iterable[float],
+                       headings: List[str], limits: Optional[Dict] = None) -> Optional[AzimuthPlan]:
+    """为整次过境选择总转动量最小的方位角换算方案
+
+    Args:
+        azimuths: 过境期间的方位角序列（度，0~360）
+        elevations: 对应的仰角序列（度）
+        headings: 可选的云台朝向，'north' 和/或 'south'
+        limits: 云台机械范围 az_min/az_max/el_min/el_max，仰角上限大于90°时才会考虑翻转方案
+    """
+    limits = dict(DEFAULT_LIMITS, **(limits or {}))
+    azimuths = np.asarray(azimuths, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
+    if azimuths.size == 0:
+        return None
+
+    best = None
+    for heading in headings:
+        offset = HEADING_OFFSETS[heading]
+        for flip in (False, True):
+            result = _evaluate(azimuths, elevations, offset, flip, limits)
+            if result is None:
+                continue
+            start, slew, wraps = result
+            # 转动量相同时优先不翻转、优先靠前的朝向
+            if best is None or slew < best.total_slew - 1e-6:
+                best = AzimuthPlan(heading, flip, float(azimuths[0]), start, slew, wraps, limits)
+    return best
@@ -1,11 +1,12 @@
 import serial  
 import json
-import queue
 import threading
 import yaml
 import os
 import time
 import glob
+import collections
+import logging
 import numpy as np
 
 curpath = os.path.realpath(__file__)
@@ -13,6 +14,26 @@ thisPath = os.path.dirname(curpath)
 with open(thisPath + '/config.yaml', 'r') as yaml_file:
     f = yaml.safe_load(yaml_file)
 
+# 指向类指令只保留最新一条（latest-wins），排队中的旧位置直接被覆盖
+POINTING_COMMANDS = (f['cmd_config']['cmd_gimbal_ctrl'], f['cmd_config']['cmd_gimbal_base_ctrl'])
+# 优先发送的指令（紧急停止）
+PRIORITY_COMMANDS = (0,)
+# 可被同类型新指令取代的状态类指令（底盘速度、PWM、云台自稳、灯光），队列满时丢弃同类型最旧的一条
+MERGEABLE_COMMANDS = (f['cmd_config']['cmd_movition_ctrl'], f['cmd_config']['cmd_pwm_ctrl'],
+	f['cmd_config']['cmd_gimbal_steady'], f['cmd_config']['cmd_lights_ctrl'])
+# 普通指令队列上限；队列满时其余指令（舵机ID、扭矩、中位设置等一次性配置）等待空位，超时报错
+MAX_PENDING_COMMANDS = 64
+COMMAND_QUEUE_TIMEOUT = 2.0
+# 普通指令连续发送该条数后，若有待发的指向指令则先发送指向指令，避免跟踪指向被普通指令饿死
+MAX_FIFO_BEFORE_POINTING = 4
+
+logger = logging.getLogger('gimbal')
+
+
+class CommandQueueFull(RuntimeError):
+	"""指令队列已满，一次性指令未能在超时内入队"""
+
+
 class ReadLine:
 	def __init__(self, s):
 		self.buf = bytearray()
@@ -133,7 +154,24 @@ class BaseController:
 	def __init__(self, uart_dev_set, buad_set):
 		self.ser = serial.Serial(uart_dev_set, buad_set, timeout=1)
 		self.rl = ReadLine(self.ser)
-		self.command_queue = queue.Queue()
+		# 指令通道：优先指令队列 + 普通指令FIFO + 指向指令单槽位
+		self.command_cond = threading.Condition()
+		self.priority_queue = collections.deque()
+		self.command_queue = collections.deque()
+		self.pointing_slot = None
+		# 上次发送指向指令以来连续发送的普通指令条数
+		self.fifo_streak = 0
+		self.command_stats = {
+			'sent': 0,
+			'coalesced': 0,
+			'dropped': 0,
+			'last_wait_ms': 0.0,
+			'max_wait_ms': 0.0
+		}
+		self.baud_rate = buad_set
+		# 指令从入队到写入串口的平均耗时（秒），指数滑动平均
+		self.command_latency = 0.0
+		self.command_latency_alpha = 0.2
 		self.command_thread = threading.Thread(target=self.process_commands, daemon=True)
 		self.command_thread.start()
 
@@ -173,13 +211,87 @@ class BaseController:
 
 
 	def send_command(self, data):
-		self.command_queue.put(data)
+		item = (time.monotonic(), data)
+		cmd_type = data.get('T') if isinstance(data, dict) else None
+		with self.command_cond:
+			if cmd_type in PRIORITY_COMMANDS:
+				# 紧急停止优先发送，并丢弃尚未发出的指向指令
+				if self.pointing_slot is not None:
+					self.pointing_slot = None
+					self.command_stats['dropped'] += 1
+				self.priority_queue.append(item)
+			elif cmd_type in POINTING_COMMANDS:
+				if self.pointing_slot is not None:
+					self.command_stats['coalesced'] += 1
+				self.pointing_slot = item
+			else:
+				if len(self.command_queue) >= MAX_PENDING_COMMANDS and not self.drop_superseded(cmd_type):
+					if not self.command_cond.wait_for(lambda: len(self.command_queue) < MAX_PENDING_COMMANDS,
+							COMMAND_QUEUE_TIMEOUT):
+						raise CommandQueueFull(f"指令队列已满（{MAX_PENDING_COMMANDS}条），指令 {cmd_type} 未发送")
+				self.command_queue.append(item)
+			self.command_cond.notify_all()
+
+
+	def drop_superseded(self, cmd_type):
+		"""丢弃被新指令取代的同类型最旧状态指令，返回是否腾出了空位（调用方持有锁）"""
+		if cmd_type not in MERGEABLE_COMMANDS:
+			return False
+		for index, (_, pending) in enumerate(self.command_queue):
+			if isinstance(pending, dict) and pending.get('T') == cmd_type:
+				del self.command_queue[index]
+				self.command_stats['dropped'] += 1
+				return True
+		return False
+
+
+	def next_command(self):
+		with self.command_cond:
+			while not (self.priority_queue or self.command_queue or self.pointing_slot):
+				self.command_cond.wait()
+			if self.priority_queue:
+				return self.priority_queue.popleft()
+			# 普通指令与指向指令交替：连续发送 MAX_FIFO_BEFORE_POINTING 条普通指令后让指向指令先行
+			if self.command_queue and (self.pointing_slot is None or self.fifo_streak < MAX_FIFO_BEFORE_POINTING):
+				self.fifo_streak += 1
+				item = self.command_queue.popleft()
+				# 唤醒等待队列空位的发送方
+				self.command_cond.notify_all()
+				return item
+			self.fifo_streak = 0
+			item = self.pointing_slot
+			self.pointing_slot = None
+			return item
 
 
 	def process_commands(self):
 		while True:
-			data = self.command_queue.get()
-			self.ser.write((json.dumps(data) + '\n').encode("utf-8"))
+			enqueue_time, data = self.next_command()
+			wait_time = time.monotonic() - enqueue_time
+			payload = (json.dumps(data) + '\n').encode("utf-8")
+			try:
+				self.ser.write(payload)
+			except Exception as e:
+				logger.error("[base_ctrl.process_commands] error: %s", e)
+				continue
+			# 排队等待 + 写入耗时 + 按波特率估算的线上传输时间（10 bit/字节）
+			latency = time.monotonic() - enqueue_time + len(payload) * 10 / self.baud_rate
+			self.command_latency += self.command_latency_alpha * (latency - self.command_latency)
+			self.command_stats['sent'] += 1
+			self.command_stats['last_wait_ms'] = wait_time * 1000
+			self.command_stats['max_wait_ms'] = max(self.command_stats['max_wait_ms'], wait_time * 1000)
+
+
+	def get_command_stats(self):
+		with self.command_cond:
+			stats = dict(self.command_stats)
+			stats['pending'] = len(self.priority_queue) + len(self.command_queue) + (self.pointing_slot is not None)
+		stats['latency_ms'] = self.command_latency * 1000
+		return stats
+
+
+	def get_command_latency(self):
+		return self.command_latency
 
 
 	def base_json_ctrl(self, input_json):
@@ -235,7 +347,7 @@ class BaseController:
 
 
 	def lights_ctrl(self, pwmA, pwmB):
-		data = {"T":132,"IO4":pwmA,"IO5":pwmB}
+		data = {"T":f['cmd_config']['cmd_lights_ctrl'],"IO4":pwmA,"IO5":pwmB}
 		self.send_command(data)
 		self.base_light_status = pwmA
 		self.head_light_status = pwmB
@@ -1,129 +1,73 @@
 # calculate.py
 
-from flask import Blueprint, request, jsonify
-from skyfield.api import load, wgs84, EarthSatellite
-from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, url_for
+from skyfield.api import load
+from datetime import datetime, timedelta, timezone
 import numpy as np
-from tle import load_tle_data, get_satellite_names
-import logging
-from math import sin, cos, sqrt
-from functools import wraps
-
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from tle import tle_catalog, satellite_tle
+from ground_station import get_ground_station
+from streaming import stream_format, stream_response
+from compute_pool import compute_pool, ComputeCancelled
+from jobs import job_manager, JobLimitError, JobResultLimitError
+from coverage import (footprint_rings, footprint_polygons, EARTH_RADIUS_KM, DEFAULT_MIN_ELEVATION,
+                      DEFAULT_FOOTPRINT_POINTS, MIN_FOOTPRINT_POINTS, MAX_FOOTPRINT_POINTS)
+from constellation_engine import ConstellationGrid, geodetic_subpoint, itrs_acceleration
+from log_config import get_logger
+
+logger = get_logger('calculate')
 
 calculate_app = Blueprint('calculate', __name__)
 
 # 全局变量
-satellites = load_tle_data()
 ts = load.timescale()
 
-# 全局缓存字典，键为星座名称，值为(卫星数据, 时间戳)元组
-satellite_cache = {}
-
-# 全局变量用于存储当前的计算进度
-current_progress = {
-    "percentage": 0,
-    "status": "未开始"
-}
-
-def cache_satellites(func):
-    @wraps(func)
-    def wrapper(constellation):
-        current_time = datetime.now()
-        if constellation in satellite_cache:
-            satellites, timestamp = satellite_cache[constellation]
-            # 检查是否是同一天
-            if current_time.date() == timestamp.date():
-                logging.info(f"使用缓存的 {constellation} 星座数据")
-                return satellites
-        
-        # 如果缓存不存在或不是同一天，重新加载数据
-        logging.info(f"重新加载 {constellation} 星座数据")
-        satellites = func(constellation)
-        satellite_cache[constellation] = (satellites, current_time)
-        return satellites
-    return wrapper
-
-def calculate_parameters(lat_ue, lon_ue, alt_ue, satellite_name, time_points, interval, frequency_mhz, constellation):
-    global ts
-    
-    # logging.info(f"开始计算参数: 星座 {constellation}, 卫星 {satellite_name}, {len(time_points)} 个时间点")
-    
-    satellites = load_tle_data(constellation)
-    
-    if not satellites:
-        logging.error(f"无法加载 {constellation} 的 TLE 数据")
-        return {"error": f"无法加载 {constellation} 的 TLE 数据"}
-    
-    satellite = next((sat for sat in satellites if sat.name.strip() == satellite_name.strip()), None)
-    if satellite is None:
-        logging.error(f"在 {constellation} 星座中未找到卫星 {satellite_name}")
-        return {"error": f"在 {constellation} 星座中未找到卫星 {satellite_name}"}
-    
-    # 创建地面站位置
-    ue_location = wgs84.latlon(lat_ue, lon_ue, elevation_m=alt_ue * 1000)
-    # logging.info(f"用户位置: {ue_location}")
-
+# 流式模式下每批计算的时间点数
+STREAM_CHUNK_POINTS = 500
+
+# 星座批量传播时每批的 卫星数×时间点数 上限，控制中间数组的内存占用
+MAX_GRID_POINTS = 200000
+
+# 光速（m/s）
+SPEED_OF_LIGHT = 299792458.0
+
+# 多普勒相关的输出列及保留的小数位数
+DOPPLER_COLUMNS = (
+    ("relative_velocity", 2),
+    ("doppler_shift", 2),
+    ("doppler_rate", 3),
+    ("downlink_frequency", 6),
+    ("uplink_frequency", 6)
+)
+
+# 后台任务分页获取结果时每页的默认和最大条数
+DEFAULT_JOB_PAGE_SIZE = 1000
+MAX_JOB_PAGE_SIZE = 10000
+
+def build_results(satellite_name, time_points, lat_sat, lon_sat, alt_sat, distance, beta,
+                  direction_angle, doppler):
+    """由一颗卫星各时间点的参数数组组装结果列表，doppler 为 calculate_doppler 返回的各列"""
+    alpha = np.round(90 - np.asarray(beta), 2)
+    columns = {
+        "lat_sat": np.round(lat_sat, 6),
+        "lon_sat": np.round(lon_sat, 6),
+        "alt_sat": np.round(alt_sat, 3),
+        "distance": np.round(distance, 3),
+        "alpha": alpha,
+        "beta": np.round(beta, 2),
+        "beta_shuiping": alpha,
+        "direction_angle": np.round(direction_angle, 2)
+    }
+    for key, digits in DOPPLER_COLUMNS:
+        if key in doppler:
+            columns[key] = np.round(doppler[key], digits)
+
+    keys = list(columns)
+    rows = zip(*(columns[key].tolist() for key in keys))
     results = []
-    for i, t in enumerate(time_points):
-        t_sf = ts.from_datetime(t)
-        # 获取卫星位置
-        sat_position = satellite.at(t_sf)
-        
-        # 获取卫星地面点
-        subpoint = sat_position.subpoint()
-        lat_sat, lon_sat, alt_sat = subpoint.latitude.degrees, subpoint.longitude.degrees, subpoint.elevation.km
-        
-        # 计算卫星相对于地站的位置
-        difference = sat_position - ue_location.at(t_sf)
-        distance = difference.distance().km
-
-        # 计算高度角和方位角
-        alt, az, _ = difference.altaz()
-
-        alpha = 90 - alt.degrees
-        beta = alt.degrees
-        beta_shuiping = 90 - beta
-
-        direction_angle = az.degrees
-
-        # 计算下一个时间点的位置（用于计算相对速度）
-        next_t = t + timedelta(seconds=1)
-        next_position = satellite.at(ts.from_datetime(next_t))
-        next_subpoint = next_position.subpoint()
-        next_lat_sat = next_subpoint.latitude.degrees
-        next_lon_sat = next_subpoint.longitude.degrees
-        next_alt_sat = next_subpoint.elevation.km
-
-        # 计算相对速度和多普勒频移
-        relative_velocity, doppler_shift = calculate_doppler(
-            lat_ue, lon_ue, alt_ue, 
-            lat_sat, lon_sat, alt_sat, 
-            next_lat_sat, next_lon_sat, next_alt_sat, 
-            frequency_mhz
-        )
-
-        result = {
-            "time": t.isoformat(),
-            "satellite_name": satellite_name,
-            "lat_sat": round(lat_sat, 6),
-            "lon_sat": round(lon_sat, 6),
-            "alt_sat": round(alt_sat, 3),
-            "distance": round(distance, 3),
-            "alpha": round(alpha, 2),
-            "beta": round(beta, 2),
-            "beta_shuiping": round(beta_shuiping, 2),
-            "direction_angle": round(direction_angle, 2),
-            "relative_velocity": round(relative_velocity, 2),
-            "doppler_shift": round(doppler_shift, 2)
-        }
+    for t, row in zip(time_points, rows):
+        result = {"time": t.isoformat(), "satellite_name": satellite_name}
+        result.update(zip(keys, row))
         results.append(result)
-
-        # if i % 10 == 0:  # 每10个点记录一次日志，避免日志过多
-        #   logging.info(f"计算进度: {i+1}/{len(time_points)}, 时间: {t}, 距离: {distance:.2f}km")
-
-    # logging.info(f"参数计算完成，共 {len(results)} 个结果")
     return results
 
 def calculate_relative_velocity(satellite, ue_location, t):
@@ -136,57 +80,179 @@ def calculate_relative_velocity(satellite, ue_location, t):
     relative_velocity = sat_velocity - ue_velocity
     return np.linalg.norm(relative_velocity)
 
-def to_cartesian_coordinates(r, h, lat, lon):
-    R = r + h  
-    x = R * cos(lat) * cos(lon)
-    y = R * cos(lat) * sin(lon)
-    z = R * sin(lat)
-    return x, y, z
-
-def cartesian_distance(r, h, lat1, lon1, lat2, lon2):
-    x1, y1, z1 = to_cartesian_coordinates(r, 0, lat1, lon1)  
-    x2, y2, z2 = to_cartesian_coordinates(r, h, lat2, lon2)  
-    D = sqrt((x2 - x1)**2 + (y2 - y1)**2 + (z2 - z1)**2)
-    return D
-
-def calculate_doppler(lat_ue, lon_ue, alt_ue, lat_sat1, lon_sat1, alt_sat1, lat_sat2, lon_sat2, alt_sat2, frequency_mhz):
-    # 将频率从 MHz 转换为 Hz
+def calculate_doppler(range_rate, frequency_mhz, range_acceleration=None, options=None):
+    """由距离变化率（km/s，远离为正）计算相对速度和多普勒频移，支持数组
+
+    Args:
+        range_rate: 卫星相对地站的距离变化率，即视线方向单位矢量与相对速度的点积
+        frequency_mhz: 下行（卫星发射）频率（MHz）
+        range_acceleration: 距离二阶变化率（km/s²），给出时计算多普勒变化率
+        options: precompensation 为真时给出预补偿频率，uplink_frequency 为上行标称频率（MHz，默认同下行）
+
+    Returns:
+        各列组成的字典：relative_velocity（m/s，接近为正）、doppler_shift（Hz），
+        可选 doppler_rate（Hz/s）、downlink_frequency / uplink_frequency（MHz）
+    """
+    options = options or {}
     frequency_hz = frequency_mhz * 1e6
+    beta_los = np.asarray(range_rate) * 1000.0 / SPEED_OF_LIGHT
+
+    v_relative = -1000.0 * np.asarray(range_rate)  # 转换为 m/s
+    doppler = {
+        "relative_velocity": v_relative,
+        "doppler_shift": -beta_los * frequency_hz
+    }
+
+    if range_acceleration is not None:
+        doppler["doppler_rate"] = -1000.0 * np.asarray(range_acceleration) / SPEED_OF_LIGHT * frequency_hz
+
+    if options.get('precompensation'):
+        uplink_mhz = options.get('uplink_frequency') or frequency_mhz
+        # 下行：地面应接收的频率；上行：地面应发射的频率，使卫星收到标称频率
+        doppler["downlink_frequency"] = frequency_mhz * (1.0 - beta_los)
+        doppler["uplink_frequency"] = uplink_mhz / (1.0 - beta_los)
+
+    return doppler
+
+def calculate_footprints(tles, time, min_elevation=DEFAULT_MIN_ELEVATION, points=DEFAULT_FOOTPRINT_POINTS):
+    """进程池任务：计算一组卫星在 time 时刻的覆盖区，返回每颗卫星的星下点和覆盖多边形"""
+    grid = ConstellationGrid(tles)
+    xyz, _, errors = grid.itrs_states(ts, time, np.zeros(1))
+    valid = errors[:, 0] == 0
+    lat, lon, alt = geodetic_subpoint(xyz[:, valid, 0])
+    ring_lat, ring_lon, angle = footprint_rings(lat, lon, alt, min_elevation, points)
+    polygons = footprint_polygons(ring_lat, ring_lon, angle, lat)
+
+    names = [name for name, ok in zip(grid.names, valid) if ok]
+    return [
+        {
+            "satellite_name": name,
+            "lat": round(float(lat[i]), 4),
+            "lon": round(float(lon[i]), 4),
+            "alt": round(float(alt[i]), 3),
+            "radius_km": round(float(angle[i]) * EARTH_RADIUS_KM, 1),
+            "footprint": {"type": "MultiPolygon", "coordinates": polygons[i]}
+        }
+        for i, name in enumerate(names)
+    ]
+
+def calculate_coverage(satellites, time, min_elevation=DEFAULT_MIN_ELEVATION, points=DEFAULT_FOOTPRINT_POINTS):
+    """计算多颗卫星在同一时刻的覆盖区（按批在计算进程池中执行）"""
+    footprints = []
+    for tles in satellite_blocks(satellites, MAX_GRID_POINTS // points):
+        footprints.extend(compute_pool.run(calculate_footprints, tles, time, min_elevation, points))
+    return footprints
+
+def calculate_constellation(lat_ue, lon_ue, alt_ue, tles, start_time, end_time, interval_seconds, frequency_mhz,
+                            options=None):
+    """进程池任务：一批卫星×整个时间网格一次传播计算，返回 [(卫星名称, 结果列表)]
+
+    tles 为 (名称, 第一行, 第二行) 列表，批量大小由调用方按 MAX_GRID_POINTS 控制。
+    options 见 calculate_doppler。
+    """
+    options = options or {}
+    grid = ConstellationGrid(tles)
+    count = int((end_time - start_time).total_seconds() // interval_seconds) + 1
+    offsets = np.arange(count) * float(interval_seconds)
+    time_points = [start_time + timedelta(seconds=k * interval_seconds) for k in range(count)]
+    ue_location = get_ground_station(lat_ue, lon_ue, alt_ue * 1000)
+
+    # ITRS位置和速度，形状 (3, 卫星数, 时间点数)；多普勒直接由SGP4速度求出，无需再传播 t+1 秒
+    xyz, velocity, _ = grid.itrs_states(ts, start_time, offsets)
+    acceleration = itrs_acceleration(xyz, velocity) if options.get('doppler_rate') else None
+
+    lat_sat, lon_sat, alt_sat = geodetic_subpoint(xyz)
+    direction_angle, beta, distance, range_rate, range_acceleration = ue_location.itrs_range_rates(
+        xyz, velocity, acceleration
+    )
+    doppler = calculate_doppler(range_rate, frequency_mhz, range_acceleration, options)
+
+    return [
+        (name, build_results(name, time_points, lat_sat[i], lon_sat[i], alt_sat[i], distance[i], beta[i],
+                             direction_angle[i], {key: column[i] for key, column in doppler.items()}))
+        for i, name in enumerate(grid.names)
+    ]
+
+def satellite_blocks(satellites, block_size):
+    """按批划分卫星，每批为可提交进程池的TLE列表"""
+    block_size = max(1, int(block_size))
+    for index in range(0, len(satellites), block_size):
+        yield [satellite_tle(sat) for sat in satellites[index:index + block_size]]
+
+def iter_time_points(start_time, end_time, interval_seconds, chunk_size):
+    """按批生成时间点列表，不一次性构造整个时间窗口"""
+    chunk = []
+    current_time = start_time
+    while current_time <= end_time:
+        chunk.append(current_time)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+        current_time += timedelta(seconds=interval_seconds)
+    if chunk:
+        yield chunk
+
+def iter_calculation_records(lat_ue, lon_ue, alt_ue, satellite_names, start_time, end_time,
+                             interval_seconds, frequency_mhz, constellation, options=None):
+    """逐批生成计算结果记录（流式响应使用），内存占用与时间窗口长度无关
+
+    多颗卫星按批整体传播，同一批内各卫星的结果记录按时间分段交替输出。
+    """
+    catalog = tle_catalog.get(constellation)
+    if not catalog:
+        yield {"type": "error", "error": f"无法加载 {constellation} 的 TLE 数据"}
+        return
+
+    total_satellites = len(satellite_names)
+    yield {
+        "type": "meta",
+        "constellation": constellation,
+        "satelliteCount": total_satellites,
+        "startTime": start_time.isoformat(),
+        "endTime": end_time.isoformat(),
+        "interval": interval_seconds
+    }
+
+    # 未找到的卫星先报错，其余按批整体传播
+    selected = []
+    for sat_name in satellite_names:
+        satellite = catalog.get(sat_name)
+        if satellite is None:
+            yield {"type": "error", "satellite_name": sat_name,
+                   "error": f"在 {constellation} 星座中未找到卫星 {sat_name}"}
+        else:
+            selected.append(satellite)
+
+    result_count = 0
+    done = total_satellites - len(selected)
+    for tles in satellite_blocks(selected, MAX_GRID_POINTS // STREAM_CHUNK_POINTS):
+        try:
+            for time_points in iter_time_points(start_time, end_time, interval_seconds, STREAM_CHUNK_POINTS):
+                block_results = compute_pool.run(
+                    calculate_constellation,
+                    lat_ue, lon_ue, alt_ue,
+                    tles, time_points[0], time_points[-1],
+                    interval_seconds,
+                    frequency_mhz,
+                    options
+                )
+                for sat_name, results in block_results:
+                    result_count += len(results)
+                    yield {"type": "results", "satellite_name": sat_name, "results": results}
+        except Exception as e:
+            logger.error(f"处理卫星 {tles[0][0]} 等{len(tles)}颗时出错: {str(e)}")
+            for name, _, _ in tles:
+                yield {"type": "error", "satellite_name": name, "error": str(e)}
 
-    # 计算两个时刻的距离
-    D1 = cartesian_distance(6371, alt_sat1, np.radians(lat_ue), np.radians(lon_ue), np.radians(lat_sat1), np.radians(lon_sat1))
-    D2 = cartesian_distance(6371, alt_sat2, np.radians(lat_ue), np.radians(lon_ue), np.radians(lat_sat2), np.radians(lon_sat2))
-    
-    # 计算相对速度（1秒内的位移）
-    v_relative = -1000 * (D2 - D1)  # 转换为 m/s
-    
-    # 计算多普勒频移
-    c = 299792458  # 光速，单位：m/s
-    doppler_shift = (v_relative / c) * frequency_hz
-    
-    return v_relative, doppler_shift
+        done += len(tles)
+        progress_percentage = round(done / total_satellites * 100, 1)
+        yield {"type": "progress", "percentage": progress_percentage, "satellite_name": tles[-1][0]}
 
-def calculate_coverage(satellite, time, lat_ue, lon_ue):
-    ts = load.timescale()
-    t = ts.from_datetime(time)
-    geocentric = satellite.at(t)
-    subpoint = wgs84.subpoint(geocentric)
-    
-    # 假设卫星覆盖范围为地球表面的一个圆
-    # 这里使用一个简化的模型，实际情况可更复杂
-    coverage_radius = 2000  # 假设覆盖半径为2000km
-    
-    coverage_points = []
-    for angle in np.linspace(0, 2*np.pi, 100):
-        lat = subpoint.latitude.degrees + np.cos(angle) * (coverage_radius / 111)  # 1度约等于111km
-        lon = subpoint.longitude.degrees + np.sin(angle) * (coverage_radius / (111 * np.cos(np.radians(subpoint.latitude.degrees))))
-        coverage_points.append({"lat": lat, "lon": lon})
-    
-    return coverage_points
+    logger.info(f"流式计算完成: 共{result_count}个结果")
+    yield {"type": "end", "resultCount": result_count}
 
 @calculate_app.route('/calculate', methods=['POST'])
 def calculate():
-    global current_progress
     data = request.json
     
     lat_ue = data.get('lat_ue')
@@ -198,6 +264,12 @@ def calculate():
     frequency_mhz = data.get('frequency')
     constellation = data.get('constellation', 'IRIDIUM')
     show_all = data.get('show_cover', False)  # 新增参数,用于判断是否计算所有卫星
+    # 可选输出：多普勒变化率、上下行预补偿频率（uplink_frequency 为上行标称频率，默认同 frequency）
+    doppler_options = {
+        'doppler_rate': bool(data.get('doppler_rate', False)),
+        'precompensation': bool(data.get('precompensation', False)),
+        'uplink_frequency': data.get('uplink_frequency')
+    }
 
     # 检查必要字段
     required_fields = ['lat_ue', 'lon_ue', 'alt_ue', 'start_time', 'end_time', 'interval', 'frequency']
@@ -205,7 +277,7 @@ def calculate():
     
     if missing_fields:
         error_message = f"缺少必要字段: {', '.join(missing_fields)}"
-        logging.error(error_message)
+        logger.error(error_message)
         return jsonify({"error": error_message}), 400
 
     try:
@@ -213,99 +285,228 @@ def calculate():
         start_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
         end_time = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
         interval_seconds = int(interval)
+        if interval_seconds <= 0:
+            return jsonify({"error": "interval必须为正整数"}), 400
+        if end_time < start_time:
+            return jsonify({"error": "end_time不能早于start_time"}), 400
+        try:
+            frequency_mhz = float(frequency_mhz)
+            if doppler_options['uplink_frequency'] is not None:
+                doppler_options['uplink_frequency'] = float(doppler_options['uplink_frequency'])
+        except (TypeError, ValueError):
+            return jsonify({"error": "frequency和uplink_frequency必须为数字（MHz）"}), 400
+        
+        fmt = stream_format(request)
         
-        time_points = []
-        current_time = start_time
-        while current_time <= end_time:
-            time_points.append(current_time)
-            current_time += timedelta(seconds=interval_seconds)
-
         # 获取需要计算的卫星列表
+        catalog = tle_catalog.get(constellation)
         if show_all:
-            satellites = load_tle_data(constellation)
-            if not satellites:
+            if not catalog:
                 return jsonify({"error": f"无法加载{constellation}星座数据"}), 400
-            satellite_names = [sat.name.strip() for sat in satellites]
-            logging.info(f"计算所有卫星: {constellation}星座, 共{len(satellite_names)}颗")
+            satellite_names = list(catalog.names)
+            logger.info(f"计算所有卫星: {constellation}星座, 共{len(satellite_names)}颗")
         else:
             satellite_name = data.get('satellite_name')
             if not satellite_name:
                 return jsonify({"error": "未指定卫星名称"}), 400
             satellite_names = [satellite_name]
-            logging.info(f"计算单个卫星: {satellite_names[0]}")
-
-        # 存储所有卫星的计算结果
-        all_results = []
-        total_satellites = len(satellite_names)
-        
-        # 对每个卫星进行计算
-        for index, sat_name in enumerate(satellite_names):
-            try:
-                # 更新进度状态
-                current_progress["status"] = f"计算卫星 {sat_name}"
-                
-                results = calculate_parameters(
-                    lat_ue, lon_ue, alt_ue,
-                    sat_name, time_points,
-                    interval_seconds,
-                    frequency_mhz,
-                    constellation
-                )
-                
-                # 检查计算结果
-                if isinstance(results, dict) and 'error' in results:
-                    logging.warning(f"计算卫星 {sat_name} 时出错: {results['error']}")
-                    continue
-                    
-                # 为每个结果添加卫星名称
-                for result in results:
-                    result['satellite_name'] = sat_name
-                
-                all_results.extend(results)
-                
-                # 计算并记录进度百分比，保留小数点后1位
-                progress_percentage = ((index + 1) / total_satellites) * 100
-                current_progress["percentage"] = round(progress_percentage, 1)
-                logging.info(f"计算进度: {progress_percentage:.1f}%")
-
-            except Exception as e:
-                logging.error(f"处理卫星 {sat_name} 时出错: {str(e)}")
-                continue
-
-        # 计算完成后更新状态
-        current_progress["status"] = "完成"
-        current_progress["percentage"] = 100
-
-        if not all_results:
-            return jsonify({"error": "没有有效的计算结果"}), 400
-
-        logging.info(f"计算完成: 共{len(all_results)}个结果")
-        return jsonify({"results": all_results})
+            logger.info(f"计算单个卫星: {satellite_names[0]}")
+
+        # 流式模式：逐卫星、逐批输出结果
+        if fmt:
+            return stream_response(
+                iter_calculation_records(lat_ue, lon_ue, alt_ue, satellite_names, start_time, end_time,
+                                         interval_seconds, frequency_mhz, constellation, doppler_options),
+                fmt
+            )
+
+        selected = []
+        for sat_name in satellite_names:
+            satellite = catalog.get(sat_name) if catalog else None
+            if satellite is None:
+                logger.warning(f"在 {constellation} 星座中未找到卫星 {sat_name}")
+            else:
+                selected.append(satellite)
+
+        # 结果行数超过单个任务上限的请求直接拒绝
+        point_count = int((end_time - start_time).total_seconds() // interval_seconds) + 1
+        if point_count * len(selected) > job_manager.max_job_results:
+            return jsonify({"error": f"结果行数 {point_count * len(selected)} 超过上限 {job_manager.max_job_results}，"
+                                     f"请缩短时间范围、增大interval或减少卫星数"}), 400
+
+        # 提交后台任务，立即返回任务ID，进度和结果通过 /jobs/<job_id> 查询
+        def run(job):
+            run_calculation_job(job, lat_ue, lon_ue, alt_ue, selected, start_time, end_time,
+                                interval_seconds, frequency_mhz, doppler_options)
+
+        description = f"{constellation} {len(satellite_names)}颗卫星 {start_time.isoformat()} ~ {end_time.isoformat()}"
+        try:
+            job = job_manager.submit(run, description, total=len(satellite_names))
+        except JobLimitError as e:
+            return jsonify({"error": str(e)}), 429
+        job.advance(len(satellite_names) - len(selected))
+
+        return jsonify({
+            "jobId": job.id,
+            "status": job.status,
+            "statusUrl": url_for('calculate.get_job', job_id=job.id),
+            "cancelUrl": url_for('calculate.cancel_job', job_id=job.id)
+        }), 202
 
     except Exception as e:
         error_message = f"计算过程出错: {str(e)}"
-        logging.error(error_message)
-        current_progress["status"] = "出错"
+        logger.error(error_message)
         return jsonify({"error": error_message}), 500
 
+def run_calculation_job(job, lat_ue, lon_ue, alt_ue, satellites, start_time, end_time,
+                        interval_seconds, frequency_mhz, doppler_options):
+    """后台任务：按批计算各卫星的参数，每批结束后更新进度并检查取消请求"""
+    point_count = int((end_time - start_time).total_seconds() // interval_seconds) + 1
+
+    # 整个星座只解析一次TLE，按批对 卫星×时间 网格整体传播（在计算进程池中执行，不占用服务进程的GIL）
+    for tles in satellite_blocks(satellites, MAX_GRID_POINTS // point_count):
+        job.check_cancelled()
+        job.message = f"计算卫星 {tles[0][0]} 等{len(tles)}颗"
+        try:
+            block_results = compute_pool.run(
+                calculate_constellation,
+                lat_ue, lon_ue, alt_ue,
+                tles,
+                start_time, end_time,
+                interval_seconds,
+                frequency_mhz,
+                doppler_options,
+                cancel_event=job.cancel_event
+            )
+            for _, results in block_results:
+                job.add_results(results)
+        except (ComputeCancelled, JobResultLimitError):
+            raise
+        except Exception as e:
+            logger.error(f"处理卫星 {tles[0][0]} 等{len(tles)}颗时出错: {str(e)}")
+
+        job.advance(len(tles))
+        logger.info(f"任务 {job.id} 计算进度: {job.done}/{job.total}")
+
+    if not job.results:
+        raise RuntimeError("没有有效的计算结果")
+    logger.info(f"计算完成: 共{len(job.results)}个结果")
+
+def job_response(job):
+    """任务状态及一页结果（offset/limit 查询参数）"""
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(MAX_JOB_PAGE_SIZE, max(1, int(request.args.get('limit', DEFAULT_JOB_PAGE_SIZE))))
+    except ValueError:
+        return jsonify({"error": "offset/limit必须为整数"}), 400
+
+    response = job.to_dict()
+    results = job.get_results(offset, limit)
+    next_offset = offset + len(results)
+    response.update({
+        "offset": offset,
+        "limit": limit,
+        "results": results,
+        # 任务未结束时后续结果可能还会增加
+        "nextOffset": next_offset if next_offset < response["resultCount"] or not job.is_finished else None
+    })
+    return jsonify(response)
+
+@calculate_app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """列出保留中的任务（不含结果）"""
+    return jsonify({"jobs": job_manager.list(), "stats": job_manager.get_stats()})
+
+@calculate_app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """任务进度、预计剩余时间和分页结果"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "任务不存在或已过期"}), 404
+    return job_response(job)
+
+@calculate_app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消任务：排队中的直接取消，运行中的终止当前计算"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "任务不存在或已过期"}), 404
+    return jsonify(job.to_dict())
+
+@calculate_app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """取消并删除任务，释放结果"""
+    job = job_manager.remove(job_id)
+    if job is None:
+        return jsonify({"error": "任务不存在或已过期"}), 404
+    return jsonify({"success": True, "jobId": job_id})
+
+@calculate_app.route('/coverage', methods=['POST'])
+def coverage():
+    """整个星座（或指定卫星）在某一时刻的覆盖区
+
+    可选参数：time（默认当前时间）、min_elevation（最低仰角，度）、
+    resolution（每个覆盖区的边界点数）、satellite_names（默认整个星座）
+    """
+    data = request.json or {}
+    constellation = data.get('constellation', 'IRIDIUM')
+
+    try:
+        time = data.get('time')
+        time = datetime.fromisoformat(time.replace('Z', '+00:00')) if time else datetime.now(timezone.utc)
+        if time.tzinfo is None:
+            time = time.replace(tzinfo=timezone.utc)
+        min_elevation = float(data.get('min_elevation', DEFAULT_MIN_ELEVATION))
+        points = int(data.get('resolution', DEFAULT_FOOTPRINT_POINTS))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"参数错误: {str(e)}"}), 400
+    if not 0 <= min_elevation < 90:
+        return jsonify({"error": "min_elevation必须在0到90度之间"}), 400
+    points = min(MAX_FOOTPRINT_POINTS, max(MIN_FOOTPRINT_POINTS, points))
+
+    catalog = tle_catalog.get(constellation)
+    if not catalog:
+        return jsonify({"error": f"无法加载{constellation}星座数据"}), 400
+    satellite_names = data.get('satellite_names') or catalog.names
+    satellites = [catalog.get(name) for name in satellite_names]
+    missing = [name for name, sat in zip(satellite_names, satellites) if sat is None]
+    satellites = [sat for sat in satellites if sat is not None]
+
+    try:
+        footprints = calculate_coverage(satellites, time, min_elevation, points)
+    except Exception as e:
+        error_message = f"覆盖区计算出错: {str(e)}"
+        logger.error(error_message)
+        return jsonify({"error": error_message}), 500
+
+    return jsonify({
+        "constellation": constellation,
+        "time": time.isoformat(),
+        "min_elevation": min_elevation,
+        "resolution": points,
+        "satellites": footprints,
+        "missing": missing
+    })
+
 @calculate_app.route('/get_satellites', methods=['GET'])
 def get_satellites():
-    global satellites
-    if satellites is None:
-        satellites = load_tle_data()
-    sat_names = get_satellite_names(satellites)
+    catalog = tle_catalog.get()
+    sat_names = list(catalog.names) if catalog else []
     return jsonify(sat_names)
 
 def clear_satellite_cache(constellation=None):
-    global satellite_cache
+    tle_catalog.invalidate(constellation)
     if constellation:
-        satellite_cache.pop(constellation, None)
-        logging.info(f"已清除 {constellation} 星座的缓存")
+        logger.info(f"已清除 {constellation} 星座的缓存")
     else:
-        satellite_cache.clear()
-        logging.info("已清除所有星座的缓存")
+        logger.info("已清除所有星座的缓存")
 
 @calculate_app.route('/progress', methods=['GET'])
 def get_progress():
-    """返回当前的计算进度"""
-    return jsonify(current_progress)
+    """返回最近提交的计算任务的进度（兼容旧接口，新客户端请使用 /jobs/<job_id>）"""
+    job = job_manager.latest()
+    if job is None:
+        return jsonify({"percentage": 0, "status": "未开始"})
+    progress = job.to_dict()
+    return jsonify({"percentage": progress["progress"]["percentage"], "status": progress["message"],
+                    "jobId": job.id})
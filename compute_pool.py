@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+计算进程池
+
+过境搜索、详细轨迹和整星座参数计算等CPU密集任务提交到独立的工作进程执行，
+请求线程只等待结果（等待期间不持有GIL），跟踪线程的指令周期不受API负载影响。
+
+- 工作进程用spawn方式启动，不继承服务进程的线程、锁和串口；启动时降低调度优先级
+- 任务参数只包含TLE、地面站和时间等可序列化数据，任务函数必须是模块顶层函数
+- 任务可设置超时、可通过Event取消：排队中的任务直接撤销，已在运行的任务
+  通过重启进程池终止，同时在运行的其他任务会在新进程池中重试一次
+- 进程池未启用或无法启动时退回到在调用线程中直接计算
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, CancelledError, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger('api')
+
+DEFAULT_WORKERS = max(1, min(2, (os.cpu_count() or 2) - 1))  # 至少给跟踪线程和请求线程留一个核
+DEFAULT_TASK_TIMEOUT = 60.0
+DEFAULT_NICE = 10
+POLL_INTERVAL = 0.1   # 等待结果时检查取消标志的间隔（秒）
+
+
+class ComputeTimeout(RuntimeError):
+    """计算任务超时"""
+
+
+class ComputeCancelled(RuntimeError):
+    """计算任务被取消"""
+
+
+def _init_worker(nice: int):
+    """工作进程初始化：降低优先级，忽略Ctrl+C（由服务进程统一关闭进程池）"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if nice and hasattr(os, 'nice'):
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+class ComputePool:
+    """带超时、取消和自动重启的进程池"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, task_timeout: float = DEFAULT_TASK_TIMEOUT,
+                 nice: int = DEFAULT_NICE, enabled: bool = True):
+        self.workers = workers
+        self.task_timeout = task_timeout
+        self.nice = nice
+        self.enabled = enabled
+        self._executor = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.inline = 0
+
+    def configure(self, workers: Optional[int] = None, task_timeout: Optional[float] = None,
+                  nice: Optional[int] = None, enabled: Optional[bool] = None):
+        """更新参数（在首次提交任务前调用；已启动的进程池会被关闭，下次提交时按新参数启动）"""
+        with self._lock:
+            if workers is not None:
+                self.workers = max(1, int(workers))
+            if task_timeout is not None:
+                self.task_timeout = float(task_timeout)
+            if nice is not None:
+                self.nice = int(nice)
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            self._shutdown_locked()
+
+    def _get_executor(self):
+        """获取进程池，未启动时启动（调用方不持有锁）"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.nice,)
+                )
+                self._generation += 1
+                logger.info("计算进程池已启动: %d 个工作进程", self.workers)
+            return self._executor, self._generation
+
+    def _shutdown_locked(self, kill: bool = False):
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        if kill:
+            # 终止正在运行的任务：直接结束工作进程
+            for process in list((getattr(executor, '_processes', None) or {}).values()):
+                try:
+                    process.terminate()
+                except Exception:
+                    pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, generation: int):
+        """终止指定代的进程池（其他线程已重启过时不重复重启）"""
+        with self._lock:
+            if self._executor is None or generation != self._generation:
+                return
+            self._shutdown_locked(kill=True)
+            self.restarts += 1
+        logger.warning("计算进程池已重启以终止超时或取消的任务")
+
+    def run(self, func: Callable, *args, timeout: Optional[float] = None,
+            cancel_event: Optional[threading.Event] = None, **kwargs):
+        """在进程池中执行 func(*args, **kwargs) 并等待结果
+
+        Raises:
+            ComputeTimeout: 超过 timeout（默认 task_timeout）秒未完成
+            ComputeCancelled: cancel_event 被置位
+            任务本身抛出的异常原样抛出
+        """
+        if not self.enabled:
+            self.inline += 1
+            return func(*args, **kwargs)
+
+        timeout = self.task_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout if timeout else None
+
+        for attempt in range(2):
+            try:
+                executor, generation = self._get_executor()
+                future = executor.submit(func, *args, **kwargs)
+            except Exception as e:
+                # 进程池无法启动（如受限环境不允许创建进程）时退回到本线程计算
+                logger.warning("计算进程池不可用，改为本线程计算: %s", e)
+                self.enabled = False
+                self.inline += 1
+                return func(*args, **kwargs)
+            self.submitted += 1
+
+            try:
+                return self._wait(future, generation, deadline, cancel_event)
+            except BrokenProcessPool:
+                # 进程池被其他任务的超时/取消重启，或工作进程异常退出：重试一次
+                self._restart(generation)
+                if attempt:
+                    self.failed += 1
+                    raise
+                logger.info("计算进程池已重启，任务重试")
+
+    def _wait(self, future, generation: int, deadline: Optional[float],
+              cancel_event: Optional[threading.Event]):
+        while True:
+            wait = POLL_INTERVAL if cancel_event is not None else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                wait = remaining if wait is None else min(wait, remaining)
+                if wait <= 0:
+                    self.timeouts += 1
+                    self._abort(future, generation)
+                    raise ComputeTimeout('计算超时')
+            try:
+                result = future.result(timeout=wait)
+            except FutureTimeoutError:
+                if cancel_event is not None and cancel_event.is_set():
+                    self.cancelled += 1
+                    self._abort(future, generation)
+                    raise ComputeCancelled('计算已取消')
+                continue
+            except CancelledError:
+                raise BrokenProcessPool('任务在进程池重启时被撤销')
+            except BrokenProcessPool:
+                raise
+            except Exception:
+                self.failed += 1
+                raise
+            self.completed += 1
+            return result
+
+    def _abort(self, future, generation: int):
+        """撤销任务：排队中的直接撤销，已在运行的重启进程池终止"""
+        if not future.cancel():
+            self._restart(generation)
+
+    def shutdown(self):
+        """关闭进程池（服务退出时调用）"""
+        with self._lock:
+            self._shutdown_locked(kill=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'running': self._executor is not None,
+            'workers': self.workers,
+            'task_timeout': self.task_timeout,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'cancelled': self.cancelled,
+            'restarts': self.restarts,
+            'inline': self.inline
+        }
+
+
+# 服务进程共享的进程池实例（首次提交任务时启动）
+compute_pool = ComputePool()
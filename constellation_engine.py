@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+星座批量传播
+
+整个星座只解析一次TLE，用sgp4的SatrecArray对 卫星×时间 网格一次性传播，
+再直接由TEME坐标经GMST1982旋转得到ITRS坐标（与skyfield的TEME→ITRS结果一致，
+不经过GCRS，也不需要岁差章动计算），由ITRS坐标批量计算星下点和方位角/仰角，
+由SGP4给出的速度计算距离变化率（多普勒）。
+"""
+
+from datetime import datetime
+from typing import Sequence, Tuple
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+from skyfield.sgp4lib import theta_GMST1982
+
+DAY_S = 86400.0
+EARTH_MU = 398600.4418            # 地球引力常数（km³/s²）
+EARTH_ROTATION_RATE = 7.2921151467e-5  # 地球自转角速度（rad/s）
+
+# 与skyfield的 iers2010.subpoint() 使用相同的椭球
+IERS2010_RADIUS_KM = 6378.1366
+IERS2010_INVERSE_FLATTENING = 298.25642
+_F = 1.0 / IERS2010_INVERSE_FLATTENING
+_E2 = 2.0 * _F - _F * _F
+
+
+class ConstellationGrid:
+    """一组卫星的SatrecArray，按名称索引"""
+
+    def __init__(self, tles: Sequence[Tuple[str, str, str]]):
+        """tles 为 (名称, 第一行, 第二行) 列表"""
+        self.names = [name.strip() for name, _, _ in tles]
+        self.satrec_list = [Satrec.twoline2rv(line1, line2) for _, line1, line2 in tles]
+        self.satrecs = SatrecArray(self.satrec_list)
+
+    def __len__(self):
+        return len(self.names)
+
+    def itrs_states(self, ts, start_time: datetime, offsets: np.ndarray):
+        """计算所有卫星在 start_time + offsets（秒）各时刻的ITRS位置和速度
+
+        Returns:
+            (xyz, velocity, errors)：xyz（km）和 velocity（km/s，地固系下的速度）
+            形状均为 (3, 卫星数, 时间点数)；errors 为SGP4错误码，形状为 (卫星数, 时间点数)，
+            非零表示该点无效
+        """
+        offsets_days = np.asarray(offsets, dtype=float) / DAY_S
+        jd, fr = _julian_date(start_time)
+        errors, r, v = self.satrecs.sgp4(np.full(offsets_days.shape, jd), fr + offsets_days)
+        xyz, velocity = _teme_to_itrs(ts, start_time, offsets_days, r, v)
+        return xyz, velocity, errors
+
+    def itrs_positions(self, ts, index: int, start_time: datetime, offsets: np.ndarray) -> np.ndarray:
+        """计算第 index 颗卫星在 start_time + offsets（秒）各时刻的ITRS位置（km），形状 (3, 时间点数)
+
+        只传播一颗卫星，用于对单颗卫星的事件时刻求根。
+        """
+        offsets_days = np.atleast_1d(np.asarray(offsets, dtype=float)) / DAY_S
+        jd, fr = _julian_date(start_time)
+        _, r, _ = self.satrec_list[index].sgp4_array(np.full(offsets_days.shape, jd), fr + offsets_days)
+        return _teme_to_itrs(ts, start_time, offsets_days, r)[0]
+
+
+def _julian_date(start_time: datetime) -> Tuple[float, float]:
+    """SGP4使用UTC儒略日（TLE历元为UTC）"""
+    return jday(start_time.year, start_time.month, start_time.day, start_time.hour,
+                start_time.minute, start_time.second + start_time.microsecond / 1e6)
+
+
+def _teme_to_itrs(ts, start_time: datetime, offsets_days: np.ndarray, r: np.ndarray, v: np.ndarray = None):
+    """TEME→ITRS：绕z轴旋转GMST1982角（不计极移，与skyfield默认一致），返回(xyz, velocity)，未给出v时速度为None"""
+    t0 = ts.from_datetime(start_time)
+    t = ts.tt_jd(t0.whole, t0.tt_fraction + offsets_days)
+    theta, theta_dot = theta_GMST1982(t.whole, t.ut1_fraction)
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+    xyz = np.array([
+        cos_theta * r[..., 0] + sin_theta * r[..., 1],
+        -sin_theta * r[..., 0] + cos_theta * r[..., 1],
+        r[..., 2]
+    ])
+    if v is None:
+        return xyz, None
+    # 地固系速度需扣除地球自转引起的牵连速度 ω×r
+    omega = theta_dot / DAY_S
+    velocity = np.array([
+        cos_theta * v[..., 0] + sin_theta * v[..., 1] + omega * xyz[1],
+        -sin_theta * v[..., 0] + cos_theta * v[..., 1] - omega * xyz[0],
+        v[..., 2]
+    ])
+    return xyz, velocity
+
+
+def itrs_acceleration(xyz: np.ndarray, velocity: np.ndarray) -> np.ndarray:
+    """地固系中卫星的加速度（km/s²）：二体引力加上科里奥利力和离心力
+
+    忽略J2等摄动（约为中心引力的千分之一），用于由距离二阶变化率计算多普勒变化率。
+    """
+    x, y, z = xyz
+    vx, vy, _ = velocity
+    r3 = np.sqrt(x * x + y * y + z * z) ** 3
+    gravity = -EARTH_MU / r3
+    omega2 = EARTH_ROTATION_RATE * EARTH_ROTATION_RATE
+    return np.array([
+        gravity * x + 2.0 * EARTH_ROTATION_RATE * vy + omega2 * x,
+        gravity * y - 2.0 * EARTH_ROTATION_RATE * vx + omega2 * y,
+        gravity * z
+    ])
+
+
+def geodetic_subpoint(xyz: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """由ITRS坐标（km，首维为xyz）计算星下点纬度、经度（度）和高度（km）
+
+    迭代方法与skyfield的 Geoid 相同，结果与 iers2010.subpoint() 一致。
+    """
+    x, y, z = xyz
+    R = np.sqrt(x * x + y * y)
+    lat = np.arctan2(z, R)
+    for _ in range(3):
+        e2_sin_lat = _E2 * np.sin(lat)
+        aC = IERS2010_RADIUS_KM / np.sqrt(1.0 - e2_sin_lat * np.sin(lat))
+        hyp = z + aC * e2_sin_lat
+        lat = np.arctan2(hyp, R)
+    lon = (np.arctan2(y, x) - np.pi) % (2 * np.pi) - np.pi
+    height = np.sqrt(hyp * hyp + R * R) - aC
+    return np.degrees(lat), np.degrees(lon), height
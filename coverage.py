@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卫星覆盖区计算
+
+由星下点高度和最低仰角门限计算每颗卫星的可见圆（地心角半径），
+在球面上按方位角等间隔取点（大圆目的点公式），所有卫星一次性向量化计算。
+输出GeoJSON顺序（[经度, 纬度]）的多边形：
+- 经度沿边界连续展开后再按 [-180, 180] 切分，跨越180°经线的覆盖区拆成两块
+- 覆盖区包含极点时经度跨满360°，从-180°起排列并经极点闭合为一个多边形
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088   # 平均地球半径（球面模型）
+
+DEFAULT_MIN_ELEVATION = 10.0
+DEFAULT_FOOTPRINT_POINTS = 72
+MIN_FOOTPRINT_POINTS = 8
+MAX_FOOTPRINT_POINTS = 720
+
+
+def coverage_angle(alt_km, min_elevation: float = DEFAULT_MIN_ELEVATION) -> np.ndarray:
+    """可见圆的地心角半径（弧度）：λ = arccos(R·cosε / (R+h)) − ε"""
+    elevation = np.radians(min_elevation)
+    ratio = EARTH_RADIUS_KM * np.cos(elevation) / (EARTH_RADIUS_KM + np.maximum(np.asarray(alt_km, dtype=float), 0.0))
+    return np.maximum(np.arccos(np.clip(ratio, -1.0, 1.0)) - elevation, 0.0)
+
+
+def footprint_rings(lat, lon, alt_km, min_elevation: float = DEFAULT_MIN_ELEVATION,
+                    points: int = DEFAULT_FOOTPRINT_POINTS):
+    """计算所有卫星覆盖区边界点
+
+    Returns:
+        (ring_lat, ring_lon, angle)：ring_lat/ring_lon 形状为 (卫星数, points)，度；
+        ring_lon 沿边界连续展开（可能超出 ±180）；angle 为地心角半径（弧度）
+    """
+    lat1 = np.radians(np.asarray(lat, dtype=float))[:, None]
+    lon1 = np.asarray(lon, dtype=float)[:, None]
+    angle = coverage_angle(alt_km, min_elevation)
+    delta = angle[:, None]
+    bearing = np.linspace(0.0, 2 * np.pi, int(points), endpoint=False)[None, :]
+
+    sin_lat2 = np.clip(np.sin(lat1) * np.cos(delta) + np.cos(lat1) * np.sin(delta) * np.cos(bearing), -1.0, 1.0)
+    dlon = np.arctan2(np.sin(bearing) * np.sin(delta) * np.cos(lat1), np.cos(delta) - np.sin(lat1) * sin_lat2)
+    ring_lon = lon1 + np.degrees(np.unwrap(dlon, axis=1))
+    return np.degrees(np.arcsin(sin_lat2)), ring_lon, angle
+
+
+def _clip(ring: List, lon_min: float, lon_max: float) -> List:
+    """Sutherland–Hodgman：把多边形裁剪到经度区间内（ring 为 [经度, 纬度] 列表，不重复首点）"""
+    for bound, inside in ((lon_min, lambda p: p[0] >= lon_min), (lon_max, lambda p: p[0] <= lon_max)):
+        if not ring:
+            break
+        clipped = []
+        previous = ring[-1]
+        for current in ring:
+            if inside(current) != inside(previous):
+                t = (bound - previous[0]) / (current[0] - previous[0])
+                clipped.append([bound, previous[1] + t * (current[1] - previous[1])])
+            if inside(current):
+                clipped.append(current)
+            previous = current
+        ring = clipped
+    return ring
+
+
+def _polar_cap(ring_lat: np.ndarray, ring_lon: np.ndarray, pole: float) -> List:
+    """包含极点的覆盖区：在180°经线处断开边界，补上±180°经线上的交点和极点边"""
+    lons = (ring_lon + 180.0) % 360.0 - 180.0
+    lats = ring_lat
+    if ring_lon[-1] < ring_lon[0]:
+        lons, lats = lons[::-1], lats[::-1]
+    # 经度回绕处即180°经线，从它之后的点开始
+    seam = np.flatnonzero(np.diff(lons) < 0)
+    start = seam[0] + 1 if seam.size else 0
+    lons, lats = np.roll(lons, -start), np.roll(lats, -start)
+
+    span = lons[0] + 360.0 - lons[-1]
+    seam_lat = lats[-1] + (180.0 - lons[-1]) / span * (lats[0] - lats[-1]) if span > 0 else lats[0]
+    ring = [[-180.0, float(seam_lat)]] + np.stack([lons, lats], axis=1).tolist()
+    return ring + [[180.0, float(seam_lat)], [180.0, pole], [-180.0, pole]]
+
+
+def _close(ring: List, precision: int) -> List:
+    """取整、按逆时针方向排列并闭合（GeoJSON外环约定）"""
+    ring = [[round(lon, precision), round(lat, precision)] for lon, lat in ring]
+    area = sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:] + ring[:1]))
+    if area < 0:
+        ring.reverse()
+    return ring + [ring[0]]
+
+
+def footprint_polygons(ring_lat: np.ndarray, ring_lon: np.ndarray, angle: np.ndarray, lat: Sequence[float],
+                       precision: int = 4) -> List[List]:
+    """把展开的边界点转换为每颗卫星的 MultiPolygon 坐标（[经度, 纬度]）"""
+    polygons = []
+    for index in range(len(ring_lat)):
+        # 覆盖区包含极点：边界经度跨满360°，从-180°起按经度递增排列，沿极点纬度闭合为一个多边形
+        center = np.radians(lat[index])
+        if center + angle[index] > np.pi / 2 or center - angle[index] < -np.pi / 2:
+            pole = 90.0 if center > 0 else -90.0
+            polygons.append([[_close(_polar_cap(ring_lat[index], ring_lon[index], pole), precision)]])
+            continue
+
+        ring = np.stack([ring_lon[index], ring_lat[index]], axis=1).tolist()
+        lon_min = min(p[0] for p in ring)
+        lon_max = max(p[0] for p in ring)
+        if -180.0 <= lon_min and lon_max <= 180.0:
+            polygons.append([[_close(ring, precision)]])
+            continue
+
+        # 跨越180°经线：平移±360°后分别裁剪到 [-180, 180]
+        parts = []
+        for shift in (-360.0, 0.0, 360.0):
+            if lon_max + shift <= -180.0 or lon_min + shift >= 180.0:
+                continue
+            part = _clip([[p[0] + shift, p[1]] for p in ring], -180.0, 180.0)
+            if len(part) >= 3:
+                parts.append([_close(part, precision)])
+        polygons.append(parts)
+    return polygons
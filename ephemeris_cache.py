@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卫星星历对象缓存
+
+以TLE两行根数为键缓存已解析的EarthSatellite对象（包含已初始化的SGP4模型），
+前端用同一TLE反复请求时跳过解析和SGP4初始化。容量有限，按最近最少使用淘汰。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+from skyfield.sgp4lib import EarthSatellite
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class SatelliteCache:
+    """EarthSatellite对象的线程安全LRU缓存"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, line1: str, line2: str, name: str, ts) -> EarthSatellite:
+        """获取卫星对象，未命中时解析TLE并放入缓存"""
+        key = (line1.strip(), line2.strip())
+        with self._lock:
+            satellite = self._items.get(key)
+            if satellite is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return satellite
+            self.misses += 1
+
+        # 解析放在锁外，避免阻塞其他请求；并发未命中时后放入的覆盖先放入的
+        satellite = EarthSatellite(key[0], key[1], name, ts)
+        with self._lock:
+            self._items[key] = satellite
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return satellite
+
+    def clear(self):
+        """清空缓存（TLE数据更新后调用）"""
+        with self._lock:
+            self._items.clear()
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# 所有接口共享的缓存实例
+satellite_cache = SatelliteCache()
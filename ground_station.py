@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+地面站注册表
+
+按(纬度, 经度, 高度)缓存地面站对象，预先算好地面站的ECEF(ITRS)坐标和
+ITRS→当地东北天(ENU)旋转矩阵。计算方位角/仰角时只需把卫星位置转换到ITRS，
+减去地面站坐标后乘一次旋转矩阵，不必每次重新构造地面站和坐标系。
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+from skyfield.api import wgs84
+from skyfield.framelib import itrs
+
+# 注册表容量上限，超出后清空重建（地面站通常只有一两个）
+MAX_STATIONS = 64
+
+
+class GroundStation:
+    """带预计算ECEF坐标和ENU旋转矩阵的地面站"""
+
+    def __init__(self, latitude: float, longitude: float, altitude: float = 0.0):
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.altitude = float(altitude)
+
+        # skyfield地面站对象，供需要skyfield接口的计算（过境预测、角速度等）使用
+        self.topos = wgs84.latlon(self.latitude, self.longitude, elevation_m=self.altitude)
+
+        # 地面站ITRS坐标（km）
+        self.ecef = self.topos.itrs_xyz.km
+
+        # ITRS→ENU旋转矩阵（大地纬度）
+        lat = np.radians(self.latitude)
+        lon = np.radians(self.longitude)
+        sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+        sin_lon, cos_lon = np.sin(lon), np.cos(lon)
+        self.rotation = np.array([
+            [-sin_lon, cos_lon, 0.0],
+            [-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat],
+            [cos_lat * cos_lon, cos_lat * sin_lon, sin_lat]
+        ])
+
+    def __repr__(self):
+        return f"GroundStation(lat={self.latitude}, lon={self.longitude}, alt={self.altitude}m)"
+
+    def _topocentric(self, xyz: np.ndarray):
+        """由卫星ITRS坐标（km，首维为xyz，其余维度任意）计算视线向量、方位角、仰角和距离"""
+        offset = xyz - self.ecef.reshape((3,) + (1,) * (xyz.ndim - 1))
+        east, north, up = np.tensordot(self.rotation, offset, axes=1)
+        horizontal = np.hypot(east, north)
+        azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+        elevation = np.degrees(np.arctan2(up, horizontal))
+        distance = np.sqrt(horizontal * horizontal + up * up)
+        return offset, azimuth, elevation, distance
+
+    def position_look_angles(self, position) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """由卫星地心位置（satellite.at(t)的结果）计算方位角(0~360)、仰角（度）和距离（km）
+
+        时间为数组时返回同样长度的数组。
+        """
+        _, azimuth, elevation, distance = self._topocentric(position.frame_xyz(itrs).km)
+        return azimuth, elevation, distance
+
+    def itrs_look_angles(self, xyz: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """由卫星ITRS坐标（km，首维为xyz）计算方位角、仰角和距离，如星座批量传播的 (3, 卫星数, 时间点数) 数组"""
+        _, azimuth, elevation, distance = self._topocentric(xyz)
+        return azimuth, elevation, distance
+
+    def look_angles(self, satellite, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """计算卫星在时间t（skyfield Time，可为数组）的方位角、仰角和距离"""
+        return self.position_look_angles(satellite.at(t))
+
+    def look_angles_and_range_rate(self, satellite, t) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """计算方位角、仰角、距离（km）和距离变化率（km/s，远离为正）
+
+        地面站在ITRS中静止，距离变化率即卫星ITRS速度在视线方向上的投影。
+        """
+        xyz, velocity = satellite.at(t).frame_xyz_and_velocity(itrs)
+        azimuth, elevation, distance, range_rate, _ = self.itrs_range_rates(xyz.km, velocity.km_per_s)
+        return azimuth, elevation, distance, range_rate
+
+    def itrs_range_rates(self, xyz: np.ndarray, velocity: np.ndarray, acceleration: np.ndarray = None):
+        """由卫星ITRS位置（km）、速度（km/s）计算方位角、仰角、距离、距离变化率（km/s，远离为正）
+
+        给出卫星ITRS加速度（km/s²）时另返回距离二阶变化率（km/s²），否则为None。
+        数组首维为xyz，其余维度任意（如 (3, 卫星数, 时间点数)）。
+        """
+        offset, azimuth, elevation, distance = self._topocentric(xyz)
+        line_of_sight = offset / distance
+        range_rate = np.sum(line_of_sight * velocity, axis=0)
+        range_acceleration = None
+        if acceleration is not None:
+            # d²ρ/dt² = (|v|² - ρ'²)/ρ + r̂·a
+            speed2 = np.sum(velocity * velocity, axis=0)
+            range_acceleration = (speed2 - range_rate * range_rate) / distance + \
+                np.sum(line_of_sight * acceleration, axis=0)
+        return azimuth, elevation, distance, range_rate, range_acceleration
+
+
+_stations: Dict[Tuple[float, float, float], GroundStation] = {}
+_lock = threading.Lock()
+
+
+def get_ground_station(latitude: float, longitude: float, altitude: float = 0.0) -> GroundStation:
+    """获取地面站（高度单位为米），相同位置复用同一对象"""
+    key = (round(float(latitude), 7), round(float(longitude), 7), round(float(altitude or 0.0), 3))
+    with _lock:
+        station = _stations.get(key)
+        if station is None:
+            if len(_stations) >= MAX_STATIONS:
+                _stations.clear()
+            station = GroundStation(*key)
+            _stations[key] = station
+        return station
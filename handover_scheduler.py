@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+星座自动交接调度
+
+预测星座内所有卫星在时间窗口内的过境，考虑云台转动时间，
+贪心地生成互不重叠的跟踪时间表，使跟踪器在一颗卫星降落后自动转向下一颗。
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from constellation_engine import ConstellationGrid
+from log_config import get_logger
+from pass_predictor import coarse_grid, passes_from_grid
+
+logger = get_logger('tracker')
+
+DEFAULT_SLEW_RATE = 30.0      # 云台转动速度（度/秒）
+DEFAULT_SETTLE_TIME = 2.0     # 转动到位后的稳定时间（秒）
+DEFAULT_MIN_SEGMENT = 30.0    # 最短跟踪时段（秒）
+
+
+def predict_constellation_passes(tles: Sequence[Tuple[str, str, str]], ground_station, ts, start_time: datetime,
+                                 end_time: datetime, min_elevation: float = 0.0) -> List[Dict]:
+    """预测星座内所有卫星的过境，按AOS时间排序
+
+    整个星座在粗网格上只传播一次（SatrecArray），之后只对有过境的卫星逐颗二分求事件时刻。
+
+    Args:
+        tles: (名称, 第一行, 第二行) 列表，结果中的 'satellite' 为卫星在其中的序号
+        ground_station: GroundStation 地面站
+    """
+    span = (end_time - start_time).total_seconds()
+    if span <= 0 or not tles:
+        return []
+
+    constellation = ConstellationGrid(tles)
+    grid = coarse_grid(span)
+    xyz, _, errors = constellation.itrs_states(ts, start_time, grid)
+    elevations = ground_station.itrs_look_angles(xyz)[1]
+
+    passes = []
+    for index, name in enumerate(constellation.names):
+        if np.any(errors[index]):
+            logger.warning("预测卫星 %s 过境失败: SGP4错误码 %d", name, int(np.max(errors[index])))
+            continue
+        altaz = _satellite_altaz(constellation, index, ground_station, ts, start_time)
+        for satellite_pass in passes_from_grid(altaz, start_time, grid, elevations[index], min_elevation):
+            satellite_pass['satellite'] = index
+            satellite_pass['name'] = name
+            satellite_pass['norad_id'] = constellation.satrec_list[index].satnum
+            passes.append(satellite_pass)
+
+    passes.sort(key=lambda p: p['aos'])
+    return passes
+
+
+def _satellite_altaz(constellation: ConstellationGrid, index: int, ground_station, ts, start_time: datetime):
+    """返回星座中一颗卫星以秒数偏移为输入、批量计算(仰角, 方位角)的函数"""
+    def altaz(offsets):
+        azimuth, elevation, _ = ground_station.itrs_look_angles(
+            constellation.itrs_positions(ts, index, start_time, offsets)
+        )
+        return elevation, azimuth
+    return altaz
+
+
+def slew_seconds(from_pointing: Tuple[float, float], to_pointing: Tuple[float, float],
+                 slew_rate: float = DEFAULT_SLEW_RATE,
+                 settle_time: float = DEFAULT_SETTLE_TIME) -> float:
+    """估算两个指向之间的云台转动时间（两轴同时转动，取较慢的一轴）"""
+    azimuth_delta = abs((to_pointing[0] - from_pointing[0] + 180.0) % 360.0 - 180.0)
+    elevation_delta = abs(to_pointing[1] - from_pointing[1])
+    return max(azimuth_delta, elevation_delta) / slew_rate + settle_time
+
+
+def build_handover_schedule(passes: List[Dict],
+                            look_angles: Callable[[object, datetime], Tuple[float, float]],
+                            start_time: datetime, end_time: datetime,
+                            min_elevation: float = 0.0,
+                            slew_rate: float = DEFAULT_SLEW_RATE,
+                            settle_time: float = DEFAULT_SETTLE_TIME,
+                            min_segment: float = DEFAULT_MIN_SEGMENT) -> List[Dict]:
+    """生成互不重叠的跟踪时间表
+
+    每次交接时，在扣除转动时间后能最早开始跟踪的卫星中（容差为最长转动时间），
+    选择降落最晚的一颗，尽量减少交接次数并保持连续覆盖。
+
+    Args:
+        passes: predict_constellation_passes 的结果
+        look_angles: look_angles(satellite, time) -> (方位角, 仰角)，用于计算交接时的转动量
+        start_time: 时间表开始时间
+        end_time: 时间表结束时间
+    """
+    max_slew = slew_seconds((0.0, min_elevation), (180.0, 90.0), slew_rate, settle_time)
+    passes = sorted(passes, key=lambda p: p['aos'])
+    schedule = []
+    cursor = start_time
+    pointing = None
+    # passes[:next_index] 已经考察过；active 为其中仍可跟踪的过境
+    next_index = 0
+    active = []
+
+    def usable(satellite_pass):
+        begin = max(satellite_pass['aos'], cursor)
+        return (satellite_pass['los'] - begin).total_seconds() >= min_segment
+
+    while cursor < end_time:
+        # cursor 只增不减，已不满足最短时段的过境以后也不会满足
+        active = [satellite_pass for satellite_pass in active if usable(satellite_pass)]
+        while not active and next_index < len(passes):
+            if usable(passes[next_index]):
+                active.append(passes[next_index])
+            next_index += 1
+        if not active:
+            break
+
+        # 不考虑转动时所能达到的最早开始时间，AOS在容差内的后续过境也加入候选
+        earliest = min(max(satellite_pass['aos'], cursor) for satellite_pass in active)
+        horizon = earliest + timedelta(seconds=max_slew)
+        while next_index < len(passes) and passes[next_index]['aos'] <= horizon:
+            if usable(passes[next_index]):
+                active.append(passes[next_index])
+            next_index += 1
+        candidates = [(max(satellite_pass['aos'], cursor), satellite_pass) for satellite_pass in active]
+
+        # 只对有可能胜出的候选计算实际转动时间
+        feasible = []
+        for begin, satellite_pass in candidates:
+            slew = 0.0
+            if pointing is not None:
+                slew = slew_seconds(pointing, look_angles(satellite_pass['satellite'], begin),
+                                    slew_rate, settle_time)
+                begin = max(begin, cursor + timedelta(seconds=slew))
+            if (satellite_pass['los'] - begin).total_seconds() >= min_segment:
+                feasible.append((begin, slew, satellite_pass))
+        if not feasible:
+            cursor = horizon
+            continue
+
+        first_begin = min(begin for begin, _, _ in feasible)
+        begin, slew, chosen = max(
+            (item for item in feasible if item[0] <= first_begin + timedelta(seconds=max_slew)),
+            key=lambda item: item[2]['los']
+        )
+
+        segment_end = min(chosen['los'], end_time)
+        schedule.append({
+            'satellite': chosen['satellite'],
+            'name': chosen['name'],
+            'norad_id': chosen['norad_id'],
+            'start': begin,
+            'end': segment_end,
+            'aos': chosen['aos'],
+            'los': chosen['los'],
+            'max_elevation': chosen['max_elevation'],
+            'slew_seconds': slew
+        })
+        cursor = segment_end
+        pointing = (chosen['los_azimuth'], min_elevation)
+
+    return schedule
+
+
+def schedule_to_dict(schedule: List[Dict]) -> List[Dict]:
+    """将时间表转换为可JSON序列化的格式"""
+    return [{
+        'name': entry['name'],
+        'noradId': entry['norad_id'],
+        'start': entry['start'].isoformat(),
+        'end': entry['end'].isoformat(),
+        'aos': entry['aos'].isoformat(),
+        'los': entry['los'].isoformat(),
+        'maxElevation': round(entry['max_elevation'], 2),
+        'slewSeconds': round(entry['slew_seconds'], 2)
+    } for entry in schedule]
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台计算任务
+
+长时间计算（如整个星座的参数计算）提交为后台任务，请求立即返回任务ID，
+客户端按ID查询进度、预计剩余时间并分页获取结果，也可以取消任务。
+
+- 同时运行的任务数有上限，超出的排队；排队和运行中的任务总数也有上限
+- 单个任务的结果行数有上限，运行中超出时保留已有结果、任务以错误结束
+- 已结束任务的结果保留一段时间，已结束任务的结果总行数超限时先淘汰最早结束的任务
+- 取消通过每个任务的Event通知，计算函数应把它传给 compute_pool.run 等可中断的调用
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from compute_pool import ComputeCancelled
+
+logger = logging.getLogger('api')
+
+MAX_RUNNING_JOBS = 2
+MAX_PENDING_JOBS = 16           # 排队+运行中的任务上限
+MAX_FINISHED_JOBS = 32
+RESULT_TTL_SECONDS = 30 * 60
+# 结果行数上限按内存预算换算：每行结果是约15个键的dict，实测约900字节
+RESULT_ROW_BYTES = 900
+MAX_JOB_RESULT_BYTES = 16 * 1024 * 1024        # 单个任务的结果内存预算
+MAX_RETAINED_RESULT_BYTES = 48 * 1024 * 1024   # 已结束任务的结果总内存预算
+MAX_JOB_RESULTS = MAX_JOB_RESULT_BYTES // RESULT_ROW_BYTES              # 约1.8万行
+MAX_RETAINED_RESULTS = MAX_RETAINED_RESULT_BYTES // RESULT_ROW_BYTES    # 约5.6万行
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobLimitError(RuntimeError):
+    """排队和运行中的任务已达上限"""
+
+
+class JobResultLimitError(RuntimeError):
+    """任务结果行数超过上限"""
+
+
+class JobCancelled(Exception):
+    """任务函数检测到取消请求时抛出"""
+
+
+class Job:
+    """一个后台任务的状态、进度和结果"""
+
+    def __init__(self, description: str, total: int, max_results: int = MAX_JOB_RESULTS):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = QUEUED
+        self.total = max(1, int(total))
+        self.done = 0
+        self.message = '排队中'
+        self.error = None
+        self.results: List = []
+        self.max_results = max_results
+        self.cancel_event = threading.Event()
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def check_cancelled(self):
+        """任务函数在各步骤之间调用，已请求取消时抛出 JobCancelled"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def advance(self, count: int = 1, message: Optional[str] = None):
+        with self._lock:
+            self.done = min(self.total, self.done + count)
+            if message:
+                self.message = message
+
+    def add_results(self, results: List):
+        """追加结果，超过行数上限时截断并抛出 JobResultLimitError（已有结果仍可分页获取）"""
+        with self._lock:
+            room = self.max_results - len(self.results)
+            self.results.extend(results[:max(room, 0)])
+        if len(results) > room:
+            raise JobResultLimitError(f'结果超过单个任务上限 {self.max_results} 行，已截断')
+
+    def get_results(self, offset: int, limit: int) -> List:
+        with self._lock:
+            return self.results[offset:offset + limit]
+
+    def to_dict(self) -> Dict:
+        now = time.time()
+        elapsed = ((self.finished or now) - self.started) if self.started else 0.0
+        eta = None
+        if self.status == RUNNING and self.done:
+            eta = round(elapsed / self.done * (self.total - self.done), 1)
+        return {
+            'jobId': self.id,
+            'description': self.description,
+            'status': self.status,
+            'message': self.message,
+            'progress': {
+                'done': self.done,
+                'total': self.total,
+                'percentage': round(self.done / self.total * 100, 1)
+            },
+            'elapsedSeconds': round(elapsed, 1),
+            'etaSeconds': eta,
+            'resultCount': len(self.results),
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished
+        }
+
+
+class JobManager:
+    """有界线程池执行后台任务，并按保留策略清理已结束的任务"""
+
+    def __init__(self, max_running: int = MAX_RUNNING_JOBS, max_pending: int = MAX_PENDING_JOBS,
+                 max_finished: int = MAX_FINISHED_JOBS, result_ttl: float = RESULT_TTL_SECONDS,
+                 max_job_results: int = MAX_JOB_RESULTS,
+                 max_retained_results: int = MAX_RETAINED_RESULTS):
+        self.max_pending = max_pending
+        self.max_job_results = max_job_results
+        self.max_finished = max_finished
+        self.result_ttl = result_ttl
+        self.max_retained_results = max_retained_results
+        self._executor = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix='job')
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[[Job], None], description: str, total: int) -> Job:
+        """提交任务：func(job) 在后台线程中执行，通过 job.advance / job.add_results 报告进度和结果
+
+        Raises:
+            JobLimitError: 排队和运行中的任务已达上限
+        """
+        with self._lock:
+            self._purge_locked()
+            pending = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if pending >= self.max_pending:
+                raise JobLimitError(f'排队和运行中的任务已达上限 {self.max_pending}')
+            job = Job(description, total, self.max_job_results)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, func)
+        logger.info("任务已提交: %s %s", job.id, description)
+        return job
+
+    def _run(self, job: Job, func: Callable[[Job], None]):
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED, '已取消')
+            return
+        job.status = RUNNING
+        job.message = '计算中'
+        job.started = time.time()
+        try:
+            func(job)
+        except (JobCancelled, ComputeCancelled):
+            self._finish(job, CANCELLED, '已取消')
+        except Exception as e:
+            logger.error("任务 %s 失败: %s", job.id, e)
+            job.error = str(e)
+            self._finish(job, FAILED, '出错')
+        else:
+            self._finish(job, COMPLETED, '完成')
+
+    def _finish(self, job: Job, status: str, message: str):
+        job.status = status
+        job.message = message
+        job.finished = time.time()
+        if status == COMPLETED:
+            job.done = job.total
+        logger.info("任务 %s 结束: %s, %d 个结果", job.id, status, len(job.results))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_locked()
+            return self._jobs.get(job_id)
+
+    def latest(self) -> Optional[Job]:
+        """最近提交的任务"""
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            self._purge_locked()
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """请求取消任务：排队中的直接取消，运行中的在下一个可中断点停止"""
+        job = self.get(job_id)
+        if job is None or job.is_finished:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED, '已取消')
+        else:
+            job.message = '正在取消'
+        return job
+
+    def remove(self, job_id: str) -> Optional[Job]:
+        """取消并删除任务（释放结果）"""
+        job = self.cancel(job_id)
+        if job is not None:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+        return job
+
+    def _purge_locked(self):
+        """按存活时间、数量和结果总行数清理已结束的任务（调用方持有锁）"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        expired = {job.id for job in finished if now - job.finished > self.result_ttl}
+
+        # 从最早结束的开始淘汰，直到数量和结果总行数都在上限内（运行中任务的结果不计入，由单任务上限约束）
+        remaining = sorted((job for job in finished if job.id not in expired), key=lambda job: job.finished)
+        retained_results = sum(len(job.results) for job in remaining)
+        while remaining and (len(remaining) > self.max_finished or retained_results > self.max_retained_results):
+            job = remaining.pop(0)
+            expired.add(job.id)
+            retained_results -= len(job.results)
+
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            states = [job.status for job in self._jobs.values()]
+            return {
+                'jobs': len(states),
+                'queued': states.count(QUEUED),
+                'running': states.count(RUNNING),
+                'retained_results': sum(len(job.results) for job in self._jobs.values())
+            }
+
+
+# 计算接口共享的任务管理器
+job_manager = JobManager()
@@ -11,6 +11,7 @@ class SatelliteTracker {
         this.currentForceTime = null;
         this.forceTimeStartTime = null;
         this.trackingInterval = null;
+        this.stateStream = null;
         this.positionUpdateInterval = null;
         this.currentAzimuth = 0;
         this.currentElevation = 0;
@@ -5,6 +5,7 @@
 class StatusManager {
     constructor(tracker) {
         this.tracker = tracker;
+        this.gimbalConnected = null;
     }
     
     // 初始化状态显示
@@ -85,18 +86,12 @@ class StatusManager {
         }
     }
     
-    // 检查云台状态
+    // 检查云台状态（页面加载时查询一次，跟踪期间由实时推送更新）
     async checkGimbalStatus() {
         try {
             const response = await fetch('/api/gimbal_status');
             if (response.ok) {
-                const data = await response.json();
-                if (data.status === 'error' || data.status === 'disconnected') {
-                    this.showGimbalFailureStatus();
-                    this.updateStatus('云台连接失败，将使用模拟模式');
-                } else {
-                    this.updateStatus('云台连接正常');
-                }
+                this.applyGimbalState(await response.json());
             } else {
                 this.showGimbalFailureStatus();
                 this.updateStatus('无法获取云台状态，将使用模拟模式');
@@ -107,6 +102,24 @@ class StatusManager {
         }
     }
     
+    // 根据云台状态更新显示，只在连接状态变化时提示
+    applyGimbalState(gimbal) {
+        const connected = Boolean(gimbal.initialized) && gimbal.status !== 'error' && gimbal.status !== 'disconnected';
+        if (connected === this.gimbalConnected) return;
+        this.gimbalConnected = connected;
+        
+        const statusElement = document.getElementById('gimbalFailureStatus');
+        if (connected) {
+            if (statusElement) {
+                statusElement.style.display = 'none';
+            }
+            this.updateStatus('云台连接正常');
+        } else {
+            this.showGimbalFailureStatus();
+            this.updateStatus('云台连接失败，将使用模拟模式');
+        }
+    }
+    
     // 更新跟踪状态
     updateTrackingStatus(isTracking) {
         const controlBtn = document.getElementById('controlBtn');
@@ -3,8 +3,12 @@
  * 负责卫星跟踪的启动、停止和实时控制
  */
 class TrackingController {
+    // 实时推送频率上限（Hz）
+    static STREAM_MAX_RATE = 5;
+    
     constructor(tracker) {
         this.tracker = tracker;
+        this.lastLogTime = 0;
     }
     
     async startTracking() {
@@ -116,10 +120,7 @@ class TrackingController {
             
             this.tracker.isTracking = false;
             
-            if (this.tracker.trackingInterval) {
-                clearInterval(this.tracker.trackingInterval);
-                this.tracker.trackingInterval = null;
-            }
+            this.stopFrontendDisplay();
             
             // 清除云台朝向建议
             this.clearGimbalDirectionHint();
@@ -337,26 +338,46 @@ class TrackingController {
     }
     
     startFrontendDisplay(trackingData) {
-        // 前端云台指向显示
+        // 前端云台指向显示：优先使用服务端推送（SSE），不支持或连接失败时回退到轮询
+        this.stopFrontendDisplay();
+        this.lastLogTime = 0;
+        
+        if (!window.EventSource) {
+            this.startPollingDisplay(trackingData);
+            return;
+        }
+        
+        const stream = new EventSource(`/api/tracking_stream?maxRate=${TrackingController.STREAM_MAX_RATE}`);
+        this.tracker.stateStream = stream;
+        let received = false;
+        
+        stream.addEventListener('state', (event) => {
+            received = true;
+            if (!this.tracker.isTracking) return;
+            this.handlePositionUpdate(JSON.parse(event.data), trackingData);
+        });
+        
+        stream.onerror = () => {
+            // 从未收到过数据（如服务端不支持或客户端数已满）时改用轮询；否则由浏览器自动重连
+            if (!received || stream.readyState === EventSource.CLOSED) {
+                console.warn('实时推送不可用，改用轮询获取云台位置');
+                stream.close();
+                this.tracker.stateStream = null;
+                if (this.tracker.isTracking) {
+                    this.startPollingDisplay(trackingData);
+                }
+            }
+        };
+    }
+    
+    startPollingDisplay(trackingData) {
         this.tracker.trackingInterval = setInterval(async () => {
             if (!this.tracker.isTracking) return;
             
             try {
                 const response = await fetch('/api/get_current_position');
                 if (response.ok) {
-                    const data = await response.json();
-                    this.updateGimbalDisplay(data.azimuth, data.elevation);
-                    
-                    // 预测轨迹方向
-                    const trajectoryDirection = this.predictSatelliteTrajectory(data.azimuth);
-                    
-                    // 在强制时间模式下显示指定时间
-                    if (trackingData.simulationMode && data.simulation_time) {
-                        const forceTime = new Date(data.simulation_time).toLocaleString('zh-CN');
-                        this.tracker.addLog(`[指定时间: ${forceTime}] 方位角: ${data.azimuth.toFixed(2)}°, 仰角: ${data.elevation.toFixed(2)}°, 轨迹: ${trajectoryDirection}`);
-                    } else {
-                        this.tracker.addLog(`方位角: ${data.azimuth.toFixed(2)}°, 仰角: ${data.elevation.toFixed(2)}°, 轨迹: ${trajectoryDirection}`);
-                    }
+                    this.handlePositionUpdate(await response.json(), trackingData);
                 }
             } catch (error) {
                 console.error('获取当前位置失败:', error);
@@ -364,6 +385,41 @@ class TrackingController {
         }, 1000);
     }
     
+    stopFrontendDisplay() {
+        if (this.tracker.stateStream) {
+            this.tracker.stateStream.close();
+            this.tracker.stateStream = null;
+        }
+        if (this.tracker.trackingInterval) {
+            clearInterval(this.tracker.trackingInterval);
+            this.tracker.trackingInterval = null;
+        }
+    }
+    
+    handlePositionUpdate(data, trackingData) {
+        this.updateGimbalDisplay(data.azimuth, data.elevation);
+        
+        if (data.gimbal) {
+            this.tracker.statusManager.applyGimbalState(data.gimbal);
+        }
+        
+        // 推送频率可能高于1Hz，轨迹预测和日志仍按每秒一次
+        const now = Date.now();
+        if (now - this.lastLogTime < 1000) return;
+        this.lastLogTime = now;
+        
+        // 预测轨迹方向
+        const trajectoryDirection = this.predictSatelliteTrajectory(data.azimuth);
+        
+        // 在强制时间模式下显示指定时间
+        if (trackingData.simulationMode && data.simulation_time) {
+            const forceTime = new Date(data.simulation_time).toLocaleString('zh-CN');
+            this.tracker.addLog(`[指定时间: ${forceTime}] 方位角: ${data.azimuth.toFixed(2)}°, 仰角: ${data.elevation.toFixed(2)}°, 轨迹: ${trajectoryDirection}`);
+        } else {
+            this.tracker.addLog(`方位角: ${data.azimuth.toFixed(2)}°, 仰角: ${data.elevation.toFixed(2)}°, 轨迹: ${trajectoryDirection}`);
+        }
+    }
+    
     predictSatelliteTrajectory(currentAzimuth) {
         // 简化的轨迹预测逻辑
         if (!this.tracker.azimuthHistory) {
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志子系统
+
+所有日志记录先放入队列，由后台线程统一格式化输出到stdout（systemd下进入journald），
+跟踪循环只付出一次级别判断和入队的开销。各组件（tracker/gimbal/api/tle/calculate）的日志级别
+可在运行时调整，短时间内重复出现的相同消息会被限频。
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict
+
+# 可单独调整级别的组件
+COMPONENTS = ('tracker', 'gimbal', 'api', 'tle', 'calculate')
+
+DEFAULT_LEVEL = logging.INFO
+# 其他日志器（第三方库、未归入组件的模块）的级别，库的DEBUG输出不进入日志
+ROOT_LEVEL = logging.INFO
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+
+# 相同消息的限频间隔（秒）
+DEFAULT_REPEAT_INTERVAL = 10.0
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """相同消息在间隔内只输出一次，被省略的次数附加在下一次输出中"""
+
+    def __init__(self, interval: float = DEFAULT_REPEAT_INTERVAL, max_keys: int = 1024):
+        super().__init__()
+        self.interval = interval
+        self.max_keys = max_keys
+        self._last_seen = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0:
+            return True
+
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        last = self._last_seen.get(key)
+        if last is not None and now - last[0] < self.interval:
+            self._last_seen[key] = (last[0], last[1] + 1)
+            return False
+
+        if last is not None and last[1]:
+            record.msg = f"{record.getMessage()} (期间重复 {last[1]} 次已省略)"
+            record.args = None
+        if len(self._last_seen) >= self.max_keys:
+            self._last_seen.clear()
+        self._last_seen[key] = (now, 0)
+        return True
+
+
+def setup_logging(level: int = DEFAULT_LEVEL, repeat_interval: float = DEFAULT_REPEAT_INTERVAL):
+    """安装基于队列的异步日志处理器（重复调用无副作用）"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(logging.Formatter(LOG_FORMAT))
+        output.addFilter(RateLimitFilter(repeat_interval))
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(ROOT_LEVEL)
+
+        for component in COMPONENTS:
+            logging.getLogger(component).setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(component: str) -> logging.Logger:
+    """获取组件日志器"""
+    return logging.getLogger(component)
+
+
+def set_level(component: str, level) -> int:
+    """运行时调整组件日志级别，level可为名称（DEBUG/INFO/...）或数值"""
+    if component not in COMPONENTS:
+        raise ValueError(f"未知的日志组件: {component}，可选: {', '.join(COMPONENTS)}")
+    if isinstance(level, str):
+        resolved = logging.getLevelName(level.upper())
+        if not isinstance(resolved, int):
+            raise ValueError(f"无效的日志级别: {level}")
+        level = resolved
+    logging.getLogger(component).setLevel(level)
+    return level
+
+
+def get_levels() -> Dict[str, str]:
+    """获取各组件当前日志级别"""
+    return {component: logging.getLevelName(logging.getLogger(component).level)
+            for component in COMPONENTS}
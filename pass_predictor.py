@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+过境预测模块
+
+整个时间窗口先用一次向量化粗网格计算仰角，再对所有事件同时做向量化二分求根，
+得到精确的 AOS（升起）、最高点和 LOS（降落）时刻以及最大仰角。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+
+# 粗网格步长（秒）。近地卫星每圈只有一个仰角极大值，60秒网格不会漏掉短过境
+DEFAULT_COARSE_STEP = 60.0
+
+# 求根精度（秒）
+DEFAULT_TOLERANCE = 0.01
+
+# 求最高点时用于判断仰角变化方向的中心差分步长（秒）
+_DERIVATIVE_STEP = 0.005
+
+
+def _make_altaz_function(satellite, ground_station, ts, start_time: datetime):
+    """返回以起始时刻秒数偏移为输入、批量计算仰角/方位角的函数"""
+    t0 = ts.from_datetime(start_time)
+    difference = satellite - ground_station
+
+    def altaz(offsets):
+        offsets = np.asarray(offsets, dtype=float)
+        t = ts.tt_jd(t0.tt, offsets / SECONDS_PER_DAY)
+        alt, az, _ = difference.at(t).altaz()
+        return np.atleast_1d(alt.degrees), np.atleast_1d(az.degrees)
+
+    return altaz
+
+
+def _bisect_crossings(altaz, lo, hi, threshold, rising, tolerance):
+    """向量化二分：同时求所有区间内仰角穿越阈值的时刻"""
+    lo = np.array(lo, dtype=float)
+    hi = np.array(hi, dtype=float)
+    if lo.size == 0:
+        return lo
+
+    while np.max(hi - lo) > tolerance:
+        mid = (lo + hi) / 2
+        above = altaz(mid)[0] >= threshold
+        # 升起时：中点已在阈值之上则根在左半区间；降落时相反
+        go_left = above if rising else ~above
+        hi = np.where(go_left, mid, hi)
+        lo = np.where(go_left, lo, mid)
+
+    return (lo + hi) / 2
+
+
+def _bisect_maxima(altaz, lo, hi, tolerance):
+    """向量化二分：按仰角导数符号同时求所有区间内的最高点"""
+    lo = np.array(lo, dtype=float)
+    hi = np.array(hi, dtype=float)
+    if lo.size == 0:
+        return lo
+
+    while np.max(hi - lo) > tolerance:
+        mid = (lo + hi) / 2
+        elevations = altaz(np.concatenate((mid - _DERIVATIVE_STEP, mid + _DERIVATIVE_STEP)))[0]
+        rising = elevations[mid.size:] > elevations[:mid.size]
+        lo = np.where(rising, mid, lo)
+        hi = np.where(rising, hi, mid)
+
+    return (lo + hi) / 2
+
+
+def find_passes(satellite, ground_station, ts, start_time: datetime, end_time: datetime,
+                min_elevation: float = 0.0,
+                coarse_step: float = DEFAULT_COARSE_STEP,
+                tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """搜索时间窗口内的所有过境事件
+
+    Args:
+        satellite: skyfield卫星对象
+        ground_station: skyfield地面站对象
+        ts: skyfield时间尺度
+        start_time: 窗口开始时间（带时区）
+        end_time: 窗口结束时间（带时区）
+        min_elevation: 过境判定的最低仰角（度）
+        coarse_step: 粗网格步长（秒）
+        tolerance: 事件时刻求根精度（秒）
+
+    Returns:
+        按时间排序的过境列表，每项包含 aos / culmination / los 时间、
+        对应方位角和 max_elevation。窗口开始时已在过境中的，aos 取窗口开始；
+        窗口结束时仍未降落的，los 取窗口结束。
+    """
+    span = (end_time - start_time).total_seconds()
+    if span <= 0:
+        return []
+
+    altaz = _make_altaz_function(satellite, ground_station, ts, start_time)
+
+    # 第一步：整个窗口一次性计算粗网格
+    grid = coarse_grid(span, coarse_step)
+    return passes_from_grid(altaz, start_time, grid, altaz(grid)[0], min_elevation, tolerance)
+
+
+def coarse_grid(span: float, coarse_step: float = DEFAULT_COARSE_STEP) -> np.ndarray:
+    """时间窗口内的粗网格（秒偏移，包含窗口结束时刻）"""
+    return np.append(np.arange(0.0, span, coarse_step), span)
+
+
+def passes_from_grid(altaz, start_time: datetime, grid: np.ndarray, elevations: np.ndarray,
+                     min_elevation: float = 0.0, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """由粗网格上已算好的仰角搜索过境（find_passes 的第二步起）
+
+    altaz 为以 start_time 秒数偏移为输入、批量返回(仰角, 方位角)的函数，用于二分求根；
+    粗网格可由别处批量算出（如整个星座一次传播），结果格式同 find_passes。
+    """
+    if grid.size < 2:
+        return []
+    span = grid[-1]
+
+    # 第二步：粗网格上的仰角局部极大值作为最高点候选
+    interior = np.flatnonzero(
+        (elevations[1:-1] >= elevations[:-2]) & (elevations[1:-1] > elevations[2:])
+    ) + 1
+    peak_lo = grid[interior - 1]
+    peak_hi = grid[interior + 1]
+    peaks = _bisect_maxima(altaz, peak_lo, peak_hi, tolerance)
+
+    # 窗口两端处于上升/下降中时，端点即为窗口内的最高点
+    if elevations[0] > elevations[1]:
+        peaks = np.insert(peaks, 0, 0.0)
+    if elevations[-1] > elevations[-2]:
+        peaks = np.append(peaks, span)
+    if peaks.size == 0:
+        return []
+
+    peak_elevations, peak_azimuths = altaz(peaks)
+    keep = peak_elevations >= min_elevation
+    peaks = peaks[keep]
+    peak_elevations = peak_elevations[keep]
+    peak_azimuths = peak_azimuths[keep]
+    if peaks.size == 0:
+        return []
+
+    # 第三步：为每个最高点确定AOS/LOS所在的粗网格区间
+    below = elevations < min_elevation
+    below_indices = np.flatnonzero(below)
+
+    aos_lo, aos_hi, aos_clipped = [], [], []
+    los_lo, los_hi, los_clipped = [], [], []
+    for peak in peaks:
+        before = below_indices[grid[below_indices] < peak]
+        if before.size:
+            j = before[-1]
+            aos_lo.append(grid[j])
+            aos_hi.append(min(grid[j + 1], peak))
+            aos_clipped.append(False)
+        else:
+            aos_lo.append(0.0)
+            aos_hi.append(0.0)
+            aos_clipped.append(True)
+
+        after = below_indices[grid[below_indices] > peak]
+        if after.size:
+            k = after[0]
+            los_lo.append(max(grid[k - 1], peak))
+            los_hi.append(grid[k])
+            los_clipped.append(False)
+        else:
+            los_lo.append(span)
+            los_hi.append(span)
+            los_clipped.append(True)
+
+    # 第四步：所有AOS和LOS同时二分求根
+    aos = _bisect_crossings(altaz, aos_lo, aos_hi, min_elevation, True, tolerance)
+    los = _bisect_crossings(altaz, los_lo, los_hi, min_elevation, False, tolerance)
+
+    boundary_azimuths = altaz(np.concatenate((aos, los)))[1]
+    aos_azimuths = boundary_azimuths[:aos.size]
+    los_azimuths = boundary_azimuths[aos.size:]
+
+    passes = []
+    seen = set()
+    for i in range(peaks.size):
+        # 同一过境内出现多个局部极大值时只保留一次
+        key = round(float(aos[i]), 1)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        passes.append({
+            'aos': start_time + timedelta(seconds=float(aos[i])),
+            'culmination': start_time + timedelta(seconds=float(peaks[i])),
+            'los': start_time + timedelta(seconds=float(los[i])),
+            'max_elevation': float(peak_elevations[i]),
+            'aos_azimuth': float(aos_azimuths[i]),
+            'culmination_azimuth': float(peak_azimuths[i]),
+            'los_azimuth': float(los_azimuths[i]),
+            'aos_clipped': aos_clipped[i],
+            'los_clipped': los_clipped[i]
+        })
+
+    return passes
+
+
+# 跟踪计划默认时间窗口（秒）与采样步长（秒）
+DEFAULT_PLAN_DURATION = 1800.0
+DEFAULT_PLAN_STEP = 1.0
+
+
+class PassPlan:
+    """预计算的跟踪计划
+
+    在一段时间窗口内一次性向量化计算方位角、仰角和距离变化率，
+    以紧凑的float32数组保存，跟踪循环每次只需线性插值。
+    """
+
+    def __init__(self, satellite, ground_station, ts, start_time: datetime,
+                 duration: float = DEFAULT_PLAN_DURATION,
+                 step: float = DEFAULT_PLAN_STEP):
+        self.start_time = start_time
+        self.duration = float(duration)
+        self.step = float(step)
+
+        offsets = np.arange(0.0, self.duration + self.step, self.step)
+        t0 = ts.from_datetime(start_time)
+        t = ts.tt_jd(t0.tt, offsets / SECONDS_PER_DAY)
+        topocentric = (satellite - ground_station).at(t)
+        alt, az, _, alt_rate, az_rate, range_rate = topocentric.frame_latlon_and_rates(ground_station)
+
+        # 方位角展开为连续曲线，避免在0/360度处插值出错
+        self.azimuth = np.unwrap(az.degrees, period=360.0).astype(np.float32)
+        self.elevation = alt.degrees.astype(np.float32)
+        self.range_rate = range_rate.km_per_s.astype(np.float32)
+
+        # 角速度（度/秒）和角加速度（度/秒²），用于生成云台运动参数
+        azimuth_rate = az_rate.degrees.per_second
+        elevation_rate = alt_rate.degrees.per_second
+        self.azimuth_rate = azimuth_rate.astype(np.float32)
+        self.elevation_rate = elevation_rate.astype(np.float32)
+        self.azimuth_accel = np.gradient(azimuth_rate, self.step).astype(np.float32)
+        self.elevation_accel = np.gradient(elevation_rate, self.step).astype(np.float32)
+
+        self._last_index = offsets.size - 1
+        self.end_time = start_time + timedelta(seconds=float(offsets[-1]))
+
+    def covers(self, current_time: datetime, margin: float = 0.0) -> bool:
+        """判断时间点是否在计划窗口内（margin为距窗口结束的保留秒数）"""
+        offset = (current_time - self.start_time).total_seconds()
+        return 0.0 <= offset <= self._last_index * self.step - margin
+
+    def _locate(self, current_time: datetime):
+        """返回插值所用的采样点下标和小数部分"""
+        position = (current_time - self.start_time).total_seconds() / self.step
+        position = min(max(position, 0.0), float(self._last_index))
+        index = min(int(position), self._last_index - 1)
+        return index, position - index
+
+    @staticmethod
+    def _interp(values, index, frac):
+        return float(values[index] + (values[index + 1] - values[index]) * frac)
+
+    def sample(self, current_time: datetime):
+        """插值获取指定时间的方位角(0~360)、仰角和距离变化率(km/s)"""
+        index, frac = self._locate(current_time)
+        azimuth = self._interp(self.azimuth, index, frac)
+        elevation = self._interp(self.elevation, index, frac)
+        range_rate = self._interp(self.range_rate, index, frac)
+        return azimuth % 360.0, elevation, range_rate
+
+    def sample_motion(self, current_time: datetime):
+        """插值获取指定时间的方位角/仰角角速度(度/秒)和角加速度(度/秒²)"""
+        index, frac = self._locate(current_time)
+        return (self._interp(self.azimuth_rate, index, frac),
+                self._interp(self.elevation_rate, index, frac),
+                self._interp(self.azimuth_accel, index, frac),
+                self._interp(self.elevation_accel, index, frac))
@@ -3,35 +3,128 @@
 
 import asyncio
 import json
+import logging
 import time
 import threading
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 import math
+import os
 
-from flask import Flask, request, jsonify, send_from_directory
+import yaml
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
-from skyfield.api import load, Topos, utc, wgs84
-from skyfield.sgp4lib import EarthSatellite
+from skyfield.api import load, Topos, utc
 import numpy as np
 
+from pass_predictor import find_passes, PassPlan
+from tracking_scheduler import RateScheduler, clamp_rate, DEFAULT_TRACKING_RATE
+from azimuth_planner import plan_azimuth_track, DEFAULT_LIMITS, HEADING_OFFSETS
+from handover_scheduler import (build_handover_schedule, schedule_to_dict,
+                                DEFAULT_SLEW_RATE, DEFAULT_SETTLE_TIME, DEFAULT_MIN_SEGMENT)
+from tle import load_tle_data, tle_catalog, satellite_tle
+from ephemeris_cache import satellite_cache
+from ground_station import get_ground_station
+from state_broadcaster import StateBroadcaster
+from trajectory_cache import trajectory_cache, tle_hash
+from trajectory_codec import accepts_compact, compact_encoding, COMPACT_MIME
+from trajectory import search_passes, pass_trajectory, search_constellation_passes
+from compute_pool import compute_pool, ComputeTimeout
+from jobs import job_manager
+from streaming import stream_format, stream_response
+from log_config import setup_logging, get_logger, set_level, get_levels
+
+setup_logging()
+tracker_log = get_logger('tracker')
+gimbal_log = get_logger('gimbal')
+api_log = get_logger('api')
+
 # 添加serial模块导入，base_ctrl.py需要使用
 try:
     import serial
 except ImportError:
-    print("警告: pyserial模块未安装，云台控制功能可能无法正常工作")
+    gimbal_log.warning("pyserial模块未安装，云台控制功能可能无法正常工作")
     serial = None
 
 # 导入云台控制模块
 try:
     from base_ctrl import BaseController
 except ImportError:
-    print("警告: base_ctrl模块未找到，将使用模拟模式")
+    gimbal_log.warning("base_ctrl模块未找到，将使用模拟模式")
     BaseController = None
 
 app = Flask(__name__)
 CORS(app)
 
+# 跟踪计划剩余不足该秒数时重新计算下一个窗口
+PLAN_REFRESH_MARGIN = 60.0
+
+# 自动模式下云台的安装朝向（零点偏移不随过境改变）
+AUTO_HEADING = 'north'
+
+# 卫星在地平线下时：搜索下一次过境的时长（小时）、无过境时的重试间隔（秒）
+NEXT_PASS_SEARCH_HOURS = 24
+IDLE_RECHECK_SECONDS = 600.0
+# 仰角为负但已知的下一次过境AOS过去不足该秒数时，继续等待而不重新搜索
+NEXT_PASS_RESEARCH_MARGIN = 60.0
+
+# 星座交接：单个窗口过境预测的超时（秒）、窗口内没有过境或预测失败时的重试间隔（秒）
+HANDOVER_PREDICT_TIMEOUT = 600.0
+HANDOVER_RETRY_SECONDS = 600.0
+# 星座交接：下一个窗口仍在后台预测时，等待过境期间每隔该秒数醒来检查一次
+HANDOVER_POLL_SECONDS = 5.0
+# 距唤醒时间不足该秒数时不再休眠
+MIN_IDLE_SLEEP = 1.0
+
+# 轨迹接口：过境最大仰角下限（度）；流式模式的最长搜索时长和分段时长（小时）
+TRAJECTORY_MIN_MAX_ELEVATION = 30.0
+MAX_STREAM_SEARCH_HOURS = 24 * 7
+STREAM_SEARCH_CHUNK_HOURS = 6
+
+# 批量位置计算的请求规模上限
+MAX_BATCH_SATELLITES = 200
+MAX_BATCH_TIMES = 10000
+MAX_BATCH_POINTS = 500000
+
+def load_config_section(section: str) -> Dict:
+    """读取config.yaml中的一个配置段"""
+    config_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.yaml')
+    try:
+        with open(config_path, 'r') as yaml_file:
+            return yaml.safe_load(yaml_file).get(section) or {}
+    except Exception as e:
+        tracker_log.warning(f"读取配置 {section} 失败: {e}，使用默认参数")
+        return {}
+
+def load_tracking_config() -> Dict:
+    """读取config.yaml中的跟踪参数"""
+    return load_config_section('tracking_config')
+
+TRACKING_CONFIG = load_tracking_config()
+
+# 服务参数默认值：生产模式使用waitress多线程服务器，跟踪器和串口只属于这一个进程
+DEFAULT_SERVER_CONFIG = {
+    'host': '0.0.0.0',
+    'port': 15000,
+    'threads': 16,
+    'reserved_threads': 4,
+    'connection_limit': 100,
+    'channel_timeout': 120
+}
+
+# 云台运动参数默认值（ST系列舵机4096步/圈，1度约11.38步；ACC单位为100步/秒²）
+DEFAULT_MOTION_CONFIG = {
+    'speed_scale': 11.38,
+    'acc_scale': 0.1138,
+    'speed_margin': 1.2,
+    'acc_margin': 1.5,
+    'min_speed': 1,
+    'max_speed': 3000,
+    'min_acc': 5,
+    'max_acc': 254,
+    'command_deadband_deg': 0.088
+}
+
 class SatelliteTracker:
     def __init__(self):
         self.is_tracking = False
@@ -43,6 +136,41 @@ class SatelliteTracker:
         self.current_azimuth = 0.0
         self.current_elevation = 0.0
         self.gimbal_controller = None
+        self.pass_plan = None
+        self.tracking_rate = DEFAULT_TRACKING_RATE
+        self.stop_event = threading.Event()
+        self.scheduler = None
+        
+        # 指向提前量：配置的舵机/机械延迟 + 实测的串口指令延迟
+        self.configured_latency = TRACKING_CONFIG.get('latency_ms', 150) / 1000.0
+        self.max_lead = TRACKING_CONFIG.get('max_lead_ms', 2000) / 1000.0
+        self.auto_measure_latency = True
+        self.applied_lead = 0.0
+        
+        # 云台运动参数：由星历角速度/角加速度换算为舵机SPD/ACC
+        self.motion_config = {key: TRACKING_CONFIG.get(key, value) for key, value in DEFAULT_MOTION_CONFIG.items()}
+        self.last_command = None
+        self.current_speed = 0
+        self.current_acceleration = 0
+        self.commands_sent = 0
+        self.commands_skipped = 0
+        
+        # 云台机械范围与整轨方位角展开方案
+        self.gimbal_direction = "auto"
+        self.gimbal_limits = {key: float(TRACKING_CONFIG.get(key, value)) for key, value in DEFAULT_LIMITS.items()}
+        self.azimuth_plan = None
+        
+        # 星座自动交接：时间表及当前所处的条目
+        self.handover = None
+        
+        # 地平线下等待：下一次过境、AOS预置指向、提前唤醒时间
+        self.next_pass = None
+        self.aos_pointing = None
+        self.aos_wake = float(TRACKING_CONFIG.get('aos_wake_s', 30))
+        self.tracking_state = 'stopped'
+        
+        # 实时状态推送（SSE）
+        self.broadcaster = StateBroadcaster()
         
         # 后端不再需要星座URL配置，由前端负责下载
         
@@ -52,12 +180,12 @@ class SatelliteTracker:
         # 加载时间尺度
         self.ts = load.timescale()
         
-        print("卫星跟踪系统初始化完成")
+        tracker_log.info("卫星跟踪系统初始化完成")
     
     def init_gimbal_controller(self):
         """初始化云台控制器"""
         if BaseController is None:
-            print("使用模拟云台控制模式")
+            gimbal_log.info("使用模拟云台控制模式")
             return
         
         try:
@@ -68,9 +196,9 @@ class SatelliteTracker:
                 device = '/dev/serial0'
             
             self.gimbal_controller = BaseController(device, 115200)
-            print(f"云台控制器初始化成功: {device}")
+            gimbal_log.info(f"云台控制器初始化成功: {device}")
         except Exception as e:
-            print(f"云台控制器初始化失败: {e}，使用模拟模式")
+            gimbal_log.warning(f"云台控制器初始化失败: {e}，使用模拟模式")
             self.gimbal_controller = None
     
     def is_raspberry_pi5(self) -> bool:
@@ -87,32 +215,32 @@ class SatelliteTracker:
     def load_satellite_from_tle(self, satellite_data: Dict):
         """从TLE数据加载单个卫星"""
         try:
-            print(f"[DEBUG] 开始加载卫星TLE数据: {satellite_data.get('name', 'Unknown')}")
+            tracker_log.debug(f"开始加载卫星TLE数据: {satellite_data.get('name', 'Unknown')}")
             
             name = satellite_data['name']
             line1 = satellite_data['line1']
             line2 = satellite_data['line2']
             
-            print(f"[DEBUG] TLE数据 - 名称: {name}")
-            print(f"[DEBUG] TLE数据 - Line1: {line1[:20]}...")
-            print(f"[DEBUG] TLE数据 - Line2: {line2[:20]}...")
+            tracker_log.debug(f"TLE数据 - 名称: {name}")
+            tracker_log.debug(f"TLE数据 - Line1: {line1[:20]}...")
+            tracker_log.debug(f"TLE数据 - Line2: {line2[:20]}...")
             
             # 验证TLE格式
             if not (line1.startswith('1 ') and line2.startswith('2 ')):
-                print(f"[ERROR] TLE格式验证失败 - Line1: {line1[:10]}, Line2: {line2[:10]}")
+                tracker_log.error(f"TLE格式验证失败 - Line1: {line1[:10]}, Line2: {line2[:10]}")
                 raise ValueError("无效的TLE格式")
             
-            print(f"[DEBUG] TLE格式验证通过")
+            tracker_log.debug(f"TLE格式验证通过")
             
-            # 使用skyfield加载卫星
-            satellite = EarthSatellite(line1, line2, name, self.ts)
+            # 同一TLE复用已解析的卫星对象，跳过TLE解析和SGP4初始化
+            satellite = satellite_cache.get(line1, line2, name, self.ts)
             
-            print(f"[INFO] 成功加载卫星: {name} (NORAD ID: {satellite_data.get('noradId', 'Unknown')})")
+            tracker_log.info(f"成功加载卫星: {name} (NORAD ID: {satellite_data.get('noradId', 'Unknown')})")
             return satellite
             
         except Exception as e:
-            print(f"[ERROR] 加载卫星失败: {str(e)}")
-            print(f"[ERROR] 卫星数据: {satellite_data}")
+            tracker_log.error(f"加载卫星失败: {str(e)}")
+            tracker_log.error(f"卫星数据: {satellite_data}")
             raise
     
     def calculate_satellite_position(self, satellite, 
@@ -123,7 +251,7 @@ class SatelliteTracker:
         
         Args:
             satellite: 卫星对象
-            ground_station: 地面站对象
+            ground_station: 地面站对象（ground_station.GroundStation）
             current_time: 计算时间
             convert_azimuth: 是否转换方位角，True为转换（用于云台控制），False为原始方位角（用于轨迹显示）
         """
@@ -140,16 +268,10 @@ class SatelliteTracker:
             t = self.ts.from_datetime(current_time)
             # print(f"[DEBUG] 时间对象创建成功: {t}")
             
-            # 计算卫星相对于地面站的位置
-            difference = satellite - ground_station
-            topocentric = difference.at(t)
-            # print(f"[DEBUG] 地心坐标计算完成")
-            
-            # 获取方位角和仰角
-            alt, az, distance = topocentric.altaz()
-            
-            azimuth = az.degrees
-            elevation = alt.degrees
+            # 使用地面站预计算的ECEF坐标和ENU旋转矩阵计算方位角和仰角
+            azimuth, elevation, distance = ground_station.look_angles(satellite, t)
+            azimuth = float(azimuth)
+            elevation = float(elevation)
             
             # 根据参数决定是否进行方位角转换
             if convert_azimuth:
@@ -164,13 +286,13 @@ class SatelliteTracker:
             if self.simulation_mode and convert_azimuth:
                 beijing_tz = timezone(timedelta(hours=8))
                 beijing_time = current_time.astimezone(beijing_tz)
-                # print(f"[DEBUG] 位置计算结果 - 模拟时刻: {beijing_time.strftime('%Y-%m-%d %H:%M:%S')} (北京时间) - 原始方位角: {azimuth:.2f}°, 转换后方位角: {final_azimuth:.2f}°, 仰角: {elevation:.2f}°, 距离: {distance.km:.2f}km")
+                # print(f"[DEBUG] 位置计算结果 - 模拟时刻: {beijing_time.strftime('%Y-%m-%d %H:%M:%S')} (北京时间) - 原始方位角: {azimuth:.2f}°, 转换后方位角: {final_azimuth:.2f}°, 仰角: {elevation:.2f}°, 距离: {distance:.2f}km")
             
             return final_azimuth, elevation
             
         except Exception as e:
-            print(f"[ERROR] 计算卫星位置失败: {e}")
-            print(f"[ERROR] 输入参数 - 卫星: {satellite}, 时间: {current_time}")
+            tracker_log.error(f"计算卫星位置失败: {e}")
+            tracker_log.error(f"输入参数 - 卫星: {satellite}, 时间: {current_time}")
             return 0.0, 0.0
     
     def convert_azimuth_for_gimbal(self, azimuth: float, current_time: datetime) -> tuple[float, str]:
@@ -178,11 +300,13 @@ class SatelliteTracker:
         try:
             # 根据云台朝向设置进行转换
             if self.gimbal_direction == "auto":
-                # 自动模式：默认云台朝北
-                converted_azimuth = azimuth
-                if azimuth > 180:
-                    converted_azimuth = azimuth - 360
-                print(f"[INFO] 自动模式：云台朝北")
+                # 自动模式：云台实际安装朝北，零点偏移固定，回绕和翻转由整轨规划负责
+                converted_azimuth = azimuth - HEADING_OFFSETS[AUTO_HEADING]
+                if converted_azimuth > 180:
+                    converted_azimuth -= 360
+                elif converted_azimuth < -180:
+                    converted_azimuth += 360
+                return converted_azimuth, AUTO_HEADING
             elif self.gimbal_direction == "north":
                 # 云台朝北：直接使用原始方位角，但限制在±180度范围内
                 converted_azimuth = azimuth
@@ -198,67 +322,240 @@ class SatelliteTracker:
             
             # 检查转换后的角度是否在云台可转动范围内
             if abs(converted_azimuth) > 180:
-                print(f"[WARNING] 转换后方位角 {converted_azimuth:.2f}° 超出云台转动范围(±180°)")
+                gimbal_log.warning(f"转换后方位角 {converted_azimuth:.2f}° 超出云台转动范围(±180°)")
             
-            return converted_azimuth, "auto"
+            return converted_azimuth, self.gimbal_direction
             
         except Exception as e:
-            print(f"[ERROR] 方位角转换失败: {e}")
+            gimbal_log.error(f"方位角转换失败: {e}")
             return azimuth, "unknown"
     
 
     
-    def control_gimbal(self, azimuth: float, elevation: float, current_time=None):
-        """控制云台指向"""
-        if self.simulation_mode and current_time:
-            beijing_tz = timezone(timedelta(hours=8))
-            beijing_time = current_time.astimezone(beijing_tz)
-            print(f"[DEBUG] 云台控制请求 - 强制时间: {beijing_time.strftime('%Y-%m-%d %H:%M:%S')} (北京时间) - 原始角度: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
-        else:
-            print(f"[DEBUG] 云台控制请求 - 原始角度: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+    def compute_motion_profile(self, azimuth: float, elevation: float,
+                               motion: Optional[Tuple[float, float, float, float]]) -> Tuple[int, int]:
+        """根据星历角速度/角加速度计算云台速度(SPD)和加速度(ACC)参数"""
+        if motion is None:
+            # 没有星历运动信息（如预置到AOS指向）时按最快速度转动
+            return int(self.motion_config['max_speed']), int(self.motion_config['max_acc'])
+        az_rate, el_rate, az_accel, el_accel = motion
+        
+        # 距上一条指令的角度差需要在一个跟踪周期内走完
+        catch_up = 0.0
+        if self.last_command is not None:
+            last_azimuth, last_elevation, last_time = self.last_command
+            elapsed = max(1.0 / self.tracking_rate, time.monotonic() - last_time)
+            catch_up = max(abs(azimuth - last_azimuth), abs(elevation - last_elevation)) / elapsed
+        
+        speed_deg = max(abs(az_rate), abs(el_rate), catch_up) * self.motion_config['speed_margin']
+        accel_deg = max(abs(az_accel), abs(el_accel)) * self.motion_config['acc_margin']
+        
+        speed = speed_deg * self.motion_config['speed_scale']
+        acceleration = accel_deg * self.motion_config['acc_scale']
+        # 向上取整，保证舵机速度不低于卫星角速度
+        speed = int(max(self.motion_config['min_speed'], min(self.motion_config['max_speed'], math.ceil(speed))))
+        acceleration = int(max(self.motion_config['min_acc'], min(self.motion_config['max_acc'], math.ceil(acceleration))))
+        return speed, acceleration
+    
+    def control_gimbal(self, azimuth: float, elevation: float, current_time=None,
+                       motion: Optional[Tuple[float, float, float, float]] = None):
+        """控制云台指向
+        
+        Args:
+            motion: 星历给出的(方位角速度, 仰角速度, 方位角加速度, 仰角加速度)，单位度/秒、度/秒²
+        """
+        if gimbal_log.isEnabledFor(logging.DEBUG):
+            if self.simulation_mode and current_time:
+                beijing_time = current_time.astimezone(timezone(timedelta(hours=8)))
+                gimbal_log.debug("云台控制请求 - 强制时间: %s (北京时间) - 原始角度: 方位角=%.2f°, 仰角=%.2f°",
+                                 beijing_time.strftime('%Y-%m-%d %H:%M:%S'), azimuth, elevation)
+            else:
+                gimbal_log.debug("云台控制请求 - 原始角度: 方位角=%.2f°, 仰角=%.2f°", azimuth, elevation)
         
         # 限制角度范围
         original_azimuth = azimuth
         original_elevation = elevation
-        azimuth = max(-180, min(180, azimuth))
-        elevation = max(-30, min(90, elevation))
+        azimuth = max(self.gimbal_limits['az_min'], min(self.gimbal_limits['az_max'], azimuth))
+        elevation = max(self.gimbal_limits['el_min'], min(self.gimbal_limits['el_max'], elevation))
         
         if original_azimuth != azimuth or original_elevation != elevation:
-            print(f"[DEBUG] 角度限制调整 - 调整后: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+            gimbal_log.debug("角度限制调整 - 调整后: 方位角=%.2f°, 仰角=%.2f°", azimuth, elevation)
+        
+        # 变化量小于舵机分辨率时不重复发送，舵机仍按上一条指令的速度平滑运动
+        if self.last_command is not None:
+            last_azimuth, last_elevation, _ = self.last_command
+            deadband = self.motion_config['command_deadband_deg']
+            if abs(azimuth - last_azimuth) < deadband and abs(elevation - last_elevation) < deadband:
+                self.commands_skipped += 1
+                return
+        
+        speed, acceleration = self.compute_motion_profile(azimuth, elevation, motion)
+        self.current_speed = speed
+        self.current_acceleration = acceleration
 
         if self.gimbal_controller:
             try:
-                print(f"[DEBUG] 发送云台控制指令到硬件设备")
                 # 使用base_ctrl.py提供的gimbal_ctrl方法
                 # 参数: x(方位角), y(仰角), speed(速度), acceleration(加速度)
-                self.gimbal_controller.gimbal_ctrl(azimuth, elevation, 10, 0)
-                print(f"[INFO] 云台控制指令发送成功: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+                self.gimbal_controller.gimbal_ctrl(azimuth, elevation, speed, acceleration)
+                gimbal_log.debug("云台控制指令发送成功: 方位角=%.2f°, 仰角=%.2f°, 速度=%d, 加速度=%d",
+                                 azimuth, elevation, speed, acceleration)
             except Exception as e:
-                print(f"[ERROR] 云台控制失败: {e}")
-                print(f"[ERROR] 控制参数: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+                gimbal_log.error("云台控制失败: %s (方位角=%.2f°, 仰角=%.2f°)", e, azimuth, elevation)
         else:
-            print(f"[INFO] 后端模拟控制: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+            gimbal_log.debug("后端模拟控制: 方位角=%.2f°, 仰角=%.2f°, 速度=%d, 加速度=%d",
+                             azimuth, elevation, speed, acceleration)
         
         # 更新当前位置
+        self.last_command = (azimuth, elevation, time.monotonic())
+        self.commands_sent += 1
         self.current_azimuth = azimuth
         self.current_elevation = elevation
-        print(f"[DEBUG] 当前云台位置已更新: 方位角={azimuth:.2f}°, 仰角={elevation:.2f}°")
+    
+    def get_pointing_lead(self) -> float:
+        """计算本次指令的提前量（秒）"""
+        lead = self.configured_latency
+        if self.auto_measure_latency and self.gimbal_controller:
+            lead += self.gimbal_controller.get_command_latency()
+        self.applied_lead = max(0.0, min(self.max_lead, lead))
+        return self.applied_lead
+    
+    def set_latency(self, latency_ms: Optional[float] = None, auto_measure: Optional[bool] = None):
+        """设置端到端延迟补偿参数"""
+        if latency_ms is not None:
+            latency_ms = float(latency_ms)
+            if not (0 <= latency_ms <= self.max_lead * 1000):
+                raise ValueError(f"延迟必须在0~{self.max_lead * 1000:.0f}ms之间")
+            self.configured_latency = latency_ms / 1000.0
+        if auto_measure is not None:
+            self.auto_measure_latency = bool(auto_measure)
+        gimbal_log.info(f"延迟补偿设置: 配置延迟={self.configured_latency * 1000:.1f}ms, 自动测量={self.auto_measure_latency}")
+    
+    def get_latency_info(self) -> Dict:
+        """获取延迟补偿状态"""
+        measured = self.gimbal_controller.get_command_latency() if self.gimbal_controller else 0.0
+        return {
+            'configured_latency_ms': round(self.configured_latency * 1000, 3),
+            'measured_command_latency_ms': round(measured * 1000, 3),
+            'auto_measure': self.auto_measure_latency,
+            'applied_lead_ms': round(self.applied_lead * 1000, 3),
+            'max_lead_ms': round(self.max_lead * 1000, 3)
+        }
+    
+    def plan_azimuth(self, plan: PassPlan, from_time: datetime):
+        """查看跟踪计划中from_time之后的下一段可见轨迹，选出总转动量最小的方位角换算方案"""
+        first_index = max(0, int((from_time - plan.start_time).total_seconds() / plan.step))
+        visible = np.flatnonzero(plan.elevation[first_index:] >= 0) + first_index
+        if visible.size == 0:
+            return
+        
+        # 只取第一段连续可见区间（一次过境）
+        breaks = np.flatnonzero(np.diff(visible) > 1)
+        segment = visible[:breaks[0] + 1] if breaks.size else visible
+        
+        # 只有明确配置了朝向时才使用该朝向；自动模式下零点偏移固定为朝北，只选择回绕分支和翻转
+        if self.gimbal_direction in HEADING_OFFSETS:
+            headings = [self.gimbal_direction]
+        else:
+            headings = [AUTO_HEADING]
+        
+        azimuth_plan = plan_azimuth_track(plan.azimuth[segment] % 360.0, plan.elevation[segment],
+                                          headings, self.gimbal_limits)
+        if azimuth_plan is not None:
+            self.azimuth_plan = azimuth_plan
+            tracker_log.info(f"方位角展开方案: {azimuth_plan.mode}, 总转动量 {azimuth_plan.total_slew:.1f}°, "
+                  f"回绕 {azimuth_plan.wrap_count} 次")
+    
+    def convert_pointing_for_gimbal(self, azimuth: float, elevation: float, current_time: datetime) -> Tuple[float, float]:
+        """按整轨方位角展开方案换算云台坐标，无方案时退回逐点转换"""
+        if self.azimuth_plan is not None:
+            return self.azimuth_plan.convert(azimuth, elevation)
+        azimuth, _ = self.convert_azimuth_for_gimbal(azimuth, current_time)
+        return azimuth, elevation
+    
+    def build_pass_plan(self, start_time: datetime) -> PassPlan:
+        """从指定时间开始一次性计算跟踪计划"""
+        plan = PassPlan(self.current_satellite, self.ground_station.topos, self.ts, start_time)
+        tracker_log.debug(f"跟踪计划已生成: {plan.start_time} - {plan.end_time}, 共 {plan.elevation.size} 个采样点")
+        return plan
+    
+    def prepare_next_pass(self, current_time: datetime):
+        """搜索下一次过境，为其生成跟踪计划和方位角方案，并计算AOS预置指向"""
+        passes = find_passes(self.current_satellite, self.ground_station.topos, self.ts, current_time,
+                             current_time + timedelta(hours=NEXT_PASS_SEARCH_HOURS))
+        upcoming = [p for p in passes if not p['aos_clipped']]
+        if not upcoming:
+            self.next_pass = None
+            self.aos_pointing = None
+            return
+        
+        self.next_pass = upcoming[0]
+        aos = self.next_pass['aos']
+        self.pass_plan = self.build_pass_plan(max(current_time, aos - timedelta(seconds=self.aos_wake)))
+        self.plan_azimuth(self.pass_plan, aos)
+        azimuth, elevation, _ = self.pass_plan.sample(aos)
+        self.aos_pointing = self.convert_pointing_for_gimbal(azimuth, elevation, aos)
+        tracker_log.info(f"卫星在地平线下，下一次过境 AOS: {aos}, 最大仰角 {self.next_pass['max_elevation']:.2f}°, "
+              f"预置指向: 方位角={self.aos_pointing[0]:.2f}°, 仰角={self.aos_pointing[1]:.2f}°")
+    
+    def handover_wake_time(self, current_time: datetime) -> Optional[datetime]:
+        """星座模式下需要醒来检查交接的时刻：当前时段结束时，或下一个窗口仍在预测中时每隔HANDOVER_POLL_SECONDS秒"""
+        if self.handover is None:
+            return None
+        if self.handover['index'] < len(self.handover['schedule']):
+            return self.handover['schedule'][self.handover['index']]['end']
+        # 时间表已用完、下一个窗口尚未预测完成：预测结果可能包含更早的过境，不能按当前卫星的AOS长时间休眠
+        return current_time + timedelta(seconds=HANDOVER_POLL_SECONDS)
+    
+    def hold_for_next_pass(self, current_time: datetime, scheduler: RateScheduler):
+        """保持在AOS预置指向，并休眠到AOS前aos_wake秒（星座模式下不晚于交接检查时刻）"""
+        handover_wake = self.handover_wake_time(current_time)
+        if self.next_pass is None:
+            # 搜索窗口内没有过境，稍后重试
+            self.tracking_state = 'idle'
+            sleep_seconds = IDLE_RECHECK_SECONDS
+            if handover_wake is not None:
+                sleep_seconds = min(sleep_seconds, max(0.0, (handover_wake - current_time).total_seconds()))
+            tracker_log.info(f"{NEXT_PASS_SEARCH_HOURS}小时内没有过境，{sleep_seconds:.0f}秒后重新检查")
+            self.publish_state()
+            scheduler.sleep(sleep_seconds)
+            return
+        
+        self.tracking_state = 'waiting'
+        self.control_gimbal(self.aos_pointing[0], self.aos_pointing[1], current_time)
+        
+        wake_time = self.next_pass['aos'] - timedelta(seconds=self.aos_wake)
+        if handover_wake is not None:
+            wake_time = min(wake_time, handover_wake)
+        
+        # 单次休眠不超过IDLE_RECHECK_SECONDS，醒来后重新检查
+        sleep_seconds = min((wake_time - current_time).total_seconds(), IDLE_RECHECK_SECONDS)
+        if sleep_seconds > MIN_IDLE_SLEEP:
+            tracker_log.info(f"已预置到AOS指向，休眠 {sleep_seconds:.0f} 秒")
+            self.publish_state()
+            scheduler.sleep(sleep_seconds)
+        # 搜索过境和休眠的耗时不计为跟踪周期超时
+        scheduler.reset_deadline()
     
     def tracking_loop(self):
         """跟踪循环"""
-        print(f"[INFO] 开始卫星跟踪循环")
+        tracker_log.info(f"开始卫星跟踪循环 - 频率: {self.tracking_rate:.1f}Hz")
+        scheduler = RateScheduler(self.tracking_rate, self.stop_event)
+        self.scheduler = scheduler
         loop_count = 0
+        # 每10秒打印一次详细信息
+        debug_interval = max(1, int(round(scheduler.rate_hz * 10)))
         
-        while self.is_tracking:
+        while self.is_tracking and scheduler.wait_next_tick():
             try:
                 loop_count += 1
                 
                 # 根据模式选择时间
                 if self.simulation_mode:
-                    # 强制时间模式：使用前端设置的开始时间加上循环次数作为时间偏移
-                    # 这样可以模拟任意时间点的卫星位置
+                    # 强制时间模式：使用前端设置的开始时间加上单调时钟经过的时间
+                    # 这样可以模拟任意时间点的卫星位置，且不受循环耗时影响
                     if self.simulation_start_time is not None:
-                        current_time = self.simulation_start_time + timedelta(seconds=loop_count)
+                        current_time = self.simulation_start_time + timedelta(seconds=scheduler.elapsed())
                         # 确保时间对象包含时区信息
                         if current_time.tzinfo is None:
                             current_time = current_time.replace(tzinfo=timezone.utc)
@@ -270,61 +567,93 @@ class SatelliteTracker:
                     # 实时模式：使用当前系统时间
                     current_time = datetime.now(timezone.utc)
                 
-                if loop_count % 10 == 1:  # 每10次循环打印一次详细信息
-                    mode_str = "强制时间" if self.simulation_mode else "实时"
-                    gimbal_mode_str = "硬件控制" if self.gimbal_controller else "后端模拟"
-                    print(f"[DEBUG] 跟踪循环 #{loop_count} - {mode_str}模式, {gimbal_mode_str} - 时间: {current_time}")
+                # 星座模式：按时间表交接卫星
+                if self.handover is not None:
+                    self.check_handover(current_time)
+                    # 首个窗口仍在后台预测中，尚无跟踪目标
+                    if self.current_satellite is None:
+                        self.tracking_state = 'predicting'
+                        continue
                 
-                # 计算卫星位置
-                azimuth, elevation = self.calculate_satellite_position(
-                    self.current_satellite,
-                    self.ground_station,
-                    current_time
-                )
+                if loop_count % debug_interval == 1 or debug_interval == 1:
+                    tracker_log.debug("跟踪循环 #%d - %s模式, %s - 时间: %s", loop_count,
+                                      "强制时间" if self.simulation_mode else "实时",
+                                      "硬件控制" if self.gimbal_controller else "后端模拟", current_time)
+                    if scheduler.overrun_count:
+                        tracker_log.warning("跟踪循环超时 %d 次, 跳过 %d 个周期, 最大延迟 %.1fms",
+                                            scheduler.overrun_count, scheduler.skipped_ticks,
+                                            scheduler.max_lateness * 1000)
                 
-                # 控制云台
-                self.control_gimbal(azimuth, elevation, current_time)
+                # 指向 当前时间+端到端延迟 时刻的预测位置，抵消指令队列、串口和舵机的滞后
+                target_time = current_time + timedelta(seconds=self.get_pointing_lead())
+                
+                # 等待下一次过境期间保持在AOS预置指向
+                if self.next_pass is not None and target_time < self.next_pass['aos']:
+                    self.hold_for_next_pass(current_time, scheduler)
+                    continue
+                
+                # 从预计算的跟踪计划插值获取卫星位置，窗口即将用完时滚动重算
+                if self.pass_plan is None or not self.pass_plan.covers(target_time, PLAN_REFRESH_MARGIN):
+                    self.pass_plan = self.build_pass_plan(current_time)
+                    # 过境途中滚动重算时沿用原方案，保证指令连续
+                    if self.azimuth_plan is None or self.pass_plan.sample(target_time)[1] < 0:
+                        self.plan_azimuth(self.pass_plan, target_time)
+                azimuth, elevation, _ = self.pass_plan.sample(target_time)
+                motion = self.pass_plan.sample_motion(target_time)
                 
-                # 等待1秒
-                time.sleep(1)
+                # 卫星在地平线下：预置到下一次过境的AOS指向并休眠，不再逐周期跟踪
+                if elevation < 0:
+                    # 已知下一次过境且AOS未过去太久时不重新搜索（AOS附近插值误差和指向提前量会使仰角短暂为负）
+                    if self.next_pass is None or \
+                            target_time > self.next_pass['aos'] + timedelta(seconds=NEXT_PASS_RESEARCH_MARGIN):
+                        self.prepare_next_pass(current_time)
+                    self.hold_for_next_pass(current_time, scheduler)
+                    continue
+                self.next_pass = None
+                self.tracking_state = 'tracking'
+                
+                azimuth, elevation = self.convert_pointing_for_gimbal(azimuth, elevation, current_time)
+                
+                # 控制云台
+                self.control_gimbal(azimuth, elevation, current_time, motion)
                 
             except Exception as e:
-                print(f"[ERROR] 跟踪循环错误: {e}")
-                print(f"[ERROR] 循环次数: {loop_count}, 时间: {datetime.now(timezone.utc)}")
-                time.sleep(1)
+                # 错误消息不含循环次数，连续重复的同一错误会被日志限频
+                tracker_log.error("跟踪循环错误: %s", e)
+                tracker_log.debug("出错时循环次数: %d", loop_count)
+                if self.stop_event.wait(1):
+                    break
+            
+            finally:
+                # 每个周期向推送客户端发布一次最新状态
+                self.publish_state()
         
-        print(f"[INFO] 卫星跟踪循环结束 - 总循环次数: {loop_count}")
+        tracker_log.info(f"卫星跟踪循环结束 - 总循环次数: {loop_count}, 超时次数: {scheduler.overrun_count}")
     
-    def start_tracking(self, satellite_data: Dict, ground_station: Dict, 
-                      simulation_mode: bool = False, start_time: Optional[str] = None,
-                      gimbal_direction: str = "auto"):
-        """开始跟踪"""
-        print(f"[INFO] 收到开始跟踪请求")
-        print(f"[DEBUG] 跟踪参数 - 卫星: {satellite_data.get('name', 'Unknown')}, 强制时间模式: {simulation_mode}")
-        print(f"[DEBUG] 地面站参数: 纬度={ground_station.get('latitude')}, 经度={ground_station.get('longitude')}, 高度={ground_station.get('altitude')}m")
-        
+    def configure_session(self, ground_station: Dict, simulation_mode: bool, start_time: Optional[str],
+                          gimbal_direction: str, rate_hz: float, latency_ms: Optional[float]):
+        """设置地面站、时间模式和云台参数（单星跟踪与星座跟踪共用）"""
         if self.is_tracking:
-            print(f"[WARNING] 检测到正在进行的跟踪任务，正在停止当前任务...")
+            tracker_log.warning(f"检测到正在进行的跟踪任务，正在停止当前任务...")
             self.stop_tracking()
-            print(f"[INFO] 已停止当前跟踪任务，开始新的跟踪任务")
-        
-        print(f"[DEBUG] 开始加载卫星TLE数据")
-        # 从TLE数据加载卫星
-        satellite = self.load_satellite_from_tle(satellite_data)
+            tracker_log.info(f"已停止当前跟踪任务，开始新的跟踪任务")
         
-        print(f"[DEBUG] 设置地面站位置")
+        tracker_log.debug(f"设置地面站位置")
         # 设置地面站
-        self.ground_station = wgs84.latlon(
+        self.ground_station = get_ground_station(
             ground_station['latitude'],
             ground_station['longitude'],
-            elevation_m=ground_station['altitude']
+            ground_station['altitude']
         )
-        print(f"[DEBUG] 地面站设置完成: {self.ground_station}")
+        tracker_log.debug(f"地面站设置完成: {self.ground_station}")
         
-        self.current_satellite = satellite
         self.simulation_mode = simulation_mode
         self.gimbal_direction = gimbal_direction
-        print(f"[DEBUG] 云台朝向设置: {gimbal_direction}")
+        tracker_log.debug(f"云台朝向设置: {gimbal_direction}")
+        self.tracking_rate = clamp_rate(rate_hz)
+        tracker_log.debug(f"跟踪频率设置: {self.tracking_rate:.1f}Hz")
+        if latency_ms is not None:
+            self.set_latency(latency_ms)
         
         if simulation_mode and start_time:
             # 前端传递的是北京时间，需要转换为UTC时间
@@ -335,72 +664,290 @@ class SatelliteTracker:
             beijing_time = parsed_time.replace(tzinfo=beijing_tz)
             # 转换为UTC时间
             self.simulation_start_time = beijing_time.astimezone(timezone.utc)
-            print(f"[DEBUG] 强制时间模式开始时间 (北京时间): {beijing_time}")
-            print(f"[DEBUG] 强制时间模式开始时间 (UTC): {self.simulation_start_time}")
+            tracker_log.debug(f"强制时间模式开始时间 (北京时间): {beijing_time}")
+            tracker_log.debug(f"强制时间模式开始时间 (UTC): {self.simulation_start_time}")
         else:
             self.simulation_start_time = datetime.now(timezone.utc)
-            print(f"[DEBUG] 实时模式开始时间: {self.simulation_start_time}")
+            tracker_log.debug(f"实时模式开始时间: {self.simulation_start_time}")
         
         # 云台控制器状态检查
         # 注意：前端的模拟开关只是强制时间模式，不影响云台控制
         # 只有当云台控制器初始化失败时才进入后端模拟控制状态
         if not self.gimbal_controller:
-            print(f"[WARNING] 云台控制器未初始化，将使用后端模拟控制模式")
-            print(f"[INFO] 后端模拟控制模式：计算位置但不发送实际控制指令")
+            tracker_log.warning(f"云台控制器未初始化，将使用后端模拟控制模式")
+            tracker_log.info(f"后端模拟控制模式：计算位置但不发送实际控制指令")
+        
+        tracker_log.debug(f"云台控制器状态: {'已连接' if self.gimbal_controller else '后端模拟控制模式'}")
+    
+    def switch_satellite(self, satellite, at_time: datetime):
+        """切换跟踪目标：重新计算跟踪计划和方位角展开方案"""
+        self.current_satellite = satellite
         
-        print(f"[DEBUG] 云台控制器状态: {'已连接' if self.gimbal_controller else '后端模拟控制模式'}")
+        # 预先计算跟踪计划，跟踪循环中只做插值
+        self.pass_plan = self.build_pass_plan(at_time)
         
+        # 查看整次过境，规划方位角展开方案
+        self.azimuth_plan = None
+        self.plan_azimuth(self.pass_plan, at_time)
+        self.next_pass = None
+    
+    def launch_tracking_thread(self):
+        """启动跟踪线程"""
         self.is_tracking = True
+        self.stop_event.clear()
+        self.last_command = None
         
         # 启动跟踪线程
-        print(f"[DEBUG] 启动跟踪线程")
+        tracker_log.debug(f"启动跟踪线程")
         self.tracking_thread = threading.Thread(target=self.tracking_loop)
         self.tracking_thread.daemon = True
         self.tracking_thread.start()
+    
+    def start_tracking(self, satellite_data: Dict, ground_station: Dict, 
+                      simulation_mode: bool = False, start_time: Optional[str] = None,
+                      gimbal_direction: str = "auto",
+                      rate_hz: float = DEFAULT_TRACKING_RATE,
+                      latency_ms: Optional[float] = None):
+        """开始跟踪"""
+        tracker_log.info(f"收到开始跟踪请求")
+        tracker_log.debug(f"跟踪参数 - 卫星: {satellite_data.get('name', 'Unknown')}, 强制时间模式: {simulation_mode}")
+        tracker_log.debug(f"地面站参数: 纬度={ground_station.get('latitude')}, 经度={ground_station.get('longitude')}, 高度={ground_station.get('altitude')}m")
+        
+        tracker_log.debug(f"开始加载卫星TLE数据")
+        # 从TLE数据加载卫星
+        satellite = self.load_satellite_from_tle(satellite_data)
+        
+        self.configure_session(ground_station, simulation_mode, start_time,
+                               gimbal_direction, rate_hz, latency_ms)
+        self.handover = None
+        self.switch_satellite(satellite, self.simulation_start_time)
+        self.launch_tracking_thread()
+        
+        tracker_log.info(f"开始跟踪卫星: {satellite_data['name']} (NORAD ID: {satellite_data.get('noradId', 'Unknown')})")
+        tracker_log.info(f"地面站位置: {ground_station}")
+        tracker_log.info(f"强制时间模式: {simulation_mode} (前端模拟开关)")
+        tracker_log.info(f"跟踪系统启动成功")
+    
+    def look_angles(self, satellite, at_time: datetime) -> Tuple[float, float]:
+        """计算指定时刻卫星相对地面站的方位角和仰角"""
+        azimuth, elevation, _ = self.ground_station.look_angles(satellite, self.ts.from_datetime(at_time))
+        return float(azimuth), float(elevation)
+    
+    def build_handover_schedule(self, handover: Dict, start_time: datetime) -> List[Dict]:
+        """预测星座过境并生成交接时间表（过境搜索在计算进程池中执行）"""
+        end_time = start_time + timedelta(hours=handover['window_hours'])
+        tracker_log.info(f"预测 {handover['constellation']} 星座过境: {start_time} - {end_time}, "
+              f"共 {len(handover['satellites'])} 颗卫星")
+        station = (self.ground_station.latitude, self.ground_station.longitude, self.ground_station.altitude)
+        passes = compute_pool.run(search_constellation_passes, handover['tles'], station,
+                                  start_time, end_time, handover['min_elevation'],
+                                  timeout=HANDOVER_PREDICT_TIMEOUT)
+        for satellite_pass in passes:
+            satellite_pass['satellite'] = handover['satellites'][satellite_pass['satellite']]
+        schedule = build_handover_schedule(
+            passes, self.look_angles, start_time, end_time,
+            min_elevation=handover['min_elevation'],
+            slew_rate=TRACKING_CONFIG.get('slew_rate', DEFAULT_SLEW_RATE),
+            settle_time=TRACKING_CONFIG.get('handover_settle_s', DEFAULT_SETTLE_TIME),
+            min_segment=TRACKING_CONFIG.get('min_segment_s', DEFAULT_MIN_SEGMENT)
+        )
+        tracker_log.info(f"交接时间表生成完成: {len(passes)} 次过境, {len(schedule)} 个跟踪时段")
+        return schedule
+    
+    def prefetch_handover_window(self, handover: Dict):
+        """在后台线程中提前生成当前时间表结束后的下一个窗口，跟踪线程不等待过境预测"""
+        if handover.get('prefetch') is not None:
+            return
+        start_time = handover['schedule'][-1]['end'] if handover['schedule'] else handover['start_time']
+        prefetch = {'schedule': None}
+        handover['prefetch'] = prefetch
+        
+        def run():
+            try:
+                schedule = self.build_handover_schedule(handover, start_time)
+            except Exception as e:
+                tracker_log.error(f"预测 {handover['constellation']} 星座过境失败: {e}")
+                schedule = []
+            if not schedule:
+                # 窗口内没有可跟踪的过境，稍后重试
+                schedule = [{'end': start_time + timedelta(seconds=HANDOVER_RETRY_SECONDS)}]
+            prefetch['schedule'] = schedule
+        
+        threading.Thread(target=run, name='handover-prefetch', daemon=True).start()
+    
+    def check_handover(self, current_time: datetime):
+        """当前时段结束时切换到时间表中的下一颗卫星，时间表用完时换用后台预先生成的下一个窗口"""
+        handover = self.handover
+        schedule = handover['schedule']
+        index = handover['index']
+        if index < len(schedule) and current_time < schedule[index]['end']:
+            return
+        
+        # 跳过已经结束的时段
+        while index < len(schedule) and current_time >= schedule[index]['end']:
+            index += 1
+        if index >= len(schedule):
+            prefetch = handover.get('prefetch')
+            if prefetch is None or prefetch['schedule'] is None:
+                # 下一个窗口仍在预测中：保持当前指向，下个周期再检查
+                handover['index'] = index
+                self.prefetch_handover_window(handover)
+                return
+            handover['schedule'] = schedule = prefetch['schedule']
+            handover['prefetch'] = None
+            self.prefetch_handover_window(handover)
+            index = 0
+            while index < len(schedule) and current_time >= schedule[index]['end']:
+                index += 1
+            if index >= len(schedule):
+                handover['index'] = index
+                return
+        handover['index'] = index
+        
+        entry = schedule[index]
+        if 'satellite' not in entry:
+            return
+        tracker_log.info(f"星座交接: 切换到 {entry['name']} (NORAD ID: {entry['norad_id']}), "
+              f"跟踪时段 {entry['start']} - {entry['end']}, 最大仰角 {entry['max_elevation']:.2f}°")
+        self.switch_satellite(entry['satellite'], current_time)
+    
+    def start_constellation_tracking(self, constellation: str, ground_station: Dict,
+                                     simulation_mode: bool = False, start_time: Optional[str] = None,
+                                     gimbal_direction: str = "auto",
+                                     rate_hz: float = DEFAULT_TRACKING_RATE,
+                                     latency_ms: Optional[float] = None,
+                                     window_hours: float = 6.0,
+                                     min_elevation: float = 10.0):
+        """星座跟踪模式：预测所有卫星的过境，按时间表自动在卫星之间交接
+
+        过境预测在后台进行（与后续窗口相同），请求立即返回，首个窗口预测完成后开始跟踪。
+        """
+        tracker_log.info(f"收到星座跟踪请求: {constellation}")
         
-        print(f"[INFO] 开始跟踪卫星: {satellite_data['name']} (NORAD ID: {satellite_data.get('noradId', 'Unknown')})")
-        print(f"[INFO] 地面站位置: {ground_station}")
-        print(f"[INFO] 强制时间模式: {simulation_mode} (前端模拟开关)")
-        print(f"[INFO] 跟踪系统启动成功")
+        satellites = load_tle_data(constellation)
+        if not satellites:
+            raise ValueError(f"无法加载 {constellation} 星座的TLE数据")
+        
+        self.configure_session(ground_station, simulation_mode, start_time,
+                               gimbal_direction, rate_hz, latency_ms)
+        self.handover = {
+            'constellation': constellation,
+            'satellites': satellites,
+            'tles': [satellite_tle(satellite) for satellite in satellites],
+            'window_hours': float(window_hours),
+            'min_elevation': float(min_elevation),
+            'start_time': self.simulation_start_time,
+            'schedule': [],
+            'index': 0,
+            'prefetch': None
+        }
+        # 首颗卫星由 check_handover 在首个窗口预测完成后切换
+        self.current_satellite = None
+        self.pass_plan = None
+        self.azimuth_plan = None
+        self.next_pass = None
+        self.prefetch_handover_window(self.handover)
+        self.launch_tracking_thread()
+        tracker_log.info(f"星座跟踪启动成功, 正在后台预测 {constellation} 星座首个窗口的过境")
+    
+    def get_handover_schedule(self) -> Optional[Dict]:
+        """获取星座交接时间表"""
+        if self.handover is None:
+            return None
+        schedule = [entry for entry in self.handover['schedule'] if 'satellite' in entry]
+        return {
+            'constellation': self.handover['constellation'],
+            'index': self.handover['index'],
+            # 当前时间表已用完，下一个窗口仍在后台预测
+            'predicting': self.handover['index'] >= len(self.handover['schedule']),
+            'schedule': schedule_to_dict(schedule)
+        }
     
     def stop_tracking(self):
         """停止跟踪"""
-        print(f"[INFO] 收到停止跟踪请求")
+        tracker_log.info(f"收到停止跟踪请求")
         
         if not self.is_tracking:
-            print(f"[WARNING] 当前没有正在进行的跟踪任务")
+            tracker_log.warning(f"当前没有正在进行的跟踪任务")
             return
             
-        print(f"[DEBUG] 设置跟踪标志为False")
+        tracker_log.debug(f"设置跟踪标志为False")
         self.is_tracking = False
+        self.stop_event.set()
         
         if self.tracking_thread:
-            print(f"[DEBUG] 等待跟踪线程结束...")
+            tracker_log.debug(f"等待跟踪线程结束...")
             self.tracking_thread.join(timeout=2)
             if self.tracking_thread.is_alive():
-                print(f"[WARNING] 跟踪线程未能在2秒内正常结束")
+                tracker_log.warning(f"跟踪线程未能在2秒内正常结束")
             else:
-                print(f"[DEBUG] 跟踪线程已正常结束")
+                tracker_log.debug(f"跟踪线程已正常结束")
             self.tracking_thread = None
         
-        print(f"[INFO] 卫星跟踪已停止")
+        self.publish_state()
+        tracker_log.info(f"卫星跟踪已停止")
     
     def get_current_position(self) -> Dict:
         """获取当前云台位置"""
         result = {
             'azimuth': self.current_azimuth,
             'elevation': self.current_elevation,
-            'is_tracking': self.is_tracking
+            'is_tracking': self.is_tracking,
+            'state': self.tracking_state if self.is_tracking else 'stopped',
+            'lead_ms': round(self.applied_lead * 1000, 3),
+            'speed': self.current_speed,
+            'acceleration': self.current_acceleration,
+            'commands_sent': self.commands_sent,
+            'commands_skipped': self.commands_skipped
         }
         
+        if self.azimuth_plan is not None:
+            result['azimuth_plan'] = self.azimuth_plan.to_dict()
+        
+        if self.current_satellite is not None:
+            result['satellite'] = self.current_satellite.name
+        
+        if self.next_pass is not None:
+            result['next_aos'] = self.next_pass['aos'].isoformat()
+        
+        if self.scheduler is not None:
+            result['loop_stats'] = self.scheduler.get_stats()
+        
         # 在强制时间模式下添加当前时间
         if self.simulation_mode and hasattr(self, 'current_simulation_time'):
             result['simulation_time'] = self.current_simulation_time.isoformat()
         
         return result
+    
+    def get_gimbal_status(self) -> Dict:
+        """获取云台连接状态、指令统计和最近一次设备反馈"""
+        initialized = self.gimbal_controller is not None
+        result = {
+            'initialized': initialized,
+            'simulation_mode': not initialized
+        }
+        if initialized:
+            result['command_stats'] = self.gimbal_controller.get_command_stats()
+            result['feedback'] = self.gimbal_controller.base_data
+        return result
+    
+    def get_live_state(self) -> Dict:
+        """推送给前端的实时状态：云台指向、跟踪状态和云台反馈"""
+        state = self.get_current_position()
+        state['gimbal'] = self.get_gimbal_status()
+        return state
+    
+    def publish_state(self):
+        """向推送客户端发布最新状态，没有客户端时不组装状态"""
+        if self.broadcaster.has_subscribers:
+            self.broadcaster.publish(self.get_live_state())
 
-# 创建全局跟踪器实例
-tracker = SatelliteTracker()
+# 计算进程池（spawn）的工作进程会以 __mp_main__ 的名义重新导入本模块，
+# 工作进程中不能创建跟踪器（会打开串口）
+if __name__ != '__mp_main__':
+    # 创建全局跟踪器实例
+    tracker = SatelliteTracker()
+    compute_pool.configure(**load_config_section('compute_config'))
 
 @app.route('/')
 def index():
@@ -424,15 +971,15 @@ def api_start_tracking():
         
         # 验证必要参数
         if not data:
-            print(f"[API ERROR] 请求数据为空")
+            api_log.error(f"请求数据为空")
             return jsonify({'error': '请求数据为空'}), 400
             
         if 'satellite' not in data:
-            print(f"[API ERROR] 缺少satellite参数")
+            api_log.error(f"缺少satellite参数")
             return jsonify({'error': '缺少satellite参数'}), 400
             
         if 'groundStation' not in data:
-            print(f"[API ERROR] 缺少groundStation参数")
+            api_log.error(f"缺少groundStation参数")
             return jsonify({'error': '缺少groundStation参数'}), 400
         
         satellite_data = data['satellite']
@@ -440,6 +987,8 @@ def api_start_tracking():
         simulation_mode = data.get('simulationMode', False)
         start_time = data.get('startTime')
         gimbal_direction = data.get('gimbalDirection', 'auto')
+        rate_hz = data.get('rateHz', DEFAULT_TRACKING_RATE)
+        latency_ms = data.get('latencyMs')
         
         # print(f"[API] 解析参数完成 - 卫星: {satellite_data.get('name', 'Unknown')}, 模拟模式: {simulation_mode}, 云台朝向: {gimbal_direction}")
         
@@ -448,19 +997,72 @@ def api_start_tracking():
             ground_station, 
             simulation_mode, 
             start_time,
-            gimbal_direction
+            gimbal_direction,
+            rate_hz,
+            latency_ms
         )
         
         response = {'success': True, 'message': '跟踪已开始'}
+        if tracker.azimuth_plan is not None:
+            response['azimuthPlan'] = tracker.azimuth_plan.to_dict()
         # print(f"[API] 响应成功: {response}")
         return jsonify(response)
     
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 处理失败: {error_msg}")
-        print(f"[API ERROR] 请求数据: {request.get_json() if request.get_json() else 'None'}")
+        api_log.error(f"处理失败: {error_msg}")
+        api_log.error(f"请求数据: {request.get_json() if request.get_json() else 'None'}")
         return jsonify({'error': error_msg}), 500
 
+@app.route('/api/start_constellation_tracking', methods=['POST'])
+def api_start_constellation_tracking():
+    """星座自动交接跟踪API"""
+    try:
+        data = request.get_json()
+        
+        # 验证必要参数
+        if not data:
+            return jsonify({'error': '请求数据为空'}), 400
+            
+        if 'constellation' not in data:
+            return jsonify({'error': '缺少constellation参数'}), 400
+            
+        if 'groundStation' not in data:
+            return jsonify({'error': '缺少groundStation参数'}), 400
+        
+        tracker.start_constellation_tracking(
+            data['constellation'],
+            data['groundStation'],
+            data.get('simulationMode', False),
+            data.get('startTime'),
+            data.get('gimbalDirection', 'auto'),
+            data.get('rateHz', DEFAULT_TRACKING_RATE),
+            data.get('latencyMs'),
+            data.get('windowHours', 6.0),
+            data.get('minElevation', 10.0)
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': '星座跟踪已开始',
+            'handover': tracker.get_handover_schedule()
+        })
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        error_msg = str(e)
+        api_log.error(f"星座跟踪启动失败: {error_msg}")
+        return jsonify({'error': error_msg}), 500
+
+@app.route('/api/handover_schedule')
+def api_handover_schedule():
+    """获取星座交接时间表API"""
+    handover = tracker.get_handover_schedule()
+    if handover is None:
+        return jsonify({'error': '当前不是星座跟踪模式'}), 404
+    return jsonify(handover)
+
 @app.route('/api/stop_tracking', methods=['POST'])
 def api_stop_tracking():
     """停止跟踪API"""
@@ -473,25 +1075,80 @@ def api_stop_tracking():
     
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 停止跟踪失败: {error_msg}")
+        api_log.error(f"停止跟踪失败: {error_msg}")
         return jsonify({'error': error_msg}), 500
 
 @app.route('/api/gimbal_status')
 def api_gimbal_status():
     """获取云台状态API"""
     try:
-        # 检查云台控制器是否已初始化
-        initialized = tracker.gimbal_controller is not None
-        return jsonify({
-            'initialized': initialized,
-            'simulation_mode': not initialized
-        })
+        return jsonify(tracker.get_gimbal_status())
     
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 获取云台状态失败: {error_msg}")
+        api_log.error(f"获取云台状态失败: {error_msg}")
         return jsonify({'error': error_msg}), 500
 
+@app.route('/api/cache_stats')
+def api_cache_stats():
+    """获取缓存统计信息API"""
+    return jsonify({
+        'satellites': satellite_cache.get_stats(),
+        'tle_catalog': tle_catalog.get_stats(),
+        'trajectories': trajectory_cache.get_stats(),
+        'compute_pool': compute_pool.get_stats(),
+        'jobs': job_manager.get_stats()
+    })
+
+@app.route('/api/latency', methods=['GET', 'POST'])
+def api_latency():
+    """查询/设置指向延迟补偿API"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            tracker.set_latency(data.get('latencyMs'), data.get('autoMeasure'))
+        return jsonify(tracker.get_latency_info())
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        error_msg = str(e)
+        api_log.error(f"延迟补偿设置失败: {error_msg}")
+        return jsonify({'error': error_msg}), 500
+
+@app.route('/api/log_level', methods=['GET', 'POST'])
+def api_log_level():
+    """查询/设置各组件日志级别API，POST格式: {"tracker": "DEBUG", "gimbal": "INFO"}"""
+    try:
+        if request.method == 'POST':
+            data = request.get_json() or {}
+            for component, level in data.items():
+                set_level(component, level)
+                api_log.info(f"日志级别设置: {component} -> {level}")
+        return jsonify(get_levels())
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        error_msg = str(e)
+        api_log.error(f"日志级别设置失败: {error_msg}")
+        return jsonify({'error': error_msg}), 500
+
+@app.route('/api/tracking_stream')
+def api_tracking_stream():
+    """实时跟踪状态推送API（SSE），查询参数maxRate为该客户端的推送频率上限（Hz）"""
+    try:
+        stream = tracker.broadcaster.subscribe(request.args.get('maxRate'))
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    
+    # 新客户端连接后立即收到一次当前状态
+    tracker.broadcaster.publish(tracker.get_live_state())
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/get_current_position')
 def api_get_current_position():
     """获取当前位置API"""
@@ -503,7 +1160,7 @@ def api_get_current_position():
     
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 获取当前位置失败: {error_msg}")
+        api_log.error(f"获取当前位置失败: {error_msg}")
         return jsonify({'error': error_msg}), 500
 
 @app.route('/api/calculate_position', methods=['POST'])
@@ -534,8 +1191,8 @@ def api_calculate_position():
         # 解析时间
         current_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
         
-        # 创建地面站
-        ground_station = wgs84.latlon(
+        # 获取地面站（相同位置复用预计算的坐标和旋转矩阵）
+        ground_station = get_ground_station(
             ground_station_data['latitude'], 
             ground_station_data['longitude'], 
             ground_station_data.get('altitude', 0)
@@ -560,107 +1217,210 @@ def api_calculate_position():
     
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 位置计算失败: {error_msg}")
+        api_log.error(f"位置计算失败: {error_msg}")
         return jsonify({'error': error_msg}), 500
 
-def find_pass_candidates_fast(satellite, ground_station, start_time, search_hours=24):
-    """快速搜索过境候选时间段"""
-    candidates = []
-    current_time = start_time
-    end_time = start_time + timedelta(hours=search_hours)
-    
-    # 粗搜索：3分钟间隔快速扫描
-    coarse_step = timedelta(minutes=3)
-    prev_elevation = None
-    
-    while current_time <= end_time:
+def parse_time_grid(times_data):
+    """解析批量计算的时间网格
+
+    支持 {"start": ISO时间, "step": 秒, "count": 点数} 或ISO时间字符串列表，
+    返回(datetime列表, skyfield Time数组)
+    """
+    def parse(value):
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    if isinstance(times_data, dict):
+        start = parse(times_data['start'])
+        step = float(times_data.get('step', 1))
+        count = int(times_data.get('count', 1))
+        if step <= 0 or count <= 0:
+            raise ValueError('step和count必须为正数')
+        if count > MAX_BATCH_TIMES:
+            raise OverflowError(f'时间点数量 {count} 超过上限 {MAX_BATCH_TIMES}')
+        offsets = np.arange(count) * step
+        times = [start + timedelta(seconds=float(offset)) for offset in offsets]
+        t0 = tracker.ts.from_datetime(start)
+        return times, tracker.ts.tt_jd(t0.tt, offsets / 86400.0)
+
+    if isinstance(times_data, list) and times_data:
+        if len(times_data) > MAX_BATCH_TIMES:
+            raise OverflowError(f'时间点数量 {len(times_data)} 超过上限 {MAX_BATCH_TIMES}')
+        times = [parse(value) for value in times_data]
+        return times, tracker.ts.from_datetimes(times)
+
+    raise ValueError('times 必须是 {start, step, count} 或非空的时间列表')
+
+def resolve_batch_satellite(satellite_data: Dict, default_constellation: str):
+    """按TLE或NORAD ID获取卫星对象（NORAD ID从共享的星座目录中查找）"""
+    if satellite_data.get('line1') and satellite_data.get('line2'):
+        return tracker.load_satellite_from_tle(dict(satellite_data, name=satellite_data.get('name', 'Unknown')))
+
+    norad_id = satellite_data.get('noradId')
+    if norad_id is None:
+        raise ValueError('需要提供 line1/line2 或 noradId')
+    constellation = satellite_data.get('constellation', default_constellation)
+    catalog = tle_catalog.get(constellation)
+    satellite = catalog.get_by_norad(norad_id) if catalog else None
+    if satellite is None:
+        raise LookupError(f'在 {constellation} 星座中未找到 NORAD ID {norad_id}')
+    return satellite
+
+def to_json_column(values, digits: int):
+    """数组四舍五入后转为列表，非有限值（如SGP4传播失败）转为None"""
+    values = np.round(np.atleast_1d(values), digits)
+    return [float(value) if math.isfinite(value) else None for value in values]
+
+@app.route('/api/calculate_positions', methods=['POST'])
+def api_calculate_positions():
+    """批量计算多颗卫星在多个时刻的位置API
+
+    请求: {"satellites": [{"name", "line1", "line2"} 或 {"noradId", "constellation"}],
+           "groundStation": {...}, "times": {"start", "step", "count"} 或 [ISO时间, ...],
+           "constellation": NORAD ID默认所属星座}
+    响应按列返回: times 以及每颗卫星的 azimuth / elevation / range / rangeRate 数组，
+    单颗卫星出错时只在该项中返回 error，不影响其他卫星。
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '请求数据为空'}), 400
+        for field in ('satellites', 'groundStation', 'times'):
+            if field not in data:
+                return jsonify({'error': f'缺少{field}参数'}), 400
+        
+        satellites_data = data['satellites']
+        if not isinstance(satellites_data, list) or not satellites_data:
+            return jsonify({'error': 'satellites 必须是非空列表'}), 400
+        if len(satellites_data) > MAX_BATCH_SATELLITES:
+            return jsonify({'error': f'卫星数量 {len(satellites_data)} 超过上限 {MAX_BATCH_SATELLITES}'}), 413
+        
         try:
-            azimuth, elevation = tracker.calculate_satellite_position(
-                satellite, ground_station, current_time, convert_azimuth=False
-            )
-            
-            # 检测仰角变化趋势，寻找过境时间段
-            if prev_elevation is not None:
-                # 如果仰角从负变正或者当前仰角>10度，可能是过境开始
-                if (prev_elevation <= 0 and elevation > 0) or elevation > 10:
-                    # 向前回溯寻找过境开始
-                    pass_start = current_time - timedelta(minutes=15)
-                    pass_end = current_time + timedelta(minutes=15)
-                    candidates.append((pass_start, pass_end))
-                    
-                    # 跳过这个过境时间段，避免重复检测
-                    current_time += timedelta(minutes=20)
-                    prev_elevation = None
-                    continue
-            
-            prev_elevation = elevation
-            current_time += coarse_step
-            
-        except Exception as e:
-            current_time += coarse_step
-            continue
+            times, t_array = parse_time_grid(data['times'])
+        except OverflowError as e:
+            return jsonify({'error': str(e)}), 413
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'时间参数无效: {e}'}), 400
+        
+        if len(times) * len(satellites_data) > MAX_BATCH_POINTS:
+            return jsonify({'error': f'计算点数 {len(times) * len(satellites_data)} 超过上限 {MAX_BATCH_POINTS}'}), 413
+        
+        ground_station_data = data['groundStation']
+        ground_station = get_ground_station(
+            ground_station_data['latitude'],
+            ground_station_data['longitude'],
+            ground_station_data.get('altitude', 0)
+        )
+        
+        default_constellation = data.get('constellation', 'iridium')
+        results = []
+        for index, satellite_data in enumerate(satellites_data):
+            entry = {'index': index}
+            try:
+                satellite = resolve_batch_satellite(satellite_data, default_constellation)
+                entry['name'] = satellite.name.strip() if satellite.name else satellite_data.get('name')
+                entry['noradId'] = satellite.model.satnum
+                azimuth, elevation, distance, range_rate = ground_station.look_angles_and_range_rate(satellite, t_array)
+                entry.update({
+                    'azimuth': to_json_column(azimuth, 3),
+                    'elevation': to_json_column(elevation, 3),
+                    'range': to_json_column(distance, 3),
+                    'rangeRate': to_json_column(range_rate, 5)
+                })
+            except Exception as e:
+                entry['name'] = satellite_data.get('name') if isinstance(satellite_data, dict) else None
+                entry['error'] = str(e)
+                api_log.warning(f"批量计算第 {index} 颗卫星失败: {e}")
+            results.append(entry)
+        
+        return jsonify({
+            'times': [value.isoformat() for value in times],
+            'results': results,
+            'satelliteCount': len(results),
+            'timeCount': len(times),
+            'errorCount': sum(1 for entry in results if 'error' in entry)
+        })
     
-    return candidates
+    except Exception as e:
+        error_msg = str(e)
+        api_log.error(f"批量位置计算失败: {error_msg}")
+        return jsonify({'error': error_msg}), 500
 
-def calculate_detailed_pass(satellite, ground_station, start_time, end_time):
-    """计算详细过境轨迹"""
-    trajectory_points = []
-    current_time = start_time
-    time_step = timedelta(seconds=10)
-    
-    # 批量计算时间点
-    time_points = []
-    temp_time = current_time
-    while temp_time <= end_time:
-        time_points.append(temp_time)
-        temp_time += time_step
+def trajectory_task_args(satellite_data: Dict, ground_station) -> Tuple[Tuple, Tuple]:
+    """计算进程池任务参数：TLE (名称, 第一行, 第二行) 和地面站 (纬度, 经度, 高度米)"""
+    return ((satellite_data['name'], satellite_data['line1'], satellite_data['line2']),
+            (ground_station.latitude, ground_station.longitude, ground_station.altitude))
+
+def cached_pass_candidates(satellite, satellite_data: Dict, ground_station, start_time: datetime,
+                           search_hours: float = 24):
+    """从轨迹缓存获取过境候选，返回(截取到请求窗口的过境列表, 缓存条目)
+
+    缓存未命中时过境搜索在计算进程池中执行。
+    """
+    tle, station = trajectory_task_args(satellite_data, ground_station)
+    entry = trajectory_cache.get_entry(
+        satellite.model.satnum,
+        tle_hash(satellite_data['line1'], satellite_data['line2']),
+        station,
+        start_time, search_hours,
+        lambda window_start, window_end: compute_pool.run(search_passes, tle, station,
+                                                          window_start, window_end)
+    )
+    end_time = start_time + timedelta(hours=search_hours)
+    candidates = trajectory_cache.slice_passes(
+        entry['passes'], start_time, end_time,
+        lambda at_time: ground_station.look_angles(satellite, tracker.ts.from_datetime(at_time))[1]
+    )
+    return candidates, entry
+
+def iter_trajectory_passes(satellite, satellite_data: Dict, ground_station, start_time: datetime,
+                           search_hours: float, min_max_elevation: float,
+                           encoding: Optional[str] = None):
+    """逐个过境生成轨迹记录（流式响应使用）
+
+    搜索窗口按 STREAM_SEARCH_CHUNK_HOURS 分段，每段算完即发出该段内的过境，
+    首个过境不必等整个窗口计算完成；内存占用只与单次过境有关。
+    各段的过境搜索和详细轨迹都在计算进程池中执行。
+    """
+    tle, station = trajectory_task_args(satellite_data, ground_station)
+    end_time = start_time + timedelta(hours=search_hours)
+    yield {
+        'type': 'meta',
+        'satellite': satellite.name.strip() if satellite.name else None,
+        'startTime': start_time.isoformat(),
+        'endTime': end_time.isoformat(),
+        'minMaxElevation': min_max_elevation
+    }
     
-    # 批量计算位置（利用skyfield的向量化能力）
-    try:
-        ts = tracker.ts
-        t_array = ts.from_datetimes(time_points)
-        difference = satellite - ground_station
-        topocentric = difference.at(t_array)
-        alt, az, distance = topocentric.altaz()
-        
-        # 构建结果点
-        for i, time_point in enumerate(time_points):
-            azimuth = az.degrees[i] if hasattr(az.degrees, '__len__') else az.degrees
-            elevation = alt.degrees[i] if hasattr(alt.degrees, '__len__') else alt.degrees
-            
-            is_visible = bool(elevation > 5)
-            
-            point = {
-                'time': time_point.isoformat(),
-                'azimuth': round(float(azimuth), 3),
-                'elevation': round(float(elevation), 3),
-                'visible': is_visible
-            }
-            trajectory_points.append(point)
-            
-    except Exception as e:
-        # 如果批量计算失败，回退到逐点计算
-        print(f"[DEBUG] 批量计算失败，回退到逐点计算: {e}")
-        for time_point in time_points:
-            try:
-                azimuth, elevation = tracker.calculate_satellite_position(
-                    satellite, ground_station, time_point, convert_azimuth=False
-                )
-                
-                is_visible = bool(elevation > 5)
-                
-                point = {
-                    'time': time_point.isoformat(),
-                    'azimuth': round(azimuth, 3),
-                    'elevation': round(elevation, 3),
-                    'visible': is_visible
-                }
-                trajectory_points.append(point)
-                
-            except Exception as e2:
+    pass_count = 0
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + timedelta(hours=STREAM_SEARCH_CHUNK_HOURS), end_time)
+        next_start = window_end
+        for satellite_pass in compute_pool.run(search_passes, tle, station, window_start, window_end):
+            if satellite_pass['los_clipped'] and window_end < end_time:
+                # 跨越分段边界的过境留到下一段从AOS前完整计算
+                aos_start = satellite_pass['aos'] - timedelta(seconds=1)
+                if not satellite_pass['aos_clipped'] and aos_start > window_start:
+                    next_start = aos_start
+                    break
+                # 过境比一个分段还长（如静止轨道卫星）：从本段起点延长搜索直到LOS或窗口结束，
+                # 否则下一段会从本段起点之前重新开始，窗口不断后退
+                extended_end = window_end
+                while satellite_pass['los_clipped'] and extended_end < end_time:
+                    extended_end = min(extended_end + timedelta(hours=STREAM_SEARCH_CHUNK_HOURS), end_time)
+                    satellite_pass = compute_pool.run(search_passes, tle, station, window_start, extended_end)[0]
+                next_start = extended_end if satellite_pass['los_clipped'] else satellite_pass['los']
+            if satellite_pass['max_elevation'] < min_max_elevation:
+                continue
+            result = compute_pool.run(pass_trajectory, tle, station, satellite_pass, encoding)
+            if result is None:
                 continue
+            yield {'type': 'pass', 'index': pass_count, **result}
+            pass_count += 1
+        window_start = next_start
     
-    return trajectory_points
+    yield {'type': 'end', 'passCount': pass_count}
 
 @app.route('/api/calculate_trajectory', methods=['POST'])
 def api_calculate_trajectory():
@@ -688,8 +1448,8 @@ def api_calculate_trajectory():
         # 解析起始时间
         start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
         
-        # 创建地面站
-        ground_station = wgs84.latlon(
+        # 获取地面站（相同位置复用预计算的坐标和旋转矩阵）
+        ground_station = get_ground_station(
             ground_station_data['latitude'], 
             ground_station_data['longitude'], 
             ground_station_data.get('altitude', 0)
@@ -698,61 +1458,118 @@ def api_calculate_trajectory():
         # 加载卫星
         satellite = tracker.load_satellite_from_tle(satellite_data)
         
-        print(f"[API] 开始快速搜索过境候选时间段")
+        # 紧凑格式：起始时间+步长，方位角/仰角按列编码
+        encoding = compact_encoding(request)
         
-        # 第一步：快速搜索过境候选时间段
-        candidates = find_pass_candidates_fast(satellite, ground_station, start_time, 24)
+        # 流式模式：按过境逐条输出窗口内所有满足条件的过境
+        fmt = stream_format(request)
+        if fmt:
+            search_hours = min(float(data.get('searchHours', 24)), MAX_STREAM_SEARCH_HOURS)
+            min_max_elevation = float(data.get('minMaxElevation', TRAJECTORY_MIN_MAX_ELEVATION))
+            api_log.info(f"流式轨迹计算: {search_hours}小时, 格式 {fmt}")
+            return stream_response(
+                iter_trajectory_passes(satellite, satellite_data, ground_station, start_time, search_hours,
+                                       min_max_elevation, encoding),
+                fmt
+            )
+        
+        api_log.info(f"开始搜索过境事件")
+        
+        # 第一步：过境预测引擎一次性求出24小时内所有过境的精确边界（按TLE、地面站和起始时间分桶缓存）
+        candidates, cache_entry = cached_pass_candidates(satellite, satellite_data, ground_station, start_time, 24)
         
         if not candidates:
-            print(f"[API] 未找到过境候选时间段")
+            api_log.info(f"未找到过境候选时间段")
             return jsonify({'error': '在24小时内未找到过境候选时间段'}), 404
         
-        print(f"[API] 找到 {len(candidates)} 个过境候选时间段")
+        api_log.info(f"找到 {len(candidates)} 个过境事件")
         
-        # 第二步：对每个候选时间段进行详细计算
-        for i, (pass_start, pass_end) in enumerate(candidates):
-            print(f"[API] 计算候选时间段 {i+1}/{len(candidates)}: {pass_start} - {pass_end}")
-            
-            # 计算详细轨迹
-            trajectory_points = calculate_detailed_pass(satellite, ground_station, pass_start, pass_end)
-            
-            if not trajectory_points:
+        # 第二步：只对第一个满足最大仰角条件的过境计算详细轨迹
+        for satellite_pass in candidates:
+            if satellite_pass['max_elevation'] < TRAJECTORY_MIN_MAX_ELEVATION:
                 continue
             
-            # 提取可见点并检查最大仰角
-            visible_points = [p for p in trajectory_points if p['visible']]
+            api_log.info(f"找到符合条件的过境事件: {satellite_pass['aos']} - {satellite_pass['los']}, "
+                  f"最大仰角 {satellite_pass['max_elevation']:.2f}°")
             
-            if not visible_points:
+            result = trajectory_cache.get_result(
+                cache_entry, (satellite_pass['aos'], satellite_pass['los'], encoding),
+                lambda: compute_pool.run(
+                    pass_trajectory, *trajectory_task_args(satellite_data, ground_station), satellite_pass, encoding
+                )
+            )
+            if result is None:
                 continue
-                
-            max_elevation = max(p['elevation'] for p in visible_points)
             
-            if max_elevation >= 30.0:
-                # 找到符合条件的过境事件
-                print(f"[API] 找到符合条件的过境事件: 最大仰角 {max_elevation:.2f}°")
-                
-                result = {
-                    'trajectoryPoints': trajectory_points,  # 返回所有轨迹点（包括不可见点）
-                    'visiblePoints': visible_points,       # 仅可见点
-                    'totalPoints': len(trajectory_points),
-                    'visibleCount': len(visible_points),
-                    'maxElevation': round(max_elevation, 2),
-                    'startTime': trajectory_points[0]['time'],      # 使用完整轨迹的开始时间
-                    'endTime': trajectory_points[-1]['time'],       # 使用完整轨迹的结束时间
-                    'actualStartTime': visible_points[0]['time']    # 可见部分的开始时间
-                }
-                
-                return jsonify(result)
+            response = jsonify(result)
+            # 通过Accept头协商到紧凑格式时按协商的媒体类型返回；响应内容随Accept头变化
+            if encoding and accepts_compact(request):
+                response.mimetype = COMPACT_MIME
+            response.vary.add('Accept')
+            return response
         
-        print(f"[API] 所有候选时间段的最大仰角都小于30°")
+        api_log.info(f"所有候选时间段的最大仰角都小于30°")
         return jsonify({'error': '在24小时内未找到最大仰角>=30°的轨迹'}), 404
     
+    except ComputeTimeout as e:
+        api_log.warning(f"轨迹计算超时: {e}")
+        return jsonify({'error': '轨迹计算超时'}), 504
+    
     except Exception as e:
         error_msg = str(e)
-        print(f"[API ERROR] 轨迹计算失败: {error_msg}")
+        api_log.error(f"轨迹计算失败: {error_msg}")
         return jsonify({'error': error_msg}), 500
 
-if __name__ == '__main__':
+def serve(dev: bool = False, threads: Optional[int] = None, port: Optional[int] = None):
+    """启动HTTP服务
+
+    生产模式使用waitress多线程WSGI服务器：单进程内的所有工作线程共享同一个
+    SatelliteTracker和串口，状态读取不需要跨进程同步。SSE推送连接各占一个线程，
+    推送客户端上限按线程数预留出普通请求所需的线程，避免推送连接占满线程池。
+    """
+    config = dict(DEFAULT_SERVER_CONFIG, **load_config_section('server_config'))
+    host = config['host']
+    port = int(port or config['port'])
+    threads = int(threads or config['threads'])
+    
     print("启动卫星跟踪云台控制系统...")
-    print("访问地址: http://localhost:15000")
-    app.run(host='0.0.0.0', port=15000, debug=False)
+    print(f"访问地址: http://localhost:{port}")
+    
+    if not dev:
+        try:
+            from waitress import serve as waitress_serve
+        except ImportError:
+            api_log.warning("waitress未安装，使用Flask多线程开发服务器（pip install waitress）")
+            dev = True
+    
+    if dev:
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+    
+    tracker.broadcaster.max_subscribers = max(1, min(tracker.broadcaster.max_subscribers,
+                                                     threads - int(config['reserved_threads'])))
+    api_log.info(f"生产模式: waitress {threads} 线程, 推送客户端上限 {tracker.broadcaster.max_subscribers}")
+    waitress_serve(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=int(config['connection_limit']),
+        channel_timeout=int(config['channel_timeout']),
+        # 逐块立即发送，保证SSE和NDJSON流式响应不被缓冲
+        send_bytes=1,
+        ident='sat-tracker'
+    )
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='卫星跟踪云台控制系统')
+    parser.add_argument('--dev', action='store_true', help='使用Flask开发服务器')
+    parser.add_argument('--threads', type=int, help='生产模式工作线程数')
+    parser.add_argument('--port', type=int, help='监听端口')
+    args = parser.parse_args()
+    try:
+        serve(dev=args.dev, threads=args.threads, port=args.port)
+    finally:
+        compute_pool.shutdown()
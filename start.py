@@ -72,7 +72,8 @@ def check_dependencies():
         'numpy',
         'serial',
         'requests',
-        'yaml'
+        'yaml',
+        'waitress'
     ]
     
     missing_packages = []
@@ -154,9 +155,14 @@ def install_dependencies():
         print(f"❌ 依赖包安装失败: {e}")
         return False
 
-def start_server():
-    """启动服务器"""
+def start_server(dev=False):
+    """启动服务器
+
+    默认以生产模式（waitress多线程服务器）启动，dev为True时使用Flask开发服务器。
+    服务器与跟踪器、串口在同一个进程内，不要用多进程方式启动多份server.py。
+    """
     print("\n🚀 启动卫星跟踪云台控制系统...")
+    print(f"运行模式: {'开发服务器' if dev else '生产模式 (waitress)'}")
     print("\n" + "="*60)
     print("系统启动中，请稍候...")
     print("访问地址: http://localhost:15000")
@@ -164,8 +170,11 @@ def start_server():
     print("="*60 + "\n")
     
     try:
-        # 启动Flask服务器
-        subprocess.run([sys.executable, 'server.py'])
+        # 启动服务器
+        command = [sys.executable, 'server.py']
+        if dev:
+            command.append('--dev')
+        subprocess.run(command)
     except KeyboardInterrupt:
         print("\n\n🛑 服务已停止")
     except Exception as e:
@@ -208,7 +217,7 @@ def main():
     # 询问是否启动
     response = input("\n是否现在启动服务? (y/n): ")
     if response.lower() in ['y', 'yes', '是', '']:
-        start_server()
+        start_server(dev='--dev' in sys.argv)
     else:
         print("\n可以稍后运行 'python server.py' 启动服务")
 
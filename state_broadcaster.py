@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跟踪状态推送
+
+跟踪循环每个周期发布一次最新状态，各SSE客户端按自己的频率上限取用。
+只保留最新状态（latest-wins），客户端处理慢时跳过中间状态而不是排队积压；
+没有客户端订阅时发布方可以跳过状态组装。
+"""
+
+import json
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+DEFAULT_CLIENT_RATE = 5.0     # 默认每客户端推送频率上限（Hz）
+MAX_CLIENT_RATE = 20.0
+MAX_SUBSCRIBERS = 16
+HEARTBEAT_INTERVAL = 15.0     # 无新状态时的心跳间隔（秒），防止代理断开空闲连接
+
+
+class StateBroadcaster:
+    """单发布者、多订阅者的最新状态广播"""
+
+    def __init__(self, max_subscribers: int = MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        self._state = None
+        self._version = 0
+        self._subscribers = 0
+
+    @property
+    def has_subscribers(self) -> bool:
+        return self._subscribers > 0
+
+    def publish(self, state: Dict):
+        """发布最新状态（不阻塞跟踪循环）"""
+        with self._cond:
+            self._state = state
+            self._version += 1
+            self._cond.notify_all()
+
+    def subscribe(self, rate_hz: Optional[float] = None) -> 'Subscription':
+        """订阅状态，返回SSE文本流（可迭代，关闭时释放名额）；订阅者已满时抛出RuntimeError"""
+        try:
+            rate_hz = float(rate_hz) if rate_hz is not None else DEFAULT_CLIENT_RATE
+        except (TypeError, ValueError):
+            rate_hz = DEFAULT_CLIENT_RATE
+        min_interval = 1.0 / max(0.1, min(MAX_CLIENT_RATE, rate_hz))
+
+        # 检查上限和占用名额在同一把锁内完成，并发连接不会超出上限
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                raise RuntimeError(f'推送客户端数量已达上限 {self.max_subscribers}')
+            self._subscribers += 1
+        return Subscription(self, self._stream(min_interval))
+
+    def _release(self):
+        with self._cond:
+            self._subscribers -= 1
+
+    def _stream(self, min_interval: float) -> Iterator[str]:
+        last_version = -1
+        # 告知浏览器断线后的重连间隔
+        yield 'retry: 2000\n\n'
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._version != last_version, timeout=HEARTBEAT_INTERVAL)
+                if self._version == last_version:
+                    state = None
+                else:
+                    state, last_version = self._state, self._version
+            if state is None:
+                yield ': heartbeat\n\n'
+                continue
+
+            sent_at = time.monotonic()
+            yield f"event: state\ndata: {json.dumps(state, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+            # 频率上限：期间发布的中间状态被跳过，下次直接取最新状态
+            remaining = min_interval - (time.monotonic() - sent_at)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def get_stats(self) -> Dict:
+        return {
+            'subscribers': self._subscribers,
+            'max_subscribers': self.max_subscribers,
+            'published': self._version
+        }
+
+
+class Subscription:
+    """一个订阅者的SSE文本流，subscribe() 时已占用名额
+
+    客户端断开时WSGI服务器调用 close()；响应从未开始迭代（如组装响应时出错）时
+    在对象回收时释放，名额只释放一次。
+    """
+
+    def __init__(self, broadcaster: StateBroadcaster, stream: Iterator[str]):
+        self._broadcaster = broadcaster
+        self._stream = stream
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._stream.close()
+        self._broadcaster._release()
+
+    def __del__(self):
+        self.close()
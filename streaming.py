@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式响应
+
+长时间窗口或整个星座的计算结果边算边发，以换行分隔JSON（NDJSON）或
+Server-Sent Events（SSE）格式输出，浏览器可逐段渲染，服务端内存不随窗口长度增长。
+
+每条记录是带 type 字段的字典（如 meta / pass / results / progress / end / error），
+SSE格式下 type 作为事件名。
+"""
+
+import json
+from typing import Dict, Iterable, Optional
+
+from flask import Response
+
+NDJSON = 'ndjson'
+SSE = 'sse'
+
+MIME_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    SSE: 'text/event-stream'
+}
+
+
+def stream_format(request) -> Optional[str]:
+    """根据查询参数 stream=ndjson|sse 或 Accept 头判断是否使用流式响应"""
+    requested = (request.args.get('stream') or '').lower()
+    if requested in MIME_TYPES:
+        return requested
+    accept = request.headers.get('Accept', '')
+    for fmt, mime in MIME_TYPES.items():
+        if mime in accept:
+            return fmt
+    return None
+
+
+def encode_record(record: Dict, fmt: str) -> str:
+    """将一条记录编码为NDJSON行或SSE事件"""
+    payload = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+    if fmt == SSE:
+        return f"event: {record.get('type', 'message')}\ndata: {payload}\n\n"
+    return payload + '\n'
+
+
+def stream_response(records: Iterable[Dict], fmt: str) -> Response:
+    """将记录生成器包装为流式响应，生成过程中的异常以 error 记录结束流"""
+    def generate():
+        try:
+            for record in records:
+                yield encode_record(record, fmt)
+        except Exception as e:
+            yield encode_record({'type': 'error', 'error': str(e)}, fmt)
+
+    response = Response(generate(), mimetype=MIME_TYPES[fmt])
+    response.headers['Cache-Control'] = 'no-cache'
+    # 禁止反向代理缓冲，保证逐条送达
+    response.headers['X-Accel-Buffering'] = 'no'
+    # 流式格式可由Accept头协商
+    response.vary.add('Accept')
+    return response
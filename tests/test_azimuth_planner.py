@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""整轨方位角展开规划测试"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from azimuth_planner import plan_azimuth_track
+
+# 允许仰角越过天顶的云台范围
+FLIP_LIMITS = {'az_min': -180.0, 'az_max': 180.0, 'el_min': 0.0, 'el_max': 180.0}
+
+
+def low_pass(az_start, az_end, points=61):
+    """方位角从az_start匀速转到az_end的低仰角过境"""
+    azimuths = np.linspace(az_start, az_end, points) % 360.0
+    elevations = 20.0 * np.sin(np.linspace(0.0, np.pi, points))
+    return azimuths, elevations
+
+
+def test_north_crossing_stays_continuous():
+    """越过正北（0/360°）时不回绕，换算结果连续"""
+    azimuths, elevations = low_pass(300.0, 420.0)
+    plan = plan_azimuth_track(azimuths, elevations, ['north'])
+    assert plan.heading == 'north' and not plan.flip
+    assert plan.wrap_count == 0
+
+    converted = [plan.convert(az, el)[0] for az, el in zip(azimuths, elevations)]
+    assert np.max(np.abs(np.diff(converted))) < 5.0
+    assert abs(converted[0] + 60.0) < 1e-6
+    assert abs(converted[-1] - 60.0) < 1e-6
+
+
+def test_south_crossing_wraps_once_when_facing_north():
+    """朝北的云台跟踪越过正南（±180°）的过境需要回绕一次"""
+    azimuths, elevations = low_pass(120.0, 240.0)
+    plan = plan_azimuth_track(azimuths, elevations, ['north'])
+    assert plan.wrap_count == 1
+
+    plan = plan_azimuth_track(azimuths, elevations, ['north', 'south'])
+    assert plan.heading == 'south' and plan.wrap_count == 0
+
+
+def test_overhead_pass_uses_flip():
+    """过顶过境在仰角上限允许时改用翻转，方位轴不必转180°"""
+    points = 61
+    azimuths = np.where(np.arange(points) < points // 2, 90.0, 270.0)
+    elevations = 90.0 - np.abs(np.linspace(-85.0, 85.0, points))
+    plan = plan_azimuth_track(azimuths, elevations, ['north'], FLIP_LIMITS)
+    assert plan.flip and plan.wrap_count == 0
+
+    pointings = [plan.convert(az, el) for az, el in zip(azimuths, elevations)]
+    assert {round(x, 6) for x, _ in pointings} == {90.0}
+    assert max(el for _, el in pointings) > 90.0
+
+    # 不允许越过天顶时没有翻转方案
+    plan = plan_azimuth_track(azimuths, elevations, ['north'])
+    assert not plan.flip
+
+
+def test_empty_track_has_no_plan():
+    assert plan_azimuth_track([], [], ['north']) is None
+
+
+def tracker_plan(azimuths, elevations):
+    start = datetime(2024, 10, 24, tzinfo=timezone.utc)
+    return SimpleNamespace(start_time=start, step=1.0,
+                           azimuth=np.asarray(azimuths, dtype=np.float32),
+                           elevation=np.asarray(elevations, dtype=np.float32)), start
+
+
+def test_auto_mode_never_changes_heading(monkeypatch):
+    """自动模式下即使朝南转动量更小，也只能选择回绕分支和翻转，零点偏移保持朝北"""
+    tracker = server.tracker
+    monkeypatch.setattr(tracker, 'gimbal_direction', 'auto')
+    monkeypatch.setattr(tracker, 'azimuth_plan', None)
+
+    for az_start, az_end in ((120.0, 240.0), (300.0, 420.0), (170.0, 190.0), (200.0, 100.0)):
+        plan, start = tracker_plan(*low_pass(az_start, az_end))
+        tracker.plan_azimuth(plan, start)
+        assert tracker.azimuth_plan.heading == 'north'
+
+        converted, heading = tracker.convert_azimuth_for_gimbal(200.0, start)
+        assert heading == 'north'
+        assert abs(converted + 160.0) < 1e-6
+
+
+def test_explicit_heading_is_respected(monkeypatch):
+    """明确配置朝南时按朝南换算"""
+    tracker = server.tracker
+    monkeypatch.setattr(tracker, 'gimbal_direction', 'south')
+    monkeypatch.setattr(tracker, 'azimuth_plan', None)
+
+    plan, start = tracker_plan(*low_pass(120.0, 240.0))
+    tracker.plan_azimuth(plan, start)
+    assert tracker.azimuth_plan.heading == 'south'
+    assert abs(tracker.azimuth_plan.convert(180.0, 10.0)[0]) < 1e-6
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""下位机指令通道测试：指向指令合并、优先级和队列上限"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base_ctrl
+from base_ctrl import BaseController, CommandQueueFull, f
+
+GIMBAL_CTRL = f['cmd_config']['cmd_gimbal_ctrl']
+LIGHTS_CTRL = f['cmd_config']['cmd_lights_ctrl']
+SERVO_TORQUE = f['cmd_config']['cmd_servo_torque']
+
+
+class FakeSerial:
+    def __init__(self, *args, **kwargs):
+        self.written = []
+
+    def write(self, payload):
+        self.written.append(payload)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    """不启动发送线程的控制器，测试中直接调用 next_command 取出指令"""
+    monkeypatch.setattr(base_ctrl.serial, 'Serial', FakeSerial)
+    monkeypatch.setattr(BaseController, 'process_commands', lambda self: None)
+    return BaseController('/dev/null', 115200)
+
+
+def drain(controller):
+    sent = []
+    while controller.priority_queue or controller.command_queue or controller.pointing_slot:
+        sent.append(controller.next_command()[1])
+    return sent
+
+
+def test_pointing_commands_coalesce(controller):
+    """指向指令只保留最新一条"""
+    for x in range(3):
+        controller.send_command({'T': GIMBAL_CTRL, 'X': x})
+    assert drain(controller) == [{'T': GIMBAL_CTRL, 'X': 2}]
+    assert controller.get_command_stats()['coalesced'] == 2
+
+
+def test_emergency_stop_first_and_drops_pointing(controller):
+    controller.send_command({'T': SERVO_TORQUE, 'id': 1})
+    controller.send_command({'T': GIMBAL_CTRL, 'X': 1})
+    controller.send_command({'T': 0})
+    assert drain(controller) == [{'T': 0}, {'T': SERVO_TORQUE, 'id': 1}]
+    assert controller.get_command_stats()['dropped'] == 1
+
+
+def test_pointing_not_starved_by_fifo(controller):
+    """普通指令连续发送上限条数后，待发的指向指令先行"""
+    for index in range(10):
+        controller.send_command({'T': SERVO_TORQUE, 'id': index})
+    controller.send_command({'T': GIMBAL_CTRL, 'X': 1})
+
+    sent = drain(controller)
+    position = sent.index({'T': GIMBAL_CTRL, 'X': 1})
+    assert position == base_ctrl.MAX_FIFO_BEFORE_POINTING
+    assert [item['id'] for item in sent if item['T'] == SERVO_TORQUE] == list(range(10))
+
+
+def test_pointing_sent_immediately_when_fifo_idle(controller):
+    controller.send_command({'T': SERVO_TORQUE, 'id': 0})
+    assert controller.next_command()[1] == {'T': SERVO_TORQUE, 'id': 0}
+    controller.send_command({'T': GIMBAL_CTRL, 'X': 1})
+    controller.send_command({'T': SERVO_TORQUE, 'id': 1})
+    assert drain(controller) == [{'T': SERVO_TORQUE, 'id': 1}, {'T': GIMBAL_CTRL, 'X': 1}]
+
+
+def test_full_queue_drops_superseded_state_command(controller):
+    """队列满时，状态类指令取代同类型最旧的一条"""
+    for index in range(base_ctrl.MAX_PENDING_COMMANDS):
+        controller.send_command({'T': LIGHTS_CTRL, 'IO4': index, 'IO5': 0})
+    controller.send_command({'T': LIGHTS_CTRL, 'IO4': -1, 'IO5': 0})
+
+    sent = drain(controller)
+    assert len(sent) == base_ctrl.MAX_PENDING_COMMANDS
+    assert sent[0]['IO4'] == 1 and sent[-1]['IO4'] == -1
+    assert controller.get_command_stats()['dropped'] == 1
+
+
+def test_full_queue_rejects_one_shot_command(controller, monkeypatch):
+    """一次性配置指令在队列满时等待空位，超时报错"""
+    monkeypatch.setattr(base_ctrl, 'COMMAND_QUEUE_TIMEOUT', 0.05)
+    for index in range(base_ctrl.MAX_PENDING_COMMANDS):
+        controller.send_command({'T': SERVO_TORQUE, 'id': index})
+    with pytest.raises(CommandQueueFull):
+        controller.send_command({'T': SERVO_TORQUE, 'id': -1})
+    assert len(controller.command_queue) == base_ctrl.MAX_PENDING_COMMANDS
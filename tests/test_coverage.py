@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""覆盖区计算测试：可见圆半径、180°经线拆分和极区覆盖区"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from coverage import EARTH_RADIUS_KM, coverage_angle, footprint_polygons, footprint_rings
+
+ALTITUDE_KM = 780.0
+
+
+def footprints(lat, lon, alt=ALTITUDE_KM, min_elevation=10.0, points=72):
+    ring_lat, ring_lon, angle = footprint_rings(np.atleast_1d(lat), np.atleast_1d(lon), np.atleast_1d(alt),
+                                                min_elevation, points)
+    return footprint_polygons(ring_lat, ring_lon, angle, np.atleast_1d(lat)), angle
+
+
+def central_angle(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    return np.arccos(np.clip(np.sin(lat1) * np.sin(lat2) + np.cos(lat1) * np.cos(lat2) * np.cos(lon2 - lon1),
+                             -1.0, 1.0))
+
+
+def signed_area(ring):
+    return sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(ring, ring[1:]))
+
+
+def assert_valid_ring(ring):
+    """GeoJSON外环：闭合、逆时针、经纬度在范围内"""
+    assert ring[0] == ring[-1] and len(ring) >= 4
+    assert signed_area(ring) > 0
+    assert all(-180.0 <= lon <= 180.0 and -90.0 <= lat <= 90.0 for lon, lat in ring)
+
+
+def test_coverage_angle():
+    # λ = arccos(R·cosε / (R+h)) − ε
+    expected = np.arccos(EARTH_RADIUS_KM * np.cos(np.radians(10.0)) / (EARTH_RADIUS_KM + ALTITUDE_KM)) - \
+        np.radians(10.0)
+    assert coverage_angle(ALTITUDE_KM, 10.0) == pytest.approx(expected)
+    assert coverage_angle(0.0, 10.0) == pytest.approx(0.0, abs=1e-12)
+    assert coverage_angle(-5.0, 0.0) == 0.0
+    angles = coverage_angle(np.array([500.0, 780.0, 1200.0]), 10.0)
+    assert np.all(np.diff(angles) > 0)
+    assert coverage_angle(ALTITUDE_KM, 0.0) > coverage_angle(ALTITUDE_KM, 10.0)
+
+
+def test_ring_points_on_visibility_circle():
+    ring_lat, ring_lon, angle = footprint_rings(np.array([30.0, -60.0]), np.array([100.0, -170.0]),
+                                                np.array([ALTITUDE_KM, ALTITUDE_KM]))
+    for index, (lat, lon) in enumerate(((30.0, 100.0), (-60.0, -170.0))):
+        distances = central_angle(lat, lon, ring_lat[index], ring_lon[index])
+        np.testing.assert_allclose(distances, angle[index], atol=1e-9)
+    # 经度沿边界连续展开
+    assert np.max(np.abs(np.diff(ring_lon, axis=1))) < 10.0
+
+
+def test_simple_footprint_is_one_polygon():
+    [polygon], _ = footprints(30.0, 100.0)
+    [[ring]] = polygon
+    assert_valid_ring(ring)
+
+
+def test_antimeridian_footprint_split():
+    """跨越180°经线的覆盖区拆成东西两块，分别贴住±180°"""
+    [polygon], _ = footprints(10.0, 178.0)
+    assert len(polygon) == 2
+    rings = [part[0] for part in polygon]
+    for ring in rings:
+        assert_valid_ring(ring)
+    edges = sorted(max(abs(lon) for lon, _ in ring) for ring in rings)
+    assert edges == [180.0, 180.0]
+    assert {np.sign(np.mean([lon for lon, _ in ring])) for ring in rings} == {-1.0, 1.0}
+
+    # 两块在180°经线上的纬度范围相同
+    seams = [sorted(lat for lon, lat in ring if abs(lon) == 180.0) for ring in rings]
+    assert seams[0][0] == pytest.approx(seams[1][0], abs=1e-3)
+    assert seams[0][-1] == pytest.approx(seams[1][-1], abs=1e-3)
+
+
+@pytest.mark.parametrize('lat, pole', [(85.0, 90.0), (-84.0, -90.0)])
+def test_polar_cap_is_one_polygon(lat, pole):
+    """包含极点的覆盖区为一个多边形，经度跨满360°并沿极点纬度闭合"""
+    [polygon], angle = footprints(lat, 40.0)
+    assert np.radians(abs(lat)) + angle[0] > np.pi / 2
+    assert len(polygon) == 1 and len(polygon[0]) == 1
+    ring = polygon[0][0]
+    assert_valid_ring(ring)
+    lons = [lon for lon, _ in ring]
+    assert min(lons) == -180.0 and max(lons) == 180.0
+    assert [-180.0, pole] in ring and [180.0, pole] in ring
+    # 离极点最远的边界点在中心经线上
+    farthest = min(abs(point[1]) for point in ring)
+    assert farthest == pytest.approx(abs(lat) - np.degrees(angle[0]), abs=1e-3)
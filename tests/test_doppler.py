@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""多普勒计算测试：解析公式和由SGP4速度求出的距离变化率"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculate import SPEED_OF_LIGHT, calculate_constellation, calculate_doppler
+from ground_station import get_ground_station
+from skyfield.api import EarthSatellite, load
+
+ts = load.timescale()
+
+IRIDIUM_TLE = ('IRIDIUM 106', '1 41917U 17003A   24311.43525397  .00000186  00000+0  59386-4 0  9991',
+               '2 41917  86.3962 334.1578 0002381  84.3457 275.8010 14.34219693408966')
+START_TIME = datetime(2024, 11, 6, tzinfo=timezone.utc)
+FREQUENCY_MHZ = 1621.0
+
+
+def test_doppler_sign_and_magnitude():
+    """接近（距离减小）时频率升高"""
+    doppler = calculate_doppler(np.array([-7.0, 0.0, 7.0]), FREQUENCY_MHZ)
+    expected = 7000.0 / SPEED_OF_LIGHT * FREQUENCY_MHZ * 1e6
+    np.testing.assert_allclose(doppler['relative_velocity'], [7000.0, 0.0, -7000.0])
+    np.testing.assert_allclose(doppler['doppler_shift'], [expected, 0.0, -expected])
+    assert 'doppler_rate' not in doppler and 'uplink_frequency' not in doppler
+
+
+def test_doppler_rate_and_precompensation():
+    doppler = calculate_doppler(-5.0, FREQUENCY_MHZ, range_acceleration=0.05,
+                                options={'precompensation': True, 'uplink_frequency': 1616.0})
+    beta = -5000.0 / SPEED_OF_LIGHT
+    assert doppler['doppler_rate'] == pytest.approx(-50.0 / SPEED_OF_LIGHT * FREQUENCY_MHZ * 1e6)
+    assert doppler['downlink_frequency'] == pytest.approx(FREQUENCY_MHZ * (1.0 - beta))
+    # 卫星以 f/(1-β) 收到上行信号时恰为标称频率
+    assert doppler['uplink_frequency'] * (1.0 - beta) == pytest.approx(1616.0)
+
+    # 未给出上行频率时与下行相同
+    doppler = calculate_doppler(-5.0, FREQUENCY_MHZ, options={'precompensation': True})
+    assert doppler['uplink_frequency'] == pytest.approx(FREQUENCY_MHZ / (1.0 - beta))
+
+
+def test_range_rate_matches_finite_difference():
+    """批量计算的多普勒与skyfield距离的数值差分一致"""
+    step = 30
+    end_time = START_TIME + timedelta(minutes=30)
+    [(name, results)] = calculate_constellation(39.9, 116.4, 0.05, [IRIDIUM_TLE], START_TIME, end_time, step,
+                                                FREQUENCY_MHZ, {'doppler_rate': True})
+    assert name == IRIDIUM_TLE[0]
+    assert len(results) == 61
+
+    satellite = EarthSatellite(IRIDIUM_TLE[1], IRIDIUM_TLE[2], IRIDIUM_TLE[0], ts)
+    station = get_ground_station(39.9, 116.4, 50)
+    offsets = np.arange(len(results)) * step
+    t0 = ts.from_datetime(START_TIME)
+    h = 0.5
+
+    def distance(shift):
+        t = ts.tt_jd(t0.tt, (offsets + shift) / 86400.0)
+        return station.look_angles(satellite, t)[2]
+
+    range_rate = (distance(h) - distance(-h)) / (2 * h)
+    range_acceleration = (distance(h) - 2 * distance(0.0) + distance(-h)) / (h * h)
+    expected = calculate_doppler(range_rate, FREQUENCY_MHZ, range_acceleration)
+
+    shift = np.array([row['doppler_shift'] for row in results])
+    rate = np.array([row['doppler_rate'] for row in results])
+    np.testing.assert_allclose(np.array([row['distance'] for row in results]), distance(0.0), atol=0.01)
+    assert np.max(np.abs(shift)) > 10000.0
+    # 输出保留两位小数；距离二阶差分有舍入噪声
+    np.testing.assert_allclose(shift, expected['doppler_shift'], atol=0.5)
+    np.testing.assert_allclose(rate, expected['doppler_rate'], atol=0.5)
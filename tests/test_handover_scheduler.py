@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""星座交接调度测试：批量过境预测、时间表生成和等待过境时的休眠"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from ground_station import get_ground_station
+from handover_scheduler import build_handover_schedule, predict_constellation_passes, slew_seconds
+from pass_predictor import find_passes
+from skyfield.api import EarthSatellite
+from tracking_scheduler import RateScheduler
+from trajectory import ts
+
+IRIDIUM_TLES = [
+    ('IRIDIUM 106', '1 41917U 17003A   24311.43525397  .00000186  00000+0  59386-4 0  9991',
+     '2 41917  86.3962 334.1578 0002381  84.3457 275.8010 14.34219693408966'),
+    ('IRIDIUM 103', '1 41918U 17003B   24311.77141737 -.00000297  00000+0 -11316-3 0  9996',
+     '2 41918  86.3959 333.9186 0002733  96.3227 263.8280 14.34215928409036'),
+    ('IRIDIUM 109', '1 41919U 17003C   24311.77774110  .00002131  00000+0  75335-3 0  9992',
+     '2 41919  86.3966 333.9658 0002261 100.2440 259.9011 14.34236389409006'),
+    ('IRIDIUM 102', '1 41920U 17003D   24311.67627604  .00000266  00000+0  87804-4 0  9990',
+     '2 41920  86.3964 333.9444 0002170  92.8457 267.2988 14.34214696409071'),
+]
+START_TIME = datetime(2024, 11, 6, tzinfo=timezone.utc)
+
+
+def test_batch_prediction_matches_per_satellite_search():
+    """整个星座一次传播的结果与逐颗卫星 find_passes 一致"""
+    station = get_ground_station(39.9, 116.4, 50)
+    end_time = START_TIME + timedelta(hours=12)
+    passes = predict_constellation_passes(IRIDIUM_TLES, station, ts, START_TIME, end_time, 10.0)
+
+    expected = []
+    for index, (name, line1, line2) in enumerate(IRIDIUM_TLES):
+        satellite = EarthSatellite(line1, line2, name, ts)
+        for satellite_pass in find_passes(satellite, station.topos, ts, START_TIME, end_time, 10.0):
+            expected.append((index, satellite_pass))
+    expected.sort(key=lambda item: item[1]['aos'])
+
+    assert len(passes) == len(expected) > 0
+    assert [p['aos'] for p in passes] == sorted(p['aos'] for p in passes)
+    for found, (index, satellite_pass) in zip(passes, expected):
+        assert found['satellite'] == index
+        assert found['name'] == IRIDIUM_TLES[index][0]
+        assert found['norad_id'] == int(IRIDIUM_TLES[index][1][2:7])
+        for key in ('aos', 'culmination', 'los'):
+            assert abs((found[key] - satellite_pass[key]).total_seconds()) < 0.1
+        assert abs(found['max_elevation'] - satellite_pass['max_elevation']) < 1e-3
+
+
+def test_batch_prediction_empty_window():
+    station = get_ground_station(39.9, 116.4, 50)
+    assert predict_constellation_passes(IRIDIUM_TLES, station, ts, START_TIME, START_TIME) == []
+    assert predict_constellation_passes([], station, ts, START_TIME, START_TIME + timedelta(hours=1)) == []
+
+
+def make_pass(satellite, aos, los, azimuth=0.0):
+    """合成过境：时间为相对START_TIME的秒数，卫星指向固定为(azimuth, 45°)"""
+    return {
+        'satellite': satellite, 'name': satellite, 'norad_id': 0,
+        'aos': START_TIME + timedelta(seconds=aos), 'los': START_TIME + timedelta(seconds=los),
+        'culmination': START_TIME + timedelta(seconds=(aos + los) / 2), 'max_elevation': 45.0,
+        'aos_azimuth': azimuth, 'los_azimuth': azimuth, 'azimuth': azimuth
+    }
+
+
+def schedule_for(passes, end=3600.0, **kwargs):
+    azimuths = {p['satellite']: p['azimuth'] for p in passes}
+    return build_handover_schedule(passes, lambda satellite, at: (azimuths[satellite], 45.0),
+                                   START_TIME, START_TIME + timedelta(seconds=end), **kwargs)
+
+
+def offsets(entry):
+    return ((entry['start'] - START_TIME).total_seconds(), (entry['end'] - START_TIME).total_seconds())
+
+
+def test_overlapping_passes_hand_over_after_slew():
+    """重叠过境：前一颗降落后转向后一颗，开始时间扣除转动时间"""
+    passes = [make_pass('B', 300, 900, azimuth=90.0), make_pass('A', 0, 600)]
+    schedule = schedule_for(passes, slew_rate=30.0, settle_time=2.0)
+
+    assert [entry['satellite'] for entry in schedule] == ['A', 'B']
+    assert offsets(schedule[0]) == (0.0, 600.0)
+    slew = slew_seconds((0.0, 0.0), (90.0, 45.0), 30.0, 2.0)
+    assert schedule[1]['slew_seconds'] == slew
+    assert offsets(schedule[1]) == (600.0 + slew, 900.0)
+
+
+def test_prefers_latest_los_among_simultaneous_starts():
+    """开始时间相近的候选中选降落最晚的一颗，减少交接次数"""
+    passes = [make_pass('short', 0, 400), make_pass('long', 5, 1200)]
+    schedule = schedule_for(passes)
+    assert [entry['satellite'] for entry in schedule] == ['long']
+
+
+def test_skips_remainders_shorter_than_min_segment():
+    passes = [make_pass('A', 0, 600), make_pass('B', 100, 610), make_pass('C', 1000, 1500)]
+    schedule = schedule_for(passes, min_segment=30.0)
+    assert [entry['satellite'] for entry in schedule] == ['A', 'C']
+    assert all(a['end'] <= b['start'] for a, b in zip(schedule, schedule[1:]))
+
+
+def test_schedule_clipped_to_window():
+    schedule = schedule_for([make_pass('A', 3000, 4000)], end=3600.0)
+    assert offsets(schedule[0]) == (3000.0, 3600.0)
+
+
+class RecordingScheduler(RateScheduler):
+    def __init__(self):
+        super().__init__(20.0)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        return super().sleep(0.0)
+
+
+@pytest.fixture
+def waiting_tracker(monkeypatch):
+    """已预置到AOS指向、下一次过境在2小时后的跟踪器"""
+    tracker = server.tracker
+    now = START_TIME
+    monkeypatch.setattr(tracker, 'control_gimbal', lambda *args, **kwargs: None)
+    monkeypatch.setattr(tracker, 'publish_state', lambda: None)
+    monkeypatch.setattr(tracker, 'next_pass', {'aos': now + timedelta(hours=2), 'max_elevation': 45.0})
+    monkeypatch.setattr(tracker, 'aos_pointing', (10.0, 0.0))
+    monkeypatch.setattr(tracker, 'handover', None)
+    return tracker, now
+
+
+def test_hold_sleep_is_clamped(waiting_tracker):
+    tracker, now = waiting_tracker
+    scheduler = RecordingScheduler()
+    tracker.hold_for_next_pass(now, scheduler)
+    assert scheduler.sleeps == [server.IDLE_RECHECK_SECONDS]
+
+
+def test_hold_polls_while_next_window_is_predicted(waiting_tracker, monkeypatch):
+    """时间表已用完、下一个窗口仍在预测中：短间隔醒来，预测出的更早过境不会被错过"""
+    tracker, now = waiting_tracker
+    monkeypatch.setattr(tracker, 'handover', {'schedule': [], 'index': 0, 'prefetch': {'schedule': None}})
+    scheduler = RecordingScheduler()
+    tracker.hold_for_next_pass(now, scheduler)
+    assert scheduler.sleeps == [server.HANDOVER_POLL_SECONDS]
+
+    # 当前时段先于AOS结束时在时段结束时醒来
+    segment_end = now + timedelta(seconds=120)
+    monkeypatch.setattr(tracker, 'handover', {'schedule': [{'end': segment_end}], 'index': 0, 'prefetch': None})
+    scheduler = RecordingScheduler()
+    tracker.hold_for_next_pass(now, scheduler)
+    assert scheduler.sleeps == [120.0]
+
+
+def test_hold_does_not_count_as_overrun(waiting_tracker, monkeypatch):
+    """等待过境的休眠之后，调度器从当前时刻重新对齐，不计为超时"""
+    tracker, now = waiting_tracker
+    monkeypatch.setattr(server, 'MIN_IDLE_SLEEP', 0.01)
+    monkeypatch.setattr(tracker, 'next_pass', {'aos': now + timedelta(seconds=tracker.aos_wake + 0.2),
+                                               'max_elevation': 45.0})
+    scheduler = RateScheduler(20.0)
+    assert scheduler.wait_next_tick()
+    tracker.hold_for_next_pass(now, scheduler)
+    time.sleep(0.01)
+    assert scheduler.wait_next_tick()
+    assert scheduler.overrun_count == 0
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""后台任务管理测试"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobs
+from jobs import JobManager, JobLimitError, COMPLETED, FAILED, CANCELLED
+
+WAIT_SECONDS = 10
+
+
+def wait_finished(job):
+    job.future.result(timeout=WAIT_SECONDS)
+    assert job.is_finished
+
+
+def test_default_limits_fit_memory_budget():
+    """默认行数上限按内存预算换算，在几万行量级"""
+    assert jobs.MAX_JOB_RESULTS * jobs.RESULT_ROW_BYTES <= jobs.MAX_JOB_RESULT_BYTES
+    assert jobs.MAX_RETAINED_RESULTS * jobs.RESULT_ROW_BYTES <= jobs.MAX_RETAINED_RESULT_BYTES
+    assert 10000 <= jobs.MAX_JOB_RESULTS <= jobs.MAX_RETAINED_RESULTS < 100000
+
+
+def test_job_results_are_capped():
+    """超过单任务行数上限时截断结果，任务以错误结束"""
+    manager = JobManager(max_job_results=5)
+
+    def run(job):
+        job.add_results(list(range(3)))
+        job.add_results(list(range(3, 10)))
+
+    job = manager.submit(run, 'cap', total=1)
+    wait_finished(job)
+    assert job.status == FAILED
+    assert job.results == [0, 1, 2, 3, 4]
+    assert job.get_results(3, 10) == [3, 4]
+
+
+def test_finished_jobs_evicted_by_retained_results():
+    """已结束任务的结果总行数超限时先淘汰最早结束的任务"""
+    manager = JobManager(max_job_results=10, max_retained_results=15)
+    finished = []
+    for index in range(3):
+        job = manager.submit(lambda job: job.add_results([index] * 10), f'job {index}', total=1)
+        wait_finished(job)
+        assert job.status == COMPLETED
+        finished.append(job)
+
+    assert manager.get(finished[0].id) is None
+    assert manager.get(finished[1].id) is None
+    assert manager.get(finished[2].id) is finished[2]
+    assert manager.get_stats()['retained_results'] == 10
+
+
+def test_running_results_not_counted_for_eviction():
+    """运行中任务的结果不会导致已结束任务被淘汰"""
+    manager = JobManager(max_job_results=10, max_retained_results=10)
+    done = manager.submit(lambda job: job.add_results([0] * 10), 'done', total=1)
+    wait_finished(done)
+
+    added = threading.Event()
+    release = threading.Event()
+
+    def run(job):
+        job.add_results([1] * 10)
+        added.set()
+        release.wait(WAIT_SECONDS)
+
+    running = manager.submit(run, 'running', total=1)
+    try:
+        assert added.wait(WAIT_SECONDS)
+        assert manager.get(done.id) is done
+    finally:
+        release.set()
+        wait_finished(running)
+
+
+def test_finished_jobs_expire_and_count_limit():
+    manager = JobManager(max_finished=2, result_ttl=3600)
+    submitted = [manager.submit(lambda job: None, f'job {index}', total=1) for index in range(3)]
+    for job in submitted:
+        wait_finished(job)
+    assert [item['jobId'] for item in manager.list()] == [job.id for job in submitted[1:]]
+
+    manager.result_ttl = 0
+    submitted[2].finished -= 1
+    assert manager.get(submitted[2].id) is None
+
+
+def test_pending_limit_and_cancel():
+    """排队任务可直接取消，运行中的任务在可中断点停止；排队+运行中的任务数有上限"""
+    manager = JobManager(max_running=1, max_pending=2)
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            job.cancel_event.wait(0.01)
+
+    running = manager.submit(run, 'running', total=1)
+    assert started.wait(WAIT_SECONDS)
+    queued = manager.submit(run, 'queued', total=1)
+    with pytest.raises(JobLimitError):
+        manager.submit(run, 'rejected', total=1)
+
+    assert manager.cancel(queued.id).status == CANCELLED
+    manager.cancel(running.id)
+    wait_finished(running)
+    assert running.status == CANCELLED
+
+    # 取消后可以再次提交
+    job = manager.submit(lambda job: None, 'after cancel', total=1)
+    wait_finished(job)
+    assert manager.remove(job.id) is job
+    assert manager.get(job.id) is None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""过境预测引擎测试：与 skyfield find_events 对照，以及跟踪计划插值精度"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ground_station import get_ground_station
+from pass_predictor import find_passes, PassPlan
+from skyfield.api import EarthSatellite, load
+
+ts = load.timescale()
+
+IRIDIUM_TLE = {
+    'name': 'IRIDIUM 106',
+    'line1': '1 41917U 17003A   24311.43525397  .00000186  00000+0  59386-4 0  9991',
+    'line2': '2 41917  86.3962 334.1578 0002381  84.3457 275.8010 14.34219693408966'
+}
+START_TIME = datetime(2024, 11, 6, tzinfo=timezone.utc)
+MIN_ELEVATION = 10.0
+
+satellite = EarthSatellite(IRIDIUM_TLE['line1'], IRIDIUM_TLE['line2'], IRIDIUM_TLE['name'], ts)
+topos = get_ground_station(39.9, 116.4, 50).topos
+
+
+def skyfield_passes(start_time, end_time):
+    """skyfield find_events 的完整过境（升起、最高点、降落）"""
+    times, events = satellite.find_events(topos, ts.from_datetime(start_time), ts.from_datetime(end_time),
+                                          altitude_degrees=MIN_ELEVATION)
+    passes = []
+    for index in range(len(events) - 2):
+        if tuple(events[index:index + 3]) == (0, 1, 2):
+            passes.append([t.utc_datetime() for t in times[index:index + 3]])
+    return passes
+
+
+def seconds(a, b):
+    return abs((a - b).total_seconds())
+
+
+def test_find_passes_matches_skyfield():
+    end_time = START_TIME + timedelta(hours=24)
+    expected = skyfield_passes(START_TIME, end_time)
+    passes = [p for p in find_passes(satellite, topos, ts, START_TIME, end_time, min_elevation=MIN_ELEVATION)
+              if not p['aos_clipped'] and not p['los_clipped']]
+
+    assert len(expected) >= 3
+    assert len(passes) == len(expected)
+    for found, (aos, culmination, los) in zip(passes, expected):
+        assert seconds(found['aos'], aos) < 1.0
+        assert seconds(found['los'], los) < 1.0
+        assert seconds(found['culmination'], culmination) < 5.0
+
+        alt, _, _ = (satellite - topos).at(ts.from_datetime(culmination)).altaz()
+        assert abs(found['max_elevation'] - alt.degrees) < 0.05
+        assert found['aos'] < found['culmination'] < found['los']
+
+
+def test_pass_in_progress_is_clipped():
+    """窗口开始时已在过境中：aos 取窗口开始并标记截断"""
+    end_time = START_TIME + timedelta(hours=24)
+    aos, culmination, los = skyfield_passes(START_TIME, end_time)[0]
+    passes = find_passes(satellite, topos, ts, culmination, los + timedelta(minutes=1),
+                         min_elevation=MIN_ELEVATION)
+
+    assert len(passes) == 1
+    assert passes[0]['aos_clipped'] and not passes[0]['los_clipped']
+    assert passes[0]['aos'] == culmination
+    assert seconds(passes[0]['los'], los) < 1.0
+
+
+def test_empty_window():
+    assert find_passes(satellite, topos, ts, START_TIME, START_TIME) == []
+
+
+def test_pass_plan_interpolation():
+    """跟踪计划在采样点之间线性插值，与逐点精确计算一致"""
+    end_time = START_TIME + timedelta(hours=24)
+    aos, culmination, los = skyfield_passes(START_TIME, end_time)[0]
+    plan = PassPlan(satellite, topos, ts, aos, duration=(los - aos).total_seconds(), step=1.0)
+
+    assert plan.covers(culmination)
+    assert not plan.covers(los + timedelta(seconds=5))
+    assert not plan.covers(los - timedelta(seconds=30), margin=60.0)
+
+    offsets = np.linspace(0.3, (los - aos).total_seconds() - 0.3, 25)
+    for offset in offsets:
+        current_time = aos + timedelta(seconds=float(offset))
+        azimuth, elevation, range_rate = plan.sample(current_time)
+
+        topocentric = (satellite - topos).at(ts.from_datetime(current_time))
+        alt, az, _, _, _, rate = topocentric.frame_latlon_and_rates(topos)
+        assert abs((azimuth - az.degrees + 180.0) % 360.0 - 180.0) < 0.05
+        assert abs(elevation - alt.degrees) < 0.05
+        assert abs(range_rate - rate.km_per_s) < 1e-3
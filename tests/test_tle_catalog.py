@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""星座TLE目录测试：按修改时间和内容哈希重新加载，以及名称/NORAD索引"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tle
+from tle import TLECatalog
+
+IRIDIUM_106 = ('IRIDIUM 106',
+               '1 41917U 17003A   24311.43525397  .00000186  00000+0  59386-4 0  9991',
+               '2 41917  86.3962 334.1578 0002381  84.3457 275.8010 14.34219693408966')
+IRIDIUM_103 = ('IRIDIUM 103',
+               '1 41918U 17003B   24311.77141737 -.00000297  00000+0 -11316-3 0  9996',
+               '2 41918  86.3959 333.9186 0002733  96.3227 263.8280 14.34215928409036')
+IRIDIUM_109 = ('IRIDIUM 109',
+               '1 41919U 17003C   24311.77774110  .00002131  00000+0  75335-3 0  9992',
+               '2 41919  86.3966 333.9658 0002261 100.2440 259.9011 14.34236389409006')
+
+
+def write_tle(path, satellites, mtime_ns):
+    # 与下载的文件一致使用CRLF行尾
+    path.write_bytes(''.join(f"{name:<24}\r\n{line1}\r\n{line2}\r\n" for name, line1, line2 in satellites)
+                     .encode('ascii'))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_index_lookup(tmp_path):
+    write_tle(tmp_path / 'iridium.tle', [IRIDIUM_106, IRIDIUM_103], 10 ** 18)
+    catalog = TLECatalog(str(tmp_path)).get('iridium')
+
+    assert catalog.names == ['IRIDIUM 106', 'IRIDIUM 103']
+    assert catalog.get(' IRIDIUM 103 ').model.satnum == 41918
+    assert catalog.get_by_norad('41917').name.strip() == 'IRIDIUM 106'
+    assert catalog.get('IRIDIUM 999') is None and catalog.get('') is None
+
+
+def test_reload_only_when_content_changes(tmp_path):
+    path = tmp_path / 'iridium.tle'
+    write_tle(path, [IRIDIUM_106, IRIDIUM_103], 10 ** 18)
+    catalog = TLECatalog(str(tmp_path))
+
+    first = catalog.get('iridium')
+    assert catalog.get('iridium') is first
+    assert catalog.get_stats()['loads'] == 1 and catalog.get_stats()['hits'] == 1
+
+    # 修改时间变化但内容相同：不重新解析
+    write_tle(path, [IRIDIUM_106, IRIDIUM_103], 2 * 10 ** 18)
+    assert catalog.get('iridium') is first
+    assert catalog.get_stats()['reloads'] == 0
+
+    # 内容变化：重新解析，索引随之更新
+    write_tle(path, [IRIDIUM_106, IRIDIUM_103, IRIDIUM_109], 3 * 10 ** 18)
+    reloaded = catalog.get('iridium')
+    assert reloaded is not first
+    assert reloaded.names[-1] == 'IRIDIUM 109' and reloaded.get_by_norad(41919) is not None
+    stats = catalog.get_stats()
+    assert stats['reloads'] == 1
+    assert stats['constellations'] == {'iridium': 3}
+
+
+def test_invalidate_forces_reparse(tmp_path):
+    write_tle(tmp_path / 'iridium.tle', [IRIDIUM_106], 10 ** 18)
+    catalog = TLECatalog(str(tmp_path))
+    first = catalog.get('iridium')
+    catalog.invalidate('iridium')
+    assert catalog.get('iridium') is not first
+    assert catalog.get_stats()['loads'] == 2
+
+
+def test_missing_file_tries_download(tmp_path, monkeypatch):
+    downloads = []
+
+    def fake_update(constellation):
+        downloads.append(constellation)
+        return False, '下载失败'
+
+    monkeypatch.setattr(tle, 'update_tle_data', fake_update)
+    catalog = TLECatalog(str(tmp_path))
+    assert catalog.get('starlink') is None
+    assert downloads == ['starlink']
+
+    # 下载成功后重新加载
+    def fake_download(constellation):
+        write_tle(tmp_path / f'{constellation}.tle', [IRIDIUM_106], 10 ** 18)
+        return True, 'ok'
+
+    monkeypatch.setattr(tle, 'update_tle_data', fake_download)
+    assert catalog.get('starlink').names == ['IRIDIUM 106']
+
+
+def test_empty_file_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(tle, 'update_tle_data', lambda constellation: (False, '下载失败'))
+    (tmp_path / 'iridium.tle').write_bytes(b'')
+    assert TLECatalog(str(tmp_path)).get('iridium') is None
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""跟踪循环调度器测试：截止时间推进和超时统计"""
+
+import math
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracking_scheduler
+from tracking_scheduler import (RateScheduler, clamp_rate, DEFAULT_TRACKING_RATE, MAX_TRACKING_RATE,
+                                MIN_TRACKING_RATE)
+
+
+class FakeClock:
+    """可控的单调时钟；stop_event.wait 推进时钟而不真正等待"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeEvent(threading.Event):
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.waits = []
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        self.clock.now += timeout
+        return self.is_set()
+
+
+def make_scheduler(monkeypatch, rate_hz):
+    clock = FakeClock()
+    monkeypatch.setattr(tracking_scheduler.time, 'monotonic', clock.monotonic)
+    event = FakeEvent(clock)
+    return RateScheduler(rate_hz, event), clock, event
+
+
+def test_clamp_rate():
+    assert clamp_rate(5) == 5.0
+    assert clamp_rate(0) == MIN_TRACKING_RATE
+    assert clamp_rate(1000) == MAX_TRACKING_RATE
+    for value in (None, 'fast', math.nan, math.inf):
+        assert clamp_rate(value) == DEFAULT_TRACKING_RATE
+
+
+def test_ticks_follow_absolute_deadlines(monkeypatch):
+    """每个周期的工作耗时不会累积成漂移"""
+    scheduler, clock, _ = make_scheduler(monkeypatch, 10.0)
+    ticks = []
+    for _ in range(20):
+        assert scheduler.wait_next_tick()
+        ticks.append(clock.now)
+        clock.now += 0.03   # 每周期工作30ms
+    assert ticks[-1] - ticks[0] == pytest.approx(1.9)
+    assert scheduler.overrun_count == 0
+
+
+def test_overrun_skips_missed_ticks(monkeypatch):
+    """超过截止时间时记录一次超时并跳过错过的周期，之后仍对齐原时间网格"""
+    scheduler, clock, _ = make_scheduler(monkeypatch, 10.0)
+    start = clock.now
+    scheduler.wait_next_tick()
+    clock.now += 0.35   # 工作耗时3.5个周期
+
+    scheduler.wait_next_tick()
+    stats = scheduler.get_stats()
+    assert stats['overruns'] == 1
+    assert stats['skipped_ticks'] == 2
+    assert stats['last_lateness_ms'] == pytest.approx(250.0)
+
+    scheduler.wait_next_tick()
+    assert clock.now - start == pytest.approx(0.4)
+    assert scheduler.overrun_count == 1
+
+
+def test_sleep_realigns_without_overrun(monkeypatch):
+    scheduler, clock, _ = make_scheduler(monkeypatch, 10.0)
+    scheduler.wait_next_tick()
+    assert scheduler.sleep(600.0)
+    clock.now += 0.02
+    scheduler.wait_next_tick()
+    assert scheduler.overrun_count == 0
+    assert scheduler.skipped_ticks == 0
+
+
+def test_stop_event_interrupts(monkeypatch):
+    scheduler, _, event = make_scheduler(monkeypatch, 10.0)
+    assert scheduler.wait_next_tick()
+    event.set()
+    assert not scheduler.wait_next_tick()
+    assert not scheduler.sleep(10.0)
+
+
+def test_elapsed_uses_monotonic_clock(monkeypatch):
+    scheduler, clock, _ = make_scheduler(monkeypatch, 1.0)
+    clock.now += 12.5
+    assert scheduler.elapsed() == 12.5
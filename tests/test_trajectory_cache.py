@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""轨迹结果缓存测试：窗口截取、存活时间、LRU淘汰和TLE更新"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trajectory_cache as cache_module
+from trajectory_cache import TrajectoryCache
+
+START_TIME = datetime(2024, 10, 24, tzinfo=timezone.utc)
+STATION = (39.9, 116.4, 50.0)
+
+
+def at(seconds):
+    return START_TIME + timedelta(seconds=seconds)
+
+
+def make_pass(aos, culmination, los, max_elevation=60.0):
+    return {'aos': at(aos), 'culmination': at(culmination), 'los': at(los), 'max_elevation': max_elevation,
+            'aos_clipped': False, 'los_clipped': False}
+
+
+class Counter:
+    """记录调用次数的过境搜索函数"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, window_start, window_end):
+        self.calls.append((window_start, window_end))
+        return []
+
+
+def lookup(cache, compute, satellite='sat', tle='tle-a', start=START_TIME):
+    return cache.get_entry(satellite, tle, STATION, start, 24, compute)
+
+
+def test_bucket_window_covers_search_hours():
+    cache = TrajectoryCache(bucket_seconds=3600)
+    compute = Counter()
+    entry = lookup(cache, compute, start=at(1800))
+    assert entry['window_start'] == START_TIME
+    assert entry['window_end'] == START_TIME + timedelta(hours=25)
+
+    # 同一桶内的其他起始时间命中缓存
+    assert lookup(cache, compute, start=at(3599)) is entry
+    assert len(compute.calls) == 1
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_slice_passes():
+    passes = [make_pass(0, 300, 600), make_pass(1000, 1300, 1600), make_pass(5000, 5300, 5600)]
+    sliced = TrajectoryCache.slice_passes(passes, at(400), at(5200), lambda t: -1.0)
+
+    assert len(sliced) == 3
+    # 窗口开始时正在进行、最高点已过：AOS和最高点截到窗口开始，最大仰角取该时刻的仰角
+    assert sliced[0]['aos'] == sliced[0]['culmination'] == at(400)
+    assert sliced[0]['aos_clipped'] and sliced[0]['max_elevation'] == -1.0
+    assert sliced[1] is passes[1]
+    # 窗口结束时最高点未到：LOS和最高点截到窗口结束
+    assert sliced[2]['los'] == sliced[2]['culmination'] == at(5200)
+    assert sliced[2]['los_clipped']
+    # 原列表不被修改
+    assert passes[0]['aos'] == at(0) and not passes[0]['aos_clipped']
+
+    assert TrajectoryCache.slice_passes(passes, at(600), at(1000), lambda t: 0.0) == []
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = TrajectoryCache(ttl_seconds=60)
+    compute = Counter()
+    lookup(cache, compute)
+    now[0] += 30
+    lookup(cache, compute)
+    now[0] += 31
+    lookup(cache, compute)
+    assert len(compute.calls) == 2
+
+
+def test_expired_entries_pruned(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = TrajectoryCache(ttl_seconds=60)
+    compute = Counter()
+    lookup(cache, compute, satellite='a', tle='tle-a')
+    now[0] += 61
+    lookup(cache, compute, satellite='b', tle='tle-b')
+    stats = cache.get_stats()
+    assert stats['size'] == 1 and stats['tracked_satellites'] == 1
+
+
+def test_lru_eviction_prunes_tle_records():
+    """条目按LRU淘汰，卫星的条目全部淘汰后它的TLE记录也随之删除"""
+    cache = TrajectoryCache(max_entries=3)
+    compute = Counter()
+    for index in range(10):
+        lookup(cache, compute, satellite=index, tle=f'tle-{index}')
+    stats = cache.get_stats()
+    assert stats['size'] == 3
+    assert stats['tracked_satellites'] == 3
+
+    # 最近使用的条目保留
+    lookup(cache, compute, satellite=9, tle='tle-9')
+    assert len(compute.calls) == 10
+    lookup(cache, compute, satellite=0, tle='tle-0')
+    assert len(compute.calls) == 11
+
+
+def test_tle_update_invalidates_old_entries():
+    cache = TrajectoryCache()
+    compute = Counter()
+    lookup(cache, compute, tle='tle-a')
+    lookup(cache, compute, tle='tle-a', start=at(7200))
+    lookup(cache, compute, tle='tle-b')
+    stats = cache.get_stats()
+    assert stats['invalidations'] == 2
+    assert stats['size'] == 1
+
+
+def test_results_lru():
+    cache = TrajectoryCache(max_results=2)
+    entry = lookup(cache, Counter())
+    computed = []
+
+    def result(key):
+        return cache.get_result(entry, key, lambda: computed.append(key) or key)
+
+    assert [result(key) for key in ('a', 'b', 'a', 'c', 'a', 'b')] == ['a', 'b', 'a', 'c', 'a', 'b']
+    assert computed == ['a', 'b', 'c', 'b']
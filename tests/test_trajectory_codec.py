@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""轨迹紧凑编码测试：编码还原和内容协商"""
+
+import base64
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from compute_pool import compute_pool
+from trajectory_codec import COMPACT_MIME, DELTA_SCALE, compact_encoding, encode_trajectory
+
+START_TIME = datetime(2024, 10, 24, tzinfo=timezone.utc)
+
+# 天通一号（静止轨道），对地面站全天可见
+GEO_TLE = {
+    'name': 'TIANTONG1 1',
+    'line1': '1 41725U 16048A   24297.85203473 -.00000326  00000-0  00000-0 0  9996',
+    'line2': '2 41725   2.8102  33.3680 0003993 265.4167 142.0666  1.00275528 30246'
+}
+
+
+def decode_column(column, encoding, scale):
+    """按模块文档说明还原一列"""
+    if encoding == 'float32':
+        return np.frombuffer(base64.b64decode(column), dtype='<f4').astype(float)
+    return np.cumsum(column) / scale
+
+
+def sample_track():
+    # 方位角越过0/360，仰角先升后降
+    azimuth = (np.linspace(300.0, 420.0, 121) + 0.0004) % 360.0
+    elevation = 40.0 * np.sin(np.linspace(-0.2, np.pi + 0.2, 121))
+    return azimuth, elevation
+
+
+@pytest.mark.parametrize('encoding, tolerance', [('float32', 1e-4), ('delta', 0.5 / DELTA_SCALE + 1e-9)])
+def test_round_trip(encoding, tolerance):
+    azimuth, elevation = sample_track()
+    encoded = encode_trajectory(START_TIME, 10, azimuth, elevation, 5.0, encoding)
+
+    assert encoded['count'] == azimuth.size
+    assert datetime.fromisoformat(encoded['startTime']) == START_TIME
+    scale = encoded['scale']
+    decoded_azimuth = decode_column(encoded['azimuth'], encoding, scale) % 360.0
+    decoded_elevation = decode_column(encoded['elevation'], encoding, scale)
+
+    azimuth_error = np.abs((decoded_azimuth - azimuth + 180.0) % 360.0 - 180.0)
+    assert np.max(azimuth_error) <= tolerance
+    assert np.max(np.abs(decoded_elevation - elevation)) <= tolerance
+
+    visible = np.flatnonzero(elevation > 5.0)
+    assert encoded['visibleRange'] == [visible[0], visible[-1]]
+    assert encoded['visibleCount'] == visible.size
+
+
+def test_delta_columns_are_small_integers():
+    """delta编码展开方位角后差分，越过0/360时不会出现大跳变"""
+    azimuth, elevation = sample_track()
+    encoded = encode_trajectory(START_TIME, 10, azimuth, elevation, 5.0, 'delta')
+    assert all(isinstance(value, int) for value in encoded['azimuth'])
+    assert max(abs(value) for value in encoded['azimuth'][1:]) <= 2 * DELTA_SCALE
+
+
+def test_no_visible_points():
+    encoded = encode_trajectory(START_TIME, 10, [10.0, 20.0], [-5.0, -1.0], 5.0, 'float32')
+    assert encoded['visibleRange'] is None and encoded['visibleCount'] == 0
+
+
+@pytest.mark.parametrize('query, accept, expected', [
+    ('', 'application/json', None),
+    ('?format=compact', '', 'float32'),
+    ('?format=compact&encoding=delta', '', 'delta'),
+    ('?format=compact&encoding=bogus', '', 'float32'),
+    ('?encoding=delta', COMPACT_MIME, 'delta'),
+])
+def test_negotiation(query, accept, expected):
+    with server.app.test_request_context('/api/calculate_trajectory' + query, headers={'Accept': accept}):
+        assert compact_encoding(server.request) == expected
+
+
+def request_trajectory(client, query='', accept='application/json'):
+    return client.post('/api/calculate_trajectory' + query, headers={'Accept': accept}, json={
+        'satellite': GEO_TLE,
+        'groundStation': {'latitude': 39.9, 'longitude': 116.4, 'altitude': 50},
+        'startTime': START_TIME.isoformat()
+    })
+
+
+def test_response_media_type():
+    """通过Accept头协商到紧凑格式时使用紧凑格式的媒体类型，并声明 Vary: Accept"""
+    compute_pool.configure(enabled=False)
+    client = server.app.test_client()
+
+    response = request_trajectory(client, accept=COMPACT_MIME)
+    assert response.status_code == 200
+    assert response.mimetype == COMPACT_MIME
+    assert 'Accept' in response.headers.get('Vary', '')
+    assert response.get_json()['format'] == 'compact'
+
+    response = request_trajectory(client)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers.get('Vary', '')
+
+    response = request_trajectory(client, query='?format=compact')
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['format'] == 'compact'
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""流式轨迹搜索回归测试"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from compute_pool import compute_pool
+from ground_station import get_ground_station
+from skyfield.api import EarthSatellite
+from trajectory import ts, search_passes
+
+# 天通一号（静止轨道），对地面站全天可见
+GEO_TLE = {
+    'name': 'TIANTONG1 1',
+    'line1': '1 41725U 16048A   24297.85203473 -.00000326  00000-0  00000-0 0  9996',
+    'line2': '2 41725   2.8102  33.3680 0003993 265.4167 142.0666  1.00275528 30246'
+}
+
+
+MAX_SEARCH_CALLS = 20
+
+
+def test_geo_pass_longer_than_search_chunk_terminates(monkeypatch):
+    """过境长于搜索分段时窗口不能后退，流必须结束且只发出一次过境"""
+    compute_pool.configure(enabled=False)
+    windows = []
+
+    def bounded_search(tle, station, window_start, window_end):
+        windows.append(window_start)
+        assert len(windows) <= MAX_SEARCH_CALLS, f"搜索窗口没有前进: {windows[-3:]}"
+        return search_passes(tle, station, window_start, window_end)
+
+    monkeypatch.setattr(server, 'search_passes', bounded_search)
+    satellite = EarthSatellite(GEO_TLE['line1'], GEO_TLE['line2'], GEO_TLE['name'], ts)
+    ground_station = get_ground_station(39.9, 116.4, 50)
+    start_time = datetime(2024, 10, 24, tzinfo=timezone.utc)
+
+    records = list(server.iter_trajectory_passes(satellite, GEO_TLE, ground_station, start_time, 24, 0))
+
+    assert records[-1]['type'] == 'end'
+    passes = [record for record in records if record['type'] == 'pass']
+    assert len(passes) == records[-1]['passCount'] == 1
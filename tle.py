@@ -2,12 +2,28 @@
 from flask import Blueprint, request, jsonify
 import configparser
 from datetime import datetime
+import hashlib
+import io
 import requests
 import os
+import threading
 from skyfield.api import load
+from skyfield.iokit import parse_tle_file
+from sgp4.exporter import export_tle
+
+from log_config import get_logger
+
+logger = get_logger('tle')
 
 tle_bp = Blueprint('tle', __name__)
 
+ts = load.timescale()
+
+def satellite_tle(satellite):
+    """卫星对象的可序列化TLE (名称, 第一行, 第二行)，用于提交计算进程池"""
+    line1, line2 = export_tle(satellite.model)
+    return (satellite.name.strip(), line1, line2)
+
 def update_tle_data(constellation=None):
     config = configparser.ConfigParser()
     config.read('config.ini')
@@ -37,7 +53,7 @@ def update_tle_data(constellation=None):
 
     if should_update:
         try:
-            print(f"正在从 {tle_url} 下载 TLE 数据...")
+            logger.info(f"正在从 {tle_url} 下载 TLE 数据...")
             response = requests.get(tle_url)
             if response.status_code == 200:
                 # 根据星座类型选择处理方式
@@ -52,7 +68,7 @@ def update_tle_data(constellation=None):
                     from dtc import filter_dtc_satellites_streaming
                     dtc_success = filter_dtc_satellites_streaming(response.text, dtc_file_name)
                     if dtc_success:
-                        print(f"DTC 过滤数据已保存到 {dtc_file_name}")
+                        logger.info(f"DTC 过滤数据已保存到 {dtc_file_name}")
                     
                 elif constellation == 'x2':
                     # X2 星座需要特殊过滤
@@ -78,18 +94,18 @@ def update_tle_data(constellation=None):
                     with open('config.ini', 'w') as f:
                         config.write(f)
 
-                    print(f"{constellation} 的 TLE 数据已更新。")
+                    logger.info(f"{constellation} 的 TLE 数据已更新。")
                     return True, f"{constellation} 的 TLE 数据已更新。"
                 else:
                     return False, f"处理 {constellation} 数据时出错"
             else:
-                print(f"TLE 数据更新失败: 状态码 {response.status_code}")
+                logger.error(f"TLE 数据更新失败: 状态码 {response.status_code}")
                 return False, f"TLE 数据更新失败: 状态码 {response.status_code}"
         except Exception as e:
-            print(f"更新 TLE 数据时发生错误: {e}")
+            logger.error(f"更新 TLE 数据时发生错误: {e}")
             return False, f"更新 TLE 数据时发生错误: {e}"
 
-    print("无需更新 TLE 数据。")
+    logger.info("无需更新 TLE 数据。")
     return True, "无需更新 TLE 数据。"
 
 @tle_bp.route('/update_tle', methods=['POST'])
@@ -97,33 +113,138 @@ def update_tle_route():
     data = request.json
     constellation = data.get('constellation')
     success, message = update_tle_data(constellation)
+    if success:
+        # 文件修改时间变化也会触发重新解析，这里直接失效以免同一秒内的更新被漏掉
+        tle_catalog.invalidate(constellation)
     return jsonify({'success': success, 'message': message})
 
-def load_tle_data(constellation='iridium'):
-    """加载TLE数据，如果文件不存在则自动下载"""
-    tle_file = f'./tle/{constellation}.tle'
-    try:
-        # 尝试加载TLE文件
-        try:
-            satellites = load.tle_file(tle_file)
-            if not satellites:  # 如果加载结果为空
-                raise FileNotFoundError
-            return satellites
-        except (FileNotFoundError, OSError):
-            # 文件不存在或加载失败时，尝试下载
-            print(f"TLE文件 {tle_file} 不存在或加载失败，尝试下载...")
-            success, message = update_tle_data(constellation)
-            if success:
-                # 重新尝试加载
-                satellites = load.tle_file(tle_file)
-                return satellites
-            else:
-                print(f"下载TLE数据失败: {message}")
+class ConstellationCatalog:
+    """一个星座TLE文件解析后的快照，带名称和NORAD ID索引"""
+
+    def __init__(self, constellation, satellites, mtime_ns, size, digest):
+        self.constellation = constellation
+        self.satellites = satellites
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.loaded_at = datetime.now()
+        self.names = [sat.name.strip() for sat in satellites]
+        # 同名或同一NORAD ID出现多次时保留文件中的第一条，与原线性查找结果一致
+        self.by_name = {}
+        self.by_norad = {}
+        for sat in satellites:
+            self.by_name.setdefault(sat.name.strip(), sat)
+            self.by_norad.setdefault(sat.model.satnum, sat)
+
+    def get(self, name):
+        """按名称查找卫星（忽略首尾空格）"""
+        return self.by_name.get(name.strip()) if name else None
+
+    def get_by_norad(self, norad_id):
+        """按NORAD ID查找卫星"""
+        return self.by_norad.get(int(norad_id))
+
+
+class TLECatalog:
+    """进程内共享的星座目录：每个星座只解析一次
+
+    每次获取时检查文件的修改时间和大小，变化后再比较内容哈希，
+    内容确实变化（如 /update_tle 下载了新数据）才重新解析。
+    """
+
+    def __init__(self, tle_dir='./tle'):
+        self.tle_dir = tle_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.reloads = 0
+
+    def path(self, constellation):
+        return os.path.join(self.tle_dir, f"{constellation}.tle")
+
+    def get(self, constellation='iridium'):
+        """获取星座目录，文件不存在时尝试下载，失败返回None"""
+        with self._lock:
+            try:
+                return self._get_locked(constellation)
+            except (FileNotFoundError, OSError, ValueError):
+                pass
+            except Exception as e:
+                logger.error(f"加载 {constellation} 的 TLE 数据时出错: {e}")
+                return None
+
+        # 文件不存在或加载失败时，尝试下载（下载期间不持有锁）
+        logger.warning(f"TLE文件 {self.path(constellation)} 不存在或加载失败，尝试下载...")
+        success, message = update_tle_data(constellation)
+        if not success:
+            logger.error(f"下载TLE数据失败: {message}")
+            return None
+        with self._lock:
+            try:
+                return self._get_locked(constellation)
+            except Exception as e:
+                logger.error(f"加载 {constellation} 的 TLE 数据时出错: {e}")
                 return None
-                
-    except Exception as e:
-        print(f"加载 {constellation} 的 TLE 数据时出错: {e}")
-        return None
+
+    def _get_locked(self, constellation):
+        tle_file = self.path(constellation)
+        stat = os.stat(tle_file)
+        entry = self._entries.get(constellation)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            self.hits += 1
+            return entry
+
+        with open(tle_file, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry is not None and entry.digest == digest:
+            # 只是修改时间变化（如重新下载了相同数据），无需重新解析
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            self.hits += 1
+            return entry
+
+        satellites = list(parse_tle_file(io.BytesIO(data), ts))
+        if not satellites:
+            raise ValueError(f"{tle_file} 中没有有效的TLE数据")
+        if entry is None:
+            self.loads += 1
+        else:
+            self.reloads += 1
+            logger.info(f"{constellation} 的 TLE 文件已变化，重新解析")
+        entry = ConstellationCatalog(constellation, satellites, stat.st_mtime_ns, stat.st_size, digest)
+        self._entries[constellation] = entry
+        logger.info(f"已加载 {constellation} 星座: {len(satellites)} 颗卫星")
+        return entry
+
+    def invalidate(self, constellation=None):
+        """使目录失效，下次获取时重新检查并解析文件"""
+        with self._lock:
+            if constellation:
+                self._entries.pop(constellation, None)
+            else:
+                self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'constellations': {name: len(entry.satellites) for name, entry in self._entries.items()},
+                'hits': self.hits,
+                'loads': self.loads,
+                'reloads': self.reloads
+            }
+
+
+# 进程内共享的星座目录
+tle_catalog = TLECatalog()
+
+def load_tle_data(constellation='iridium'):
+    """加载TLE数据，如果文件不存在则自动下载
+
+    返回星座目录中共享的卫星列表（调用方不要修改）。
+    """
+    catalog = tle_catalog.get(constellation)
+    return catalog.satellites if catalog else None
 
 def get_satellite_names(satellites):
     if satellites:
@@ -140,6 +261,6 @@ def get_constellations():
 @tle_bp.route('/get_satellite_names', methods=['GET'])
 def get_satellite_names_route():
     constellation = request.args.get('constellation', 'iridium')
-    satellites = load_tle_data(constellation)
-    names = get_satellite_names(satellites)
+    catalog = tle_catalog.get(constellation)
+    names = list(catalog.names) if catalog else []
     return jsonify({'satellite_names': names})
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跟踪循环调度器
+
+按单调时钟的绝对截止时间推进，不因计算和打印耗时而累积漂移，
+并统计超时（overrun）情况。
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+# 跟踪频率允许范围（Hz）
+MIN_TRACKING_RATE = 1.0
+MAX_TRACKING_RATE = 20.0
+DEFAULT_TRACKING_RATE = 1.0
+
+
+def clamp_rate(rate_hz) -> float:
+    """将请求的跟踪频率限制在允许范围内"""
+    try:
+        rate_hz = float(rate_hz)
+    except (TypeError, ValueError):
+        return DEFAULT_TRACKING_RATE
+    if not math.isfinite(rate_hz):
+        return DEFAULT_TRACKING_RATE
+    return max(MIN_TRACKING_RATE, min(MAX_TRACKING_RATE, rate_hz))
+
+
+class RateScheduler:
+    """基于单调时钟截止时间的固定频率调度器"""
+
+    def __init__(self, rate_hz: float = DEFAULT_TRACKING_RATE,
+                 stop_event: Optional[threading.Event] = None):
+        self.rate_hz = clamp_rate(rate_hz)
+        self.period = 1.0 / self.rate_hz
+        self.stop_event = stop_event or threading.Event()
+
+        self.start_monotonic = time.monotonic()
+        self.next_deadline = self.start_monotonic
+        self.tick_count = 0
+        self.overrun_count = 0
+        self.skipped_ticks = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def elapsed(self) -> float:
+        """自调度器启动以来经过的单调时间（秒）"""
+        return time.monotonic() - self.start_monotonic
+
+    def wait_next_tick(self) -> bool:
+        """等待下一个截止时间，返回False表示已收到停止信号
+
+        如果上一周期的工作超过了截止时间，记录一次overrun并跳过错过的周期，
+        使后续节拍仍对齐到原始时间网格。
+        """
+        now = time.monotonic()
+        lateness = now - self.next_deadline
+        if lateness > 0 and self.tick_count > 0:
+            self.overrun_count += 1
+            self.last_lateness = lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+            missed = int(lateness // self.period)
+            if missed > 0:
+                self.skipped_ticks += missed
+                self.next_deadline += missed * self.period
+        elif self.next_deadline > now:
+            if self.stop_event.wait(self.next_deadline - now):
+                return False
+
+        self.next_deadline += self.period
+        self.tick_count += 1
+        return not self.stop_event.is_set()
+
+    def sleep(self, seconds: float) -> bool:
+        """可被停止信号打断的休眠，醒来后从当前时刻重新对齐节拍，返回False表示已收到停止信号"""
+        if self.stop_event.wait(max(0.0, seconds)):
+            return False
+        self.reset_deadline()
+        return True
+
+    def reset_deadline(self):
+        """长时间停顿（休眠、过境搜索）后从当前时刻重新对齐节拍，停顿不计为超时"""
+        self.next_deadline = time.monotonic() + self.period
+
+    def get_stats(self) -> Dict:
+        """获取调度统计信息"""
+        return {
+            'rate_hz': self.rate_hz,
+            'ticks': self.tick_count,
+            'overruns': self.overrun_count,
+            'skipped_ticks': self.skipped_ticks,
+            'last_lateness_ms': round(self.last_lateness * 1000, 3),
+            'max_lateness_ms': round(self.max_lateness * 1000, 3)
+        }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+过境轨迹计算
+
+过境搜索和详细轨迹采样的纯计算函数，不依赖跟踪器和Flask应用，
+既可以在请求线程中直接调用，也可以提交到计算进程池（见 compute_pool）。
+提交到进程池的任务函数只接收可序列化的参数：TLE (名称, 第一行, 第二行)、
+地面站 (纬度, 经度, 高度米) 和时间。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from skyfield.api import load
+
+from ephemeris_cache import satellite_cache
+from ground_station import get_ground_station
+from handover_scheduler import predict_constellation_passes
+from pass_predictor import find_passes
+from trajectory_codec import encode_trajectory
+
+# 详细轨迹采样步长（秒）和可见仰角门限（度）
+TRAJECTORY_STEP_SECONDS = 10
+VISIBLE_ELEVATION = 5.0
+
+ts = load.timescale()
+
+
+def sample_pass(satellite, ground_station, start_time, end_time, step=TRAJECTORY_STEP_SECONDS):
+    """按固定步长对过境轨迹一次性向量化采样，返回(时间偏移秒数, 方位角, 仰角)数组"""
+    count = int((end_time - start_time).total_seconds() // step) + 1
+    offsets = np.arange(count) * float(step)
+    t0 = ts.from_datetime(start_time)
+    azimuths, elevations, _ = ground_station.look_angles(
+        satellite, ts.tt_jd(t0.tt, offsets / 86400.0)
+    )
+    return offsets, np.atleast_1d(azimuths), np.atleast_1d(elevations)
+
+
+def calculate_detailed_pass(satellite, ground_station, start_time, end_time) -> List[Dict]:
+    """计算详细过境轨迹"""
+    trajectory_points = []
+    time_step = timedelta(seconds=TRAJECTORY_STEP_SECONDS)
+
+    # 批量计算时间点
+    time_points = []
+    temp_time = start_time
+    while temp_time <= end_time:
+        time_points.append(temp_time)
+        temp_time += time_step
+
+    # 批量计算位置（利用skyfield的向量化能力）
+    try:
+        _, azimuths, elevations = sample_pass(satellite, ground_station, start_time, end_time)
+        samples = zip(time_points, azimuths, elevations)
+    except Exception:
+        # 如果批量计算失败，回退到逐点计算
+        samples = []
+        for time_point in time_points:
+            try:
+                azimuth, elevation, _ = ground_station.look_angles(satellite, ts.from_datetime(time_point))
+                samples.append((time_point, azimuth, elevation))
+            except Exception:
+                continue
+
+    # 构建结果点
+    for time_point, azimuth, elevation in samples:
+        trajectory_points.append({
+            'time': time_point.isoformat(),
+            'azimuth': round(float(azimuth), 3),
+            'elevation': round(float(elevation), 3),
+            'visible': bool(elevation > VISIBLE_ELEVATION)
+        })
+
+    return trajectory_points
+
+
+def build_pass_trajectory(satellite, ground_station, satellite_pass,
+                          encoding: Optional[str] = None) -> Optional[Dict]:
+    """计算一次过境的详细轨迹并组装响应，没有可见点时返回None
+
+    encoding 为 float32/delta 时返回紧凑格式（见 trajectory_codec）
+    """
+    pass_times = {
+        'maxElevation': round(satellite_pass['max_elevation'], 2),
+        'aosTime': satellite_pass['aos'].isoformat(),
+        'culminationTime': satellite_pass['culmination'].isoformat(),
+        'losTime': satellite_pass['los'].isoformat()
+    }
+
+    if encoding:
+        _, azimuths, elevations = sample_pass(satellite, ground_station,
+                                              satellite_pass['aos'], satellite_pass['los'])
+        result = encode_trajectory(satellite_pass['aos'], TRAJECTORY_STEP_SECONDS,
+                                   azimuths, elevations, VISIBLE_ELEVATION, encoding)
+        if result['visibleRange'] is None:
+            return None
+        result.update(pass_times)
+        return result
+
+    trajectory_points = calculate_detailed_pass(
+        satellite, ground_station, satellite_pass['aos'], satellite_pass['los']
+    )
+    if not trajectory_points:
+        return None
+
+    # 提取可见点
+    visible_points = [p for p in trajectory_points if p['visible']]
+    if not visible_points:
+        return None
+
+    return {
+        'trajectoryPoints': trajectory_points,  # 返回所有轨迹点（包括不可见点）
+        'visiblePoints': visible_points,       # 仅可见点
+        'totalPoints': len(trajectory_points),
+        'visibleCount': len(visible_points),
+        'startTime': trajectory_points[0]['time'],      # 使用完整轨迹的开始时间
+        'endTime': trajectory_points[-1]['time'],       # 使用完整轨迹的结束时间
+        'actualStartTime': visible_points[0]['time'],   # 可见部分的开始时间
+        **pass_times
+    }
+
+
+def _resolve(tle: Tuple[str, str, str], station: Tuple[float, float, float]):
+    """由可序列化参数还原卫星和地面站对象（进程内缓存复用）"""
+    name, line1, line2 = tle
+    return satellite_cache.get(line1, line2, name, ts), get_ground_station(*station)
+
+
+def search_passes(tle: Tuple[str, str, str], station: Tuple[float, float, float],
+                  start_time: datetime, end_time: datetime) -> List[Dict]:
+    """进程池任务：搜索时间窗口内的所有过境"""
+    satellite, ground_station = _resolve(tle, station)
+    return find_passes(satellite, ground_station.topos, ts, start_time, end_time)
+
+
+def pass_trajectory(tle: Tuple[str, str, str], station: Tuple[float, float, float],
+                    satellite_pass: Dict, encoding: Optional[str] = None) -> Optional[Dict]:
+    """进程池任务：计算一次过境的详细轨迹"""
+    satellite, ground_station = _resolve(tle, station)
+    return build_pass_trajectory(satellite, ground_station, satellite_pass, encoding)
+
+
+def search_constellation_passes(tles: List[Tuple[str, str, str]], station: Tuple[float, float, float],
+                                start_time: datetime, end_time: datetime,
+                                min_elevation: float = 0.0) -> List[Dict]:
+    """进程池任务：整个星座一次批量传播，搜索所有卫星的过境，按AOS排序
+
+    卫星对象不可序列化，结果中的 'satellite' 为该卫星在 tles 中的序号。
+    """
+    return predict_constellation_passes(tles, get_ground_station(*station), ts, start_time, end_time, min_elevation)
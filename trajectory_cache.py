@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轨迹结果缓存
+
+按(TLE哈希, 地面站, 起始时间分桶)缓存过境预测结果。每个桶的搜索窗口比请求的
+搜索时长多覆盖一个桶长，桶内任意起始时间都能从缓存中截取出完整的搜索窗口：
+已结束的过境丢弃，起始时间落在过境中间的过境从起始时间处截断。
+详细轨迹结果也随条目缓存（每个条目按LRU保留有限个）。条目有存活时间和数量上限，同一颗卫星的TLE更新后
+旧条目立即失效。
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+DEFAULT_BUCKET_SECONDS = 3600
+DEFAULT_TTL_SECONDS = 6 * 3600
+DEFAULT_MAX_ENTRIES = 128
+# 每个条目缓存的详细轨迹结果上限：进行中的过境按请求起始时间截断，每个起始时间的结果各不相同
+DEFAULT_MAX_RESULTS = 16
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def tle_hash(line1: str, line2: str) -> str:
+    """TLE两行根数的哈希，TLE变化时缓存键随之变化"""
+    return hashlib.sha1(f"{line1.strip()}\n{line2.strip()}".encode('utf-8')).hexdigest()
+
+
+class TrajectoryCache:
+    """过境预测与详细轨迹的LRU缓存"""
+
+    def __init__(self, bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_results: int = DEFAULT_MAX_RESULTS):
+        self.bucket_seconds = bucket_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self._entries = OrderedDict()
+        # 每颗卫星当前的TLE哈希，用于检测TLE更新
+        self._current_tle = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _bucket_start(self, start_time: datetime) -> datetime:
+        seconds = (start_time - _EPOCH).total_seconds()
+        return _EPOCH + timedelta(seconds=(seconds // self.bucket_seconds) * self.bucket_seconds)
+
+    def _invalidate_stale_tle(self, satellite_id, tle_key: str):
+        """同一颗卫星换了TLE时删除它的旧条目（调用方持有锁）"""
+        previous = self._current_tle.get(satellite_id)
+        self._current_tle[satellite_id] = tle_key
+        if previous is None or previous == tle_key:
+            return
+        stale = [key for key in self._entries if key[0] == previous]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def get_entry(self, satellite_id, tle_key: str, station_key: Tuple, start_time: datetime,
+                  search_hours: float, compute: Callable[[datetime, datetime], List[Dict]]) -> Dict:
+        """获取覆盖 [start_time, start_time + search_hours] 的缓存条目，未命中时调用compute计算
+
+        compute(window_start, window_end) 返回该窗口内的过境列表。
+        返回的条目包含 passes（完整窗口的过境）和 results（详细轨迹结果缓存，通过 get_result 访问）。
+        """
+        bucket_start = self._bucket_start(start_time)
+        key = (tle_key, station_key, bucket_start, search_hours)
+        now = time.monotonic()
+
+        with self._lock:
+            self._invalidate_stale_tle(satellite_id, tle_key)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry['created'] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        window_end = bucket_start + timedelta(hours=search_hours, seconds=self.bucket_seconds)
+        entry = {
+            'created': now,
+            'window_start': bucket_start,
+            'window_end': window_end,
+            'passes': compute(bucket_start, window_end),
+            'results': OrderedDict()
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._prune_locked(now)
+        return entry
+
+    def _prune_locked(self, now: float):
+        """删除过期条目、按LRU淘汰超出上限的条目，并删除已没有条目的卫星的TLE记录（调用方持有锁）"""
+        expired = [key for key, entry in self._entries.items() if now - entry['created'] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        # 卫星的条目都已淘汰时不再需要检测它的TLE更新
+        live = {key[0] for key in self._entries}
+        for satellite_id in [sid for sid, tle_key in self._current_tle.items() if tle_key not in live]:
+            del self._current_tle[satellite_id]
+
+    def get_result(self, entry: Dict, key: Tuple, compute: Callable[[], Any]):
+        """获取条目中缓存的详细轨迹结果，未命中时调用compute计算，超出上限时淘汰最久未用的结果"""
+        results = entry['results']
+        with self._lock:
+            if key in results:
+                results.move_to_end(key)
+                return results[key]
+
+        result = compute()
+        with self._lock:
+            results[key] = result
+            results.move_to_end(key)
+            while len(results) > self.max_results:
+                results.popitem(last=False)
+        return result
+
+    @staticmethod
+    def slice_passes(passes: List[Dict], start_time: datetime, end_time: datetime,
+                     elevation_at: Callable[[datetime], float]) -> List[Dict]:
+        """从缓存的过境列表中截取 [start_time, end_time] 窗口
+
+        与直接对该窗口做过境搜索的结果一致：窗口开始时正在进行的过境以窗口开始为AOS，
+        最高点已过时最大仰角取窗口开始时刻的仰角（窗口结束处同理）。
+        """
+        sliced = []
+        for satellite_pass in passes:
+            if satellite_pass['los'] <= start_time or satellite_pass['aos'] >= end_time:
+                continue
+            if satellite_pass['aos'] >= start_time and satellite_pass['los'] <= end_time:
+                sliced.append(satellite_pass)
+                continue
+
+            clipped = dict(satellite_pass)
+            if clipped['aos'] < start_time:
+                clipped['aos'] = start_time
+                clipped['aos_clipped'] = True
+            if clipped['los'] > end_time:
+                clipped['los'] = end_time
+                clipped['los_clipped'] = True
+            if not clipped['aos'] <= clipped['culmination'] <= clipped['los']:
+                boundary = clipped['aos'] if clipped['culmination'] < clipped['aos'] else clipped['los']
+                clipped['culmination'] = boundary
+                clipped['max_elevation'] = float(elevation_at(boundary))
+            sliced.append(clipped)
+        return sliced
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'tracked_satellites': len(self._current_tle),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# 轨迹接口共享的缓存实例
+trajectory_cache = TrajectoryCache()
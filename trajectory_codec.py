@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+轨迹紧凑编码
+
+默认的轨迹响应每个点都是一个带ISO时间字符串的字典，可见点还会重复一份。
+紧凑格式改为：起始时间 + 步长代替逐点时间，方位角/仰角按列编码，
+可见部分用下标范围表示。两种编码：
+
+- float32：小端float32数组的base64字符串
+- delta：按 scale 放大取整后的差分整数列表，第一个元素为首点取值，
+  还原方法为累加后除以 scale；方位角在差分前已展开，还原后需对360取模
+"""
+
+import base64
+from typing import Dict, Optional
+
+import numpy as np
+
+COMPACT_MIME = 'application/vnd.sat-trajectory.compact+json'
+ENCODINGS = ('float32', 'delta')
+DEFAULT_ENCODING = 'float32'
+DELTA_SCALE = 1000  # 千分之一度
+
+
+def accepts_compact(request) -> bool:
+    """Accept 头是否请求紧凑格式的媒体类型"""
+    return COMPACT_MIME in request.headers.get('Accept', '')
+
+
+def compact_encoding(request) -> Optional[str]:
+    """根据查询参数 format=compact（可带 encoding=float32|delta）或 Accept 头协商紧凑格式"""
+    requested = (request.args.get('format') or '').lower()
+    if requested != 'compact' and not accepts_compact(request):
+        return None
+    encoding = (request.args.get('encoding') or DEFAULT_ENCODING).lower()
+    return encoding if encoding in ENCODINGS else DEFAULT_ENCODING
+
+
+def _encode_column(values: np.ndarray, encoding: str, unwrap: bool = False):
+    if encoding == 'float32':
+        return base64.b64encode(values.astype('<f4').tobytes()).decode('ascii')
+    if unwrap:
+        values = np.unwrap(values, period=360.0)
+    scaled = np.rint(values * DELTA_SCALE).astype(np.int64)
+    return np.diff(scaled, prepend=0).tolist()
+
+
+def encode_trajectory(start_time, step: float, azimuth: np.ndarray, elevation: np.ndarray,
+                      visible_elevation: float, encoding: str) -> Dict:
+    """将等间隔采样的轨迹编码为紧凑格式
+
+    Returns:
+        包含 startTime / step / count、编码后的 azimuth / elevation 列，
+        以及可见部分下标范围 visibleRange=[首, 末]（含两端，无可见点时为None）
+    """
+    azimuth = np.asarray(azimuth, dtype=float)
+    elevation = np.asarray(elevation, dtype=float)
+    visible = np.flatnonzero(elevation > visible_elevation)
+
+    return {
+        'format': 'compact',
+        'encoding': encoding,
+        'scale': DELTA_SCALE if encoding == 'delta' else None,
+        'startTime': start_time.isoformat(),
+        'step': step,
+        'count': int(azimuth.size),
+        'azimuth': _encode_column(azimuth, encoding, unwrap=True),
+        'elevation': _encode_column(elevation, encoding),
+        'visibleRange': [int(visible[0]), int(visible[-1])] if visible.size else None,
+        'visibleCount': int(visible.size),
+        'visibleElevation': visible_elevation
+    }